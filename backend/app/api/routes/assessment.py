@@ -1,68 +1,167 @@
 """Assessment Routes"""
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session, load_only
+from typing import Any, List, Optional
+import base64
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
 
+from app.core.cache import cache_get, cache_set
 from app.core.database import get_db
-from app.models.assessment import FinancialAssessment
-from app.models.business import Business
+from app.models.assessment import FinancialAssessment, FinancialAssessmentNarrative
+from app.models.business import Business, INDUSTRY_VALUES
 
 router = APIRouter()
 
+# Lightweight columns loaded for list views - the heavy JSON/text insight
+# columns are deferred on the model and only fetched for single-record reads
+SUMMARY_COLUMNS = (
+    FinancialAssessment.id,
+    FinancialAssessment.business_id,
+    FinancialAssessment.assessment_date,
+    FinancialAssessment.overall_health_score,
+    FinancialAssessment.creditworthiness_score,
+    FinancialAssessment.liquidity_score,
+    FinancialAssessment.profitability_score,
+    FinancialAssessment.efficiency_score,
+    FinancialAssessment.credit_rating,
+    FinancialAssessment.risk_level,
+    FinancialAssessment.percentile_rank,
+    FinancialAssessment.ai_model_used,
+)
+
+
+class AssessmentSummary(BaseModel):
+    """Score-level assessment fields returned by list views"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    business_id: int
+    assessment_date: Optional[datetime]
+    overall_health_score: float
+    creditworthiness_score: float
+    liquidity_score: float
+    profitability_score: float
+    efficiency_score: float
+    credit_rating: str
+    risk_level: str
+    percentile_rank: Optional[float]
+    ai_model_used: Optional[str]
+
+
+class AssessmentDetail(AssessmentSummary):
+    """Full assessment including the AI insight fields"""
+    ai_summary: Optional[str]
+    strengths: Optional[Any]
+    weaknesses: Optional[Any]
+    opportunities: Optional[Any]
+    threats: Optional[Any]
+    cost_optimization_recommendations: Optional[Any]
+    revenue_enhancement_recommendations: Optional[Any]
+    working_capital_recommendations: Optional[Any]
+    tax_optimization_recommendations: Optional[Any]
+    recommended_products: Optional[Any]
+    identified_risks: Optional[Any]
+    risk_mitigation_strategies: Optional[Any]
+    revenue_forecast_3m: Optional[float]
+    revenue_forecast_6m: Optional[float]
+    revenue_forecast_12m: Optional[float]
+    cash_flow_forecast_3m: Optional[float]
+    tax_compliance_score: Optional[float]
+    compliance_issues: Optional[Any]
+    ai_confidence_score: Optional[float]
+
+
+# Detail fields that live on the assessment row vs the narrative table
+_SCALAR_DETAIL_FIELDS = (
+    "revenue_forecast_3m", "revenue_forecast_6m", "revenue_forecast_12m",
+    "cash_flow_forecast_3m", "tax_compliance_score", "ai_confidence_score",
+)
+_NARRATIVE_FIELDS = (
+    "ai_summary", "strengths", "weaknesses", "opportunities", "threats",
+    "cost_optimization_recommendations", "revenue_enhancement_recommendations",
+    "working_capital_recommendations", "tax_optimization_recommendations",
+    "recommended_products", "identified_risks", "risk_mitigation_strategies",
+    "compliance_issues",
+)
+
+
+def _detail_payload(assessment: FinancialAssessment,
+                    narrative: Optional[FinancialAssessmentNarrative]) -> dict:
+    """Merge the scalar row and its narrative into an AssessmentDetail dict"""
+    payload = AssessmentSummary.model_validate(assessment).model_dump()
+    for field in _SCALAR_DETAIL_FIELDS:
+        payload[field] = getattr(assessment, field)
+    for field in _NARRATIVE_FIELDS:
+        payload[field] = getattr(narrative, field) if narrative is not None else None
+    return AssessmentDetail(**payload).model_dump()
+
+
+def _encode_cursor(assessment_date: datetime, assessment_id: int) -> str:
+    """Encode a keyset pagination cursor from the last row of a page"""
+    raw = f"{assessment_date.isoformat()}|{assessment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a keyset pagination cursor into (assessment_date, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_str, id_str = raw.split("|")
+        return datetime.fromisoformat(date_str), int(id_str)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
 
 @router.get("/business/{business_id}")
 async def get_assessments_by_business(
     business_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all assessments for a business"""
-    # Check if business exists
-    business = db.query(Business).filter(Business.id == business_id).first()
-    if not business:
+    """Get assessments for a business (paginated, newest first)"""
+    # Check existence and fetch the one column we need, skipping full
+    # ORM hydration of the Business row
+    row = db.query(Business.business_name).filter(Business.id == business_id).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Business not found")
-    
-    # Get all assessments for this business
-    assessments = db.query(FinancialAssessment).filter(
+    business_name = row[0]
+
+    # Get a page of assessments for this business (summary columns only)
+    query = db.query(FinancialAssessment).options(
+        load_only(*SUMMARY_COLUMNS)
+    ).filter(
         FinancialAssessment.business_id == business_id
-    ).order_by(FinancialAssessment.assessment_date.desc()).all()
-    
+    )
+
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(FinancialAssessment.assessment_date, FinancialAssessment.id) <
+            (cursor_date, cursor_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    assessments = query.order_by(
+        FinancialAssessment.assessment_date.desc(),
+        FinancialAssessment.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(assessments) > limit:
+        assessments = assessments[:limit]
+        last = assessments[-1]
+        next_cursor = _encode_cursor(last.assessment_date, last.id)
+
     return {
         "success": True,
         "business_id": business_id,
-        "business_name": business.business_name,
+        "business_name": business_name,
         "count": len(assessments),
-        "assessments": [{
-            "id": a.id,
-            "assessment_date": a.assessment_date,
-            "overall_health_score": a.overall_health_score,
-            "creditworthiness_score": a.creditworthiness_score,
-            "liquidity_score": a.liquidity_score,
-            "profitability_score": a.profitability_score,
-            "efficiency_score": a.efficiency_score,
-            "credit_rating": a.credit_rating,
-            "risk_level": a.risk_level,
-            "ai_summary": a.ai_summary,
-            "strengths": a.strengths,
-            "weaknesses": a.weaknesses,
-            "opportunities": a.opportunities,
-            "threats": a.threats,
-            "cost_optimization_recommendations": a.cost_optimization_recommendations,
-            "revenue_enhancement_recommendations": a.revenue_enhancement_recommendations,
-            "working_capital_recommendations": a.working_capital_recommendations,
-            "tax_optimization_recommendations": a.tax_optimization_recommendations,
-            "recommended_products": a.recommended_products,
-            "identified_risks": a.identified_risks,
-            "risk_mitigation_strategies": a.risk_mitigation_strategies,
-            "revenue_forecast_3m": a.revenue_forecast_3m,
-            "revenue_forecast_6m": a.revenue_forecast_6m,
-            "revenue_forecast_12m": a.revenue_forecast_12m,
-            "cash_flow_forecast_3m": a.cash_flow_forecast_3m,
-            "tax_compliance_score": a.tax_compliance_score,
-            "compliance_issues": a.compliance_issues,
-            "percentile_rank": a.percentile_rank,
-            "ai_model_used": a.ai_model_used,
-            "ai_confidence_score": a.ai_confidence_score
-        } for a in assessments]
+        "next_cursor": next_cursor,
+        "assessments": [AssessmentSummary.model_validate(a) for a in assessments]
     }
 
 
@@ -72,179 +171,144 @@ async def get_latest_assessment(
     db: Session = Depends(get_db)
 ):
     """Get the latest assessment for a business"""
-    # Check if business exists
-    business = db.query(Business).filter(Business.id == business_id).first()
-    if not business:
+    cache_key = f"fha:assessment:latest:{business_id}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Check existence and fetch the one column we need, skipping full
+    # ORM hydration of the Business row
+    row = db.query(Business.business_name).filter(Business.id == business_id).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Business not found")
+    business_name = row[0]
     
-    # Get latest assessment
-    assessment = db.query(FinancialAssessment).filter(
+    # Get latest assessment joined to its narrative payload in one query
+    result = db.query(FinancialAssessment, FinancialAssessmentNarrative).outerjoin(
+        FinancialAssessmentNarrative,
+        FinancialAssessmentNarrative.assessment_id == FinancialAssessment.id
+    ).filter(
         FinancialAssessment.business_id == business_id
     ).order_by(FinancialAssessment.assessment_date.desc()).first()
-    
-    if not assessment:
+
+    if not result:
         raise HTTPException(status_code=404, detail="No assessment found for this business")
-    
-    return {
+
+    assessment, narrative = result
+    response = {
         "success": True,
         "business_id": business_id,
-        "business_name": business.business_name,
-        "assessment": {
-            "id": assessment.id,
-            "assessment_date": assessment.assessment_date,
-            "overall_health_score": assessment.overall_health_score,
-            "creditworthiness_score": assessment.creditworthiness_score,
-            "liquidity_score": assessment.liquidity_score,
-            "profitability_score": assessment.profitability_score,
-            "efficiency_score": assessment.efficiency_score,
-            "credit_rating": assessment.credit_rating,
-            "risk_level": assessment.risk_level,
-            "ai_summary": assessment.ai_summary,
-            "strengths": assessment.strengths,
-            "weaknesses": assessment.weaknesses,
-            "opportunities": assessment.opportunities,
-            "threats": assessment.threats,
-            "cost_optimization_recommendations": assessment.cost_optimization_recommendations,
-            "revenue_enhancement_recommendations": assessment.revenue_enhancement_recommendations,
-            "working_capital_recommendations": assessment.working_capital_recommendations,
-            "tax_optimization_recommendations": assessment.tax_optimization_recommendations,
-            "recommended_products": assessment.recommended_products,
-            "identified_risks": assessment.identified_risks,
-            "risk_mitigation_strategies": assessment.risk_mitigation_strategies,
-            "revenue_forecast_3m": assessment.revenue_forecast_3m,
-            "revenue_forecast_6m": assessment.revenue_forecast_6m,
-            "revenue_forecast_12m": assessment.revenue_forecast_12m,
-            "cash_flow_forecast_3m": assessment.cash_flow_forecast_3m,
-            "tax_compliance_score": assessment.tax_compliance_score,
-            "compliance_issues": assessment.compliance_issues,
-            "percentile_rank": assessment.percentile_rank,
-            "ai_model_used": assessment.ai_model_used,
-            "ai_confidence_score": assessment.ai_confidence_score
-        }
+        "business_name": business_name,
+        "assessment": _detail_payload(assessment, narrative)
     }
 
+    cache_set(cache_key, response)
+    return response
+
 
 @router.get("/{assessment_id}")
 async def get_assessment(
     assessment_id: int,
+    detail: str = Query("full", pattern="^(summary|full)$", description="Use 'summary' to skip the heavy insight columns"),
     db: Session = Depends(get_db)
 ):
     """Get specific assessment by ID"""
-    assessment = db.query(FinancialAssessment).filter(
-        FinancialAssessment.id == assessment_id
-    ).first()
-    
-    if not assessment:
-        raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    return {
+    cache_key = f"fha:assessment:{assessment_id}:{detail}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    if detail == "summary":
+        assessment = db.query(FinancialAssessment).options(
+            load_only(*SUMMARY_COLUMNS)
+        ).filter(FinancialAssessment.id == assessment_id).first()
+        if not assessment:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        payload = AssessmentSummary.model_validate(assessment).model_dump()
+    else:
+        # Join the narrative table so the record comes back in one query
+        result = db.query(FinancialAssessment, FinancialAssessmentNarrative).outerjoin(
+            FinancialAssessmentNarrative,
+            FinancialAssessmentNarrative.assessment_id == FinancialAssessment.id
+        ).filter(FinancialAssessment.id == assessment_id).first()
+        if not result:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        payload = _detail_payload(*result)
+
+    response = {
         "success": True,
-        "assessment": {
-            "id": assessment.id,
-            "business_id": assessment.business_id,
-            "assessment_date": assessment.assessment_date,
-            "overall_health_score": assessment.overall_health_score,
-            "creditworthiness_score": assessment.creditworthiness_score,
-            "liquidity_score": assessment.liquidity_score,
-            "profitability_score": assessment.profitability_score,
-            "efficiency_score": assessment.efficiency_score,
-            "credit_rating": assessment.credit_rating,
-            "risk_level": assessment.risk_level,
-            "ai_summary": assessment.ai_summary,
-            "strengths": assessment.strengths,
-            "weaknesses": assessment.weaknesses,
-            "opportunities": assessment.opportunities,
-            "threats": assessment.threats,
-            "cost_optimization_recommendations": assessment.cost_optimization_recommendations,
-            "revenue_enhancement_recommendations": assessment.revenue_enhancement_recommendations,
-            "working_capital_recommendations": assessment.working_capital_recommendations,
-            "tax_optimization_recommendations": assessment.tax_optimization_recommendations,
-            "recommended_products": assessment.recommended_products,
-            "identified_risks": assessment.identified_risks,
-            "risk_mitigation_strategies": assessment.risk_mitigation_strategies,
-            "revenue_forecast_3m": assessment.revenue_forecast_3m,
-            "revenue_forecast_6m": assessment.revenue_forecast_6m,
-            "revenue_forecast_12m": assessment.revenue_forecast_12m,
-            "cash_flow_forecast_3m": assessment.cash_flow_forecast_3m,
-            "tax_compliance_score": assessment.tax_compliance_score,
-            "compliance_issues": assessment.compliance_issues,
-            "percentile_rank": assessment.percentile_rank,
-            "ai_model_used": assessment.ai_model_used,
-            "ai_confidence_score": assessment.ai_confidence_score
-        }
+        "assessment": payload
     }
 
+    cache_set(cache_key, response)
+    return response
+
 
 @router.get("/user/{user_id}/all")
 async def get_all_user_assessments(
     user_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all assessments for all businesses owned by a user"""
-    from app.models.business import Business
-    
-    # Get all businesses for this user
-    businesses = db.query(Business).filter(Business.user_id == user_id).all()
-    
-    if not businesses:
+    """Get assessments for all businesses owned by a user (paginated, newest first)"""
+    total_businesses = db.query(func.count(Business.id)).filter(
+        Business.user_id == user_id
+    ).scalar()
+
+    if not total_businesses:
         return {
             "success": True,
             "user_id": user_id,
             "total_businesses": 0,
             "total_assessments": 0,
+            "next_cursor": None,
             "assessments": []
         }
-    
-    business_ids = [b.id for b in businesses]
-    
-    # Get all assessments for these businesses
-    assessments = db.query(FinancialAssessment).filter(
-        FinancialAssessment.business_id.in_(business_ids)
-    ).order_by(FinancialAssessment.assessment_date.desc()).all()
-    
-    # Create a map of business info
-    business_map = {b.id: b for b in businesses}
-    
+
+    # Single JOIN pulls the assessment page together with the business
+    # columns needed for serialization - no per-row lazy loads
+    query = db.query(
+        FinancialAssessment,
+        Business.business_name,
+        Business.industry
+    ).join(
+        Business, FinancialAssessment.business_id == Business.id
+    ).options(
+        load_only(*SUMMARY_COLUMNS)
+    ).filter(
+        Business.user_id == user_id
+    )
+
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(FinancialAssessment.assessment_date, FinancialAssessment.id) <
+            (cursor_date, cursor_id)
+        )
+
+    rows = query.order_by(
+        FinancialAssessment.assessment_date.desc(),
+        FinancialAssessment.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = _encode_cursor(last.assessment_date, last.id)
+
     return {
         "success": True,
         "user_id": user_id,
-        "total_businesses": len(businesses),
-        "total_assessments": len(assessments),
+        "total_businesses": total_businesses,
+        "total_assessments": len(rows),
+        "next_cursor": next_cursor,
         "assessments": [{
-            "id": a.id,
-            "business_id": a.business_id,
-            "business_name": business_map[a.business_id].business_name,
-            "industry": business_map[a.business_id].industry.value if business_map[a.business_id].industry else "other",
-            "assessment_date": a.assessment_date,
-            "overall_health_score": a.overall_health_score,
-            "creditworthiness_score": a.creditworthiness_score,
-            "liquidity_score": a.liquidity_score,
-            "profitability_score": a.profitability_score,
-            "efficiency_score": a.efficiency_score,
-            "credit_rating": a.credit_rating,
-            "risk_level": a.risk_level,
-            "ai_summary": a.ai_summary,
-            "strengths": a.strengths,
-            "weaknesses": a.weaknesses,
-            "opportunities": a.opportunities,
-            "threats": a.threats,
-            "cost_optimization_recommendations": a.cost_optimization_recommendations,
-            "revenue_enhancement_recommendations": a.revenue_enhancement_recommendations,
-            "working_capital_recommendations": a.working_capital_recommendations,
-            "tax_optimization_recommendations": a.tax_optimization_recommendations,
-            "recommended_products": a.recommended_products,
-            "identified_risks": a.identified_risks,
-            "risk_mitigation_strategies": a.risk_mitigation_strategies,
-            "revenue_forecast_3m": a.revenue_forecast_3m,
-            "revenue_forecast_6m": a.revenue_forecast_6m,
-            "revenue_forecast_12m": a.revenue_forecast_12m,
-            "cash_flow_forecast_3m": a.cash_flow_forecast_3m,
-            "tax_compliance_score": a.tax_compliance_score,
-            "compliance_issues": a.compliance_issues,
-            "percentile_rank": a.percentile_rank,
-            "ai_model_used": a.ai_model_used,
-            "ai_confidence_score": a.ai_confidence_score
-        } for a in assessments]
+            **AssessmentSummary.model_validate(a).model_dump(),
+            "business_name": business_name,
+            "industry": INDUSTRY_VALUES[industry]
+        } for a, business_name, industry in rows]
     }
 
 
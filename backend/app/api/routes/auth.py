@@ -4,14 +4,14 @@ User registration, login, and token management
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from datetime import datetime, timedelta
 from typing import Optional
 
 from app.core.database import get_db
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    averify_password,
+    aget_password_hash,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -119,7 +119,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         email=user_data.email,
         username=user_data.username,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await aget_password_hash(user_data.password),
         company_name=user_data.company_name,
         industry=user_data.industry,
         phone=user_data.phone,
@@ -140,9 +140,12 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Login and get access token"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    # hashed_password is deferred; login is the one path that needs it
+    user = db.query(User).options(undefer(User.hashed_password)).filter(
+        User.username == form_data.username
+    ).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1,14 +1,29 @@
 """Business Management Routes"""
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 
+from app.core.cache import cache_get, cache_set, cache_invalidate_prefix
 from app.core.database import get_db
-from app.models.business import Business, IndustryType, BusinessSize
+from app.models.business import (
+    Business,
+    IndustryType,
+    BusinessSize,
+    INDUSTRY_VALUES,
+    BUSINESS_SIZE_VALUES,
+)
 
 router = APIRouter()
 
+# Value -> member lookups for the create path; O(1) dict hit instead of the
+# enum constructor's member scan, and bad input becomes a plain miss rather
+# than a raised/caught ValueError
+_INDUSTRY_BY_VALUE = {m.value: m for m in IndustryType}
+_SIZE_BY_VALUE = {m.value: m for m in BusinessSize}
+
 
 class BusinessResponse(BaseModel):
     """Business response model"""
@@ -31,20 +46,30 @@ class BusinessResponse(BaseModel):
 @router.get("/user/{user_id}", response_model=List[BusinessResponse])
 async def get_user_businesses(
     user_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[int] = Query(None, description="Return businesses with id greater than this value"),
     db: Session = Depends(get_db)
 ):
-    """Get all businesses for a specific user"""
-    businesses = db.query(Business).filter(
-        Business.user_id == user_id
-    ).all()
-    
-    return [
+    """Get businesses for a specific user (paginated by id)"""
+    cache_key = f"fha:business:user:{user_id}:{limit}:{cursor}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    query = db.query(Business).filter(Business.user_id == user_id)
+
+    if cursor is not None:
+        query = query.filter(Business.id > cursor)
+
+    businesses = query.order_by(Business.id).limit(limit).all()
+
+    response = [
         BusinessResponse(
             id=b.id,
             business_name=b.business_name,
             legal_name=b.legal_name,
-            industry=b.industry.value if b.industry else "other",
-            business_size=b.business_size.value if b.business_size else "small",
+            industry=INDUSTRY_VALUES[b.industry],
+            business_size=BUSINESS_SIZE_VALUES[b.business_size],
             gst_number=b.gst_number,
             annual_revenue=b.annual_revenue,
             employee_count=b.employee_count,
@@ -55,19 +80,64 @@ async def get_user_businesses(
         for b in businesses
     ]
 
+    cache_set(cache_key, [r.model_dump() for r in response])
+    return response
+
+
+@router.get("/export")
+async def export_all_businesses(db: Session = Depends(get_db)):
+    """
+    Stream every business as newline-delimited JSON (admin export)
+
+    Uses a server-side cursor so peak memory stays at one batch of rows
+    regardless of table size; the paginated GET / stays the normal read path
+    """
+    result = db.execute(
+        select(Business).order_by(Business.id).execution_options(
+            stream_results=True, yield_per=500
+        )
+    )
+
+    def generate():
+        for b in result.scalars():
+            yield BusinessResponse(
+                id=b.id,
+                business_name=b.business_name,
+                legal_name=b.legal_name,
+                industry=INDUSTRY_VALUES[b.industry],
+                business_size=BUSINESS_SIZE_VALUES[b.business_size],
+                gst_number=b.gst_number,
+                annual_revenue=b.annual_revenue,
+                employee_count=b.employee_count,
+                established_year=b.established_year,
+                city=b.city,
+                state=b.state
+            ).model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 
 @router.get("/", response_model=List[BusinessResponse])
-async def get_all_businesses(db: Session = Depends(get_db)):
-    """Get all businesses (for admin/testing)"""
-    businesses = db.query(Business).all()
-    
+async def get_all_businesses(
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[int] = Query(None, description="Return businesses with id greater than this value"),
+    db: Session = Depends(get_db)
+):
+    """Get all businesses (for admin/testing, paginated by id)"""
+    query = db.query(Business)
+
+    if cursor is not None:
+        query = query.filter(Business.id > cursor)
+
+    businesses = query.order_by(Business.id).limit(limit).all()
+
     return [
         BusinessResponse(
             id=b.id,
             business_name=b.business_name,
             legal_name=b.legal_name,
-            industry=b.industry.value if b.industry else "other",
-            business_size=b.business_size.value if b.business_size else "small",
+            industry=INDUSTRY_VALUES[b.industry],
+            business_size=BUSINESS_SIZE_VALUES[b.business_size],
             gst_number=b.gst_number,
             annual_revenue=b.annual_revenue,
             employee_count=b.employee_count,
@@ -85,17 +155,22 @@ async def get_business(
     db: Session = Depends(get_db)
 ):
     """Get a specific business by ID"""
+    cache_key = f"fha:business:{business_id}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     business = db.query(Business).filter(Business.id == business_id).first()
-    
+
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    
-    return BusinessResponse(
+
+    response = BusinessResponse(
         id=business.id,
         business_name=business.business_name,
         legal_name=business.legal_name,
-        industry=business.industry.value if business.industry else "other",
-        business_size=business.business_size.value if business.business_size else "small",
+        industry=INDUSTRY_VALUES[business.industry],
+        business_size=BUSINESS_SIZE_VALUES[business.business_size],
         gst_number=business.gst_number,
         annual_revenue=business.annual_revenue,
         employee_count=business.employee_count,
@@ -104,6 +179,9 @@ async def get_business(
         state=business.state
     )
 
+    cache_set(cache_key, response.model_dump())
+    return response
+
 
 class BusinessCreate(BaseModel):
     """Business creation model"""
@@ -152,11 +230,15 @@ async def create_business(
     db: Session = Depends(get_db)
 ):
     """Create new business"""
+    industry_enum = _INDUSTRY_BY_VALUE.get(business_data.industry)
+    if industry_enum is None:
+        raise HTTPException(status_code=400, detail=f"Invalid industry: {business_data.industry}")
+
+    size_enum = _SIZE_BY_VALUE.get(business_data.business_size)
+    if size_enum is None:
+        raise HTTPException(status_code=400, detail=f"Invalid business size: {business_data.business_size}")
+
     try:
-        # Convert string to enum
-        industry_enum = IndustryType(business_data.industry)
-        size_enum = BusinessSize(business_data.business_size)
-        
         new_business = Business(
             user_id=business_data.user_id,
             business_name=business_data.business_name,
@@ -179,14 +261,19 @@ async def create_business(
         
         db.add(new_business)
         db.commit()
-        db.refresh(new_business)
-        
+        # No refresh needed: the INSERT's RETURNING populates the PK and
+        # expire_on_commit=False keeps the other attributes loaded
+
+        # Drop this user's cached business lists so they see the new
+        # entry (trailing colon keeps user 1 from matching user 10, 11, ...)
+        cache_invalidate_prefix(f"fha:business:user:{business_data.user_id}:")
+
         return BusinessResponse(
             id=new_business.id,
             business_name=new_business.business_name,
             legal_name=new_business.legal_name,
-            industry=new_business.industry.value,
-            business_size=new_business.business_size.value,
+            industry=new_business.industry,
+            business_size=new_business.business_size,
             gst_number=new_business.gst_number,
             annual_revenue=new_business.annual_revenue,
             employee_count=new_business.employee_count,
@@ -194,8 +281,64 @@ async def create_business(
             city=new_business.city,
             state=new_business.state
         )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid industry or business size: {str(e)}")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create business: {str(e)}")
+
+
+class BusinessBulkCreate(BaseModel):
+    """Bulk business onboarding payload"""
+    businesses: List[BusinessCreateWithUser]
+
+
+@router.post("/bulk")
+async def create_businesses_bulk(
+    payload: BusinessBulkCreate,
+    db: Session = Depends(get_db)
+):
+    """Create many businesses in one executemany INSERT (bulk onboarding)"""
+    if not payload.businesses:
+        raise HTTPException(status_code=400, detail="No businesses provided")
+
+    rows = []
+    for item in payload.businesses:
+        industry_enum = _INDUSTRY_BY_VALUE.get(item.industry)
+        if industry_enum is None:
+            raise HTTPException(status_code=400, detail=f"Invalid industry: {item.industry}")
+
+        size_enum = _SIZE_BY_VALUE.get(item.business_size)
+        if size_enum is None:
+            raise HTTPException(status_code=400, detail=f"Invalid business size: {item.business_size}")
+
+        rows.append({
+            "user_id": item.user_id,
+            "business_name": item.business_name,
+            "legal_name": item.legal_name,
+            "industry": industry_enum.value,
+            "business_size": size_enum.value,
+            "gst_number": item.gst_number,
+            "pan_number": item.pan_number,
+            "address": item.address,
+            "city": item.city,
+            "state": item.state,
+            "pincode": item.pincode,
+            "phone": item.phone,
+            "email": item.email,
+            "website": item.website,
+            "annual_revenue": item.annual_revenue,
+            "employee_count": item.employee_count,
+            "established_year": item.established_year
+        })
+
+    try:
+        # Single executemany INSERT instead of a per-row add/flush cycle
+        db.execute(insert(Business), rows)
+        db.commit()
+
+        for user_id in {item.user_id for item in payload.businesses}:
+            cache_invalidate_prefix(f"fha:business:user:{user_id}:")
+
+        return {"success": True, "created": len(rows)}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to create businesses: {str(e)}")
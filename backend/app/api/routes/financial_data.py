@@ -1,95 +1,174 @@
 """Financial Data Routes"""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks, Query
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+import aiofiles
+import asyncio
+import hashlib
+import logging
+import mmap
 import os
 import uuid
 from datetime import datetime
+from pathlib import Path
 
-from app.core.database import get_db
+from app.core.cache import cache_invalidate
+from app.core.celery_app import celery_app
+from app.core.database import async_engine, get_async_db
 from app.models.business import FinancialData, Business
 from app.services.file_parser import file_parser
 from app.services.financial_analysis import financial_service
-from app.services.ai_analysis import ai_service
+from app.services.ai_analysis import get_ai_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Upload directory
+# Upload directory (resolved once at import - no per-request path syscalls)
 UPLOAD_DIR = "backend/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_PATH = Path(UPLOAD_DIR)
+UPLOAD_PATH.mkdir(parents=True, exist_ok=True)
+
+# Upload limits
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # stream uploads in 1MB chunks
+
+# Accepted upload formats, interned once at import
+_ALLOWED_MIME = frozenset({
+    'text/csv',
+    'application/vnd.ms-excel',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/pdf',
+})
+_EXT_TO_SOURCE = {'.csv': 'csv', '.xlsx': 'excel', '.xls': 'excel', '.pdf': 'pdf'}
+
+# Dialect-appropriate INSERT ... ON CONFLICT constructor, fixed at import
+_upsert = pg_insert if async_engine.dialect.name == "postgresql" else sqlite_insert
+
+# Current year, resolved once per process (workers restart far more often
+# than the year changes)
+_THIS_YEAR = datetime.utcnow().year
+
+# Columns the analysis pipeline actually consumes, fetched as a flat row
+# instead of hydrating full ORM instances
+FIN_COLS = (
+    FinancialData.total_revenue,
+    FinancialData.total_expenses,
+    FinancialData.total_assets,
+    FinancialData.current_assets,
+    FinancialData.cash_and_equivalents,
+    FinancialData.accounts_receivable,
+    FinancialData.inventory,
+    FinancialData.total_liabilities,
+    FinancialData.current_liabilities,
+    FinancialData.accounts_payable,
+    FinancialData.short_term_debt,
+    FinancialData.long_term_debt,
+    FinancialData.owners_equity,
+    FinancialData.operating_cash_flow,
+    FinancialData.cost_of_goods_sold,
+)
+FIN_KEYS = tuple(c.key for c in FIN_COLS)
+
+
+def _projection(fields: Optional[str]) -> list:
+    """Resolve a comma-separated ?fields= list to FinancialData columns
 
+    Unknown names raise a 400 so typos don't silently come back as full rows
+    """
+    if not fields:
+        return [FinancialData]
+    cols = []
+    for name in fields.split(','):
+        name = name.strip()
+        col = getattr(FinancialData, name, None)
+        if col is None or not hasattr(col, 'key'):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+        cols.append(col)
+    return cols
 
+
+@celery_app.task(bind=True, autoretry_for=(ConnectionError, TimeoutError), retry_backoff=True, max_retries=3)
 def analyze_financial_data_background(
+    self,
     financial_data_id: int,
-    parsed_data: dict,
     business_id: int
 ):
-    """Background task to analyze financial data with AI"""
+    """Background task to analyze financial data with AI
+
+    Takes IDs only so the payload stays broker-friendly; the record and
+    any uploaded PDF are re-read inside the task.
+    """
     from app.core.database import SessionLocal
-    
+
     db = SessionLocal()
     try:
-        # Get financial data record
-        fin_data = db.query(FinancialData).filter(FinancialData.id == financial_data_id).first()
-        if not fin_data:
-            return
-        
-        # Get business info
-        business = db.query(Business).filter(Business.id == business_id).first()
-        if not business:
+        # One joined column select fetches everything the pipeline needs as
+        # a flat row - no ORM hydration, no second round-trip for Business
+        row = db.execute(
+            select(
+                *FIN_COLS,
+                FinancialData.period_start,
+                FinancialData.period_end,
+                FinancialData.data_source,
+                FinancialData.uploaded_file_path,
+                Business.business_name,
+                Business.industry,
+                Business.business_size,
+                Business.established_year,
+            ).join(
+                Business, Business.id == FinancialData.business_id
+            ).where(
+                FinancialData.id == financial_data_id,
+                Business.id == business_id
+            )
+        ).first()
+        if row is None:
             return
-        
+
+        financial_dict = dict(zip(FIN_KEYS, row))
+        (period_start, period_end, data_source, uploaded_file_path,
+         business_name, industry, business_size, established_year) = row[len(FIN_KEYS):]
+
         business_info = {
-            'business_name': business.business_name,
-            'industry': business.industry.value if business.industry else 'other',
-            'business_size': business.business_size.value if business.business_size else 'small',
-            'years_in_operation': datetime.now().year - business.established_year if business.established_year else 0
+            'business_name': business_name,
+            'industry': industry or 'other',
+            'business_size': business_size or 'small',
+            'years_in_operation': (_THIS_YEAR - established_year) if established_year else 0
         }
-        
-        # Prepare financial data dict
-        financial_dict = {
-            'total_revenue': fin_data.total_revenue,
-            'total_expenses': fin_data.total_expenses,
-            'total_assets': fin_data.total_assets,
-            'current_assets': fin_data.current_assets,
-            'cash_and_equivalents': fin_data.cash_and_equivalents,
-            'accounts_receivable': fin_data.accounts_receivable,
-            'inventory': fin_data.inventory,
-            'total_liabilities': fin_data.total_liabilities,
-            'current_liabilities': fin_data.current_liabilities,
-            'accounts_payable': fin_data.accounts_payable,
-            'short_term_debt': fin_data.short_term_debt,
-            'long_term_debt': fin_data.long_term_debt,
-            'owners_equity': fin_data.owners_equity,
-            'operating_cash_flow': fin_data.operating_cash_flow,
-            'cost_of_goods_sold': fin_data.cost_of_goods_sold,
-        }
-        
+
         # Calculate ratios
         ratios = financial_service.calculate_financial_ratios(financial_dict)
         
         # Perform AI analysis
         try:
-            # Check if PDF was uploaded
+            # For PDF uploads, mmap the stored file rather than shipping
+            # the raw bytes through the broker
             pdf_bytes = None
-            if parsed_data.get('document_type') == 'pdf' and 'raw_pdf_bytes' in parsed_data:
-                pdf_bytes = parsed_data['raw_pdf_bytes']
-            
-            ai_analysis = ai_service.analyze_financial_health(
+            if data_source == 'pdf' and uploaded_file_path \
+                    and os.path.exists(uploaded_file_path):
+                with open(uploaded_file_path, 'rb') as pdf_file:
+                    pdf_bytes = mmap.mmap(pdf_file.fileno(), 0, prot=mmap.PROT_READ)
+
+            ai_analysis = get_ai_service().analyze_financial_health(
                 financial_dict,
                 business_info,
                 None,  # No industry benchmarks for now
                 pdf_bytes=pdf_bytes  # Pass PDF bytes if available
             )
             
-            # Store analysis results in the assessment table
-            from app.models.assessment import FinancialAssessment
-            
+            # Store the scalar scores and the heavy AI payload in their
+            # split tables (see FinancialAssessmentNarrative)
+            from app.models.assessment import FinancialAssessment, FinancialAssessmentNarrative
+
             assessment = FinancialAssessment(
                 business_id=business_id,
                 assessment_date=datetime.utcnow(),
-                period_start=fin_data.period_start,
-                period_end=fin_data.period_end,
+                period_start=period_start,
+                period_end=period_end,
                 creditworthiness_score=ai_analysis.get('creditworthiness_score', 0),
                 overall_health_score=ai_analysis.get('overall_health_score', 0),
                 liquidity_score=ai_analysis.get('liquidity_score', 0),
@@ -97,6 +176,22 @@ def analyze_financial_data_background(
                 efficiency_score=ai_analysis.get('efficiency_score', 0),
                 credit_rating=ai_analysis.get('credit_rating', 'BBB'),
                 risk_level=ai_analysis.get('risk_level', 'moderate'),
+                revenue_forecast_3m=ai_analysis.get('revenue_forecast_3m'),
+                revenue_forecast_6m=ai_analysis.get('revenue_forecast_6m'),
+                revenue_forecast_12m=ai_analysis.get('revenue_forecast_12m'),
+                cash_flow_forecast_3m=ai_analysis.get('cash_flow_forecast_3m'),
+                tax_compliance_score=ai_analysis.get('tax_compliance_score'),
+                percentile_rank=ai_analysis.get('percentile_rank'),
+                ai_model_used=ai_analysis.get('ai_model_used'),
+                ai_confidence_score=ai_analysis.get('ai_confidence_score')
+            )
+
+            db.add(assessment)
+            db.flush()  # assigns assessment.id for the narrative FK
+
+            db.add(FinancialAssessmentNarrative(
+                assessment_id=assessment.id,
+                ai_summary=ai_analysis.get('ai_summary', ''),
                 strengths=ai_analysis.get('strengths', []),
                 weaknesses=ai_analysis.get('weaknesses', []),
                 opportunities=ai_analysis.get('opportunities', []),
@@ -108,23 +203,15 @@ def analyze_financial_data_background(
                 recommended_products=ai_analysis.get('recommended_products', []),
                 identified_risks=ai_analysis.get('identified_risks', []),
                 risk_mitigation_strategies=ai_analysis.get('risk_mitigation_strategies', []),
-                revenue_forecast_3m=ai_analysis.get('revenue_forecast_3m'),
-                revenue_forecast_6m=ai_analysis.get('revenue_forecast_6m'),
-                revenue_forecast_12m=ai_analysis.get('revenue_forecast_12m'),
-                cash_flow_forecast_3m=ai_analysis.get('cash_flow_forecast_3m'),
-                tax_compliance_score=ai_analysis.get('tax_compliance_score'),
                 compliance_issues=ai_analysis.get('compliance_issues', []),
-                percentile_rank=ai_analysis.get('percentile_rank'),
-                ai_summary=ai_analysis.get('ai_summary', ''),
-                ai_model_used=ai_analysis.get('ai_model_used'),
-                ai_confidence_score=ai_analysis.get('ai_confidence_score')
-            )
-            
-            db.add(assessment)
+            ))
             db.commit()
-            
-        except Exception as e:
-            print(f"AI analysis failed: {str(e)}")
+
+            # New assessment supersedes any cached reads for this business
+            cache_invalidate(f"fha:assessment:latest:{business_id}")
+
+        except Exception:
+            logger.exception("AI analysis failed for financial_data_id=%s", financial_data_id)
             # Continue even if AI analysis fails
         
     finally:
@@ -134,13 +221,24 @@ def analyze_financial_data_background(
 @router.get("/")
 async def get_financial_data(
     business_id: int,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all financial data for a business"""
-    financial_records = db.query(FinancialData).filter(
-        FinancialData.business_id == business_id
-    ).order_by(FinancialData.fiscal_year.desc()).all()
-    
+    """Get all financial data for a business
+
+    Pass ?fields=id,fiscal_year,total_revenue to project only the columns
+    the caller renders - fewer bytes off the wire and no ORM hydration
+    """
+    result = await db.execute(
+        select(*_projection(fields)).where(
+            FinancialData.business_id == business_id
+        ).order_by(FinancialData.fiscal_year.desc())
+    )
+    if fields:
+        financial_records = [dict(m) for m in result.mappings()]
+    else:
+        financial_records = result.scalars().all()
+
     return {
         "success": True,
         "count": len(financial_records),
@@ -154,127 +252,164 @@ async def upload_financial_data(
     file: UploadFile = File(...),
     business_id: int = Form(...),
     fiscal_year: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload and analyze financial statements"""
     
     # Validate file
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
-    
-    # Check file size (50MB limit)
-    file_content = await file.read()
-    if len(file_content) > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
-    
+
     # Validate file type
-    allowed_types = ['text/csv', 'application/vnd.ms-excel', 
-                     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                     'application/pdf']
-    
-    if file.content_type not in allowed_types and not file.filename.endswith(('.csv', '.xlsx', '.xls', '.pdf')):
+    ext = os.path.splitext(file.filename)[1].lower()
+    data_source = _EXT_TO_SOURCE.get(ext, 'unknown')
+
+    if file.content_type not in _ALLOWED_MIME and data_source == 'unknown':
         raise HTTPException(status_code=400, detail="Invalid file type. Only CSV, Excel, and PDF files are supported")
-    
-    # Check if business exists
-    business = db.query(Business).filter(Business.id == business_id).first()
-    if not business:
+
+    # Check if business exists (single-column existence probe)
+    business = await db.scalar(select(Business.id).where(Business.id == business_id))
+    if business is None:
         raise HTTPException(status_code=404, detail="Business not found")
-    
+
+    # Stream the upload to a temp file in fixed-size chunks so peak memory
+    # stays at one chunk instead of the whole file, enforcing the size cap
+    # as bytes arrive and hashing for dedup along the way
+    file_id = str(uuid.uuid4())
+    saved_filename = f"{file_id}{ext}"
+    tmp_path = str(UPLOAD_PATH / f".{saved_filename}.part")
+
+    hasher = hashlib.blake2b()
+    total_bytes = 0
     try:
-        # Parse the file
-        parsed_data = file_parser.parse_file(
+        async with aiofiles.open(tmp_path, 'wb') as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total_bytes += len(chunk)
+                if total_bytes > MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
+                hasher.update(chunk)
+                await out.write(chunk)
+
+        if total_bytes == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    try:
+        # Memory-map the temp file and hand the mapping to the parser -
+        # the parsers index it like bytes without another full copy
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            file_content = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+
+        # Parse the file off the event loop (thread for small uploads,
+        # process pool for large ones - see FileParserService)
+        parsed_data = await file_parser.parse_file_async(
             file_content,
             file.filename,
             file.content_type or ""
         )
-        
-        # Save file to disk
-        file_id = str(uuid.uuid4())
-        file_extension = os.path.splitext(file.filename)[1]
-        saved_filename = f"{file_id}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, saved_filename)
-        
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
-        
+
+        # The analysis task re-reads the stored file itself, so drop the
+        # parser's reference to the raw mapping straight away
+        parsed_data.pop('raw_pdf_bytes', None)
+
+        # Publish the fully-written temp file atomically
+        file_path = str(UPLOAD_PATH / saved_filename)
+        os.replace(tmp_path, file_path)
+
         # Determine period dates
         period_start = datetime(fiscal_year, 1, 1)
         period_end = datetime(fiscal_year, 12, 31)
         
-        # Create or update financial data record
-        existing = db.query(FinancialData).filter(
-            FinancialData.business_id == business_id,
-            FinancialData.fiscal_year == fiscal_year
-        ).first()
-        
-        if existing:
-            # Update existing record
-            for key, value in parsed_data.items():
-                if key != 'document_type' and hasattr(existing, key):
-                    setattr(existing, key, value)
-            
-            existing.data_source = 'csv' if file.filename.endswith('.csv') else 'excel' if file.filename.endswith(('.xlsx', '.xls')) else 'pdf'
-            existing.uploaded_file_path = file_path
-            existing.updated_at = datetime.utcnow()
-            
-            db.commit()
-            db.refresh(existing)
-            financial_data_record = existing
-            
-        else:
-            # Create new record
-            financial_data_record = FinancialData(
-                business_id=business_id,
-                period_start=period_start,
-                period_end=period_end,
-                fiscal_year=fiscal_year,
-                data_source='csv' if file.filename.endswith('.csv') else 'excel' if file.filename.endswith(('.xlsx', '.xls')) else 'pdf',
-                uploaded_file_path=file_path,
-                **{k: v for k, v in parsed_data.items() if k != 'document_type' and hasattr(FinancialData, k)}
-            )
-            
-            db.add(financial_data_record)
-            db.commit()
-            db.refresh(financial_data_record)
-        
-        # Trigger background analysis
-        background_tasks.add_task(
-            analyze_financial_data_background,
-            financial_data_record.id,
-            parsed_data,
-            business_id
+        # Create or update the record in one INSERT ... ON CONFLICT DO
+        # UPDATE against the (business_id, fiscal_year) unique constraint
+        # instead of a select/update-or-insert sequence
+        row = {
+            k: v for k, v in parsed_data.items()
+            if k not in ('document_type', 'raw_pdf_bytes') and hasattr(FinancialData, k)
+        }
+        row.update(
+            business_id=business_id,
+            fiscal_year=fiscal_year,
+            period_start=period_start,
+            period_end=period_end,
+            data_source=data_source,
+            uploaded_file_path=file_path,
+            updated_at=datetime.utcnow(),
         )
-        
+
+        stmt = _upsert(FinancialData).values(**row).on_conflict_do_update(
+            index_elements=['business_id', 'fiscal_year'],
+            set_=row
+        ).returning(FinancialData.id)
+
+        financial_data_id = await db.scalar(stmt)
+        await db.commit()
+
+        # Hand the analysis to a Celery worker so the API worker is free
+        # as soon as the response is sent; if no broker is reachable
+        # (e.g. local dev without Redis), fall back to an in-process task
+        try:
+            analyze_financial_data_background.delay(
+                financial_data_id,
+                business_id
+            )
+        except Exception:
+            background_tasks.add_task(
+                analyze_financial_data_background,
+                financial_data_id,
+                business_id
+            )
+
         return {
             "success": True,
             "message": "File uploaded successfully. AI analysis is in progress...",
-            "file_id": financial_data_record.id,
+            "file_id": financial_data_id,
             "filename": file.filename,
+            "content_hash": hasher.hexdigest(),
             "document_type": parsed_data.get('document_type', 'unknown'),
             "fiscal_year": fiscal_year,
-            "parsed_data": parsed_data,
+            "parsed_data": {k: v for k, v in parsed_data.items() if k != 'raw_pdf_bytes'},
             "analysis_status": "processing"
         }
-        
+
     except ValueError as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
 @router.get("/{financial_data_id}")
 async def get_financial_data_by_id(
     financial_data_id: int,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get specific financial data record"""
-    financial_data = db.query(FinancialData).filter(
-        FinancialData.id == financial_data_id
-    ).first()
-    
+    """Get specific financial data record
+
+    Supports the same ?fields= projection as the list endpoint
+    """
+    result = await db.execute(
+        select(*_projection(fields)).where(FinancialData.id == financial_data_id)
+    )
+    if fields:
+        financial_data = result.mappings().first()
+        financial_data = dict(financial_data) if financial_data else None
+    else:
+        financial_data = result.scalar()
+
     if not financial_data:
         raise HTTPException(status_code=404, detail="Financial data not found")
-    
+
     return {
         "success": True,
         "data": financial_data
@@ -284,23 +419,23 @@ async def get_financial_data_by_id(
 @router.delete("/{financial_data_id}")
 async def delete_financial_data(
     financial_data_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete financial data record"""
-    financial_data = db.query(FinancialData).filter(
-        FinancialData.id == financial_data_id
-    ).first()
-    
+    financial_data = await db.scalar(
+        select(FinancialData).where(FinancialData.id == financial_data_id)
+    )
+
     if not financial_data:
         raise HTTPException(status_code=404, detail="Financial data not found")
-    
-    # Delete file if exists
+
+    # Delete file if exists - off the event loop, large files take a while
     if financial_data.uploaded_file_path and os.path.exists(financial_data.uploaded_file_path):
-        os.remove(financial_data.uploaded_file_path)
-    
-    db.delete(financial_data)
-    db.commit()
-    
+        await asyncio.to_thread(os.remove, financial_data.uploaded_file_path)
+
+    await db.delete(financial_data)
+    await db.commit()
+
     return {
         "success": True,
         "message": "Financial data deleted successfully"
@@ -7,7 +7,7 @@ import json
 import io
 
 from app.core.database import get_db
-from app.models.assessment import FinancialAssessment
+from app.models.assessment import FinancialAssessment, FinancialAssessmentNarrative
 
 router = APIRouter()
 
@@ -25,14 +25,17 @@ async def generate_assessment_report(
     - pdf: PDF report (placeholder)
     - excel: Excel spreadsheet (placeholder)
     """
-    # Get assessment
-    assessment = db.query(FinancialAssessment).filter(
-        FinancialAssessment.id == assessment_id
-    ).first()
-    
-    if not assessment:
+    # Get assessment with its narrative payload in one joined query
+    result = db.query(FinancialAssessment, FinancialAssessmentNarrative).outerjoin(
+        FinancialAssessmentNarrative,
+        FinancialAssessmentNarrative.assessment_id == FinancialAssessment.id
+    ).filter(FinancialAssessment.id == assessment_id).first()
+
+    if not result:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    
+
+    assessment, narrative = result
+
     # Prepare report data - use getattr with defaults for optional fields
     report_data = {
         "assessment_id": assessment.id,
@@ -44,16 +47,16 @@ async def generate_assessment_report(
         "liquidity_score": getattr(assessment, 'liquidity_score', 0),
         "profitability_score": getattr(assessment, 'profitability_score', 0),
         "efficiency_score": getattr(assessment, 'efficiency_score', 0),
-        "ai_summary": getattr(assessment, 'ai_summary', ''),
-        "strengths": getattr(assessment, 'strengths', []),
-        "weaknesses": getattr(assessment, 'weaknesses', []),
-        "opportunities": getattr(assessment, 'opportunities', []),
-        "threats": getattr(assessment, 'threats', []),
-        "cost_optimization_recommendations": getattr(assessment, 'cost_optimization_recommendations', []),
-        "revenue_enhancement_recommendations": getattr(assessment, 'revenue_enhancement_recommendations', []),
-        "working_capital_recommendations": getattr(assessment, 'working_capital_recommendations', []),
-        "tax_optimization_recommendations": getattr(assessment, 'tax_optimization_recommendations', []),
-        "recommended_products": getattr(assessment, 'recommended_products', []),
+        "ai_summary": getattr(narrative, 'ai_summary', None) or '',
+        "strengths": getattr(narrative, 'strengths', None) or [],
+        "weaknesses": getattr(narrative, 'weaknesses', None) or [],
+        "opportunities": getattr(narrative, 'opportunities', None) or [],
+        "threats": getattr(narrative, 'threats', None) or [],
+        "cost_optimization_recommendations": getattr(narrative, 'cost_optimization_recommendations', None) or [],
+        "revenue_enhancement_recommendations": getattr(narrative, 'revenue_enhancement_recommendations', None) or [],
+        "working_capital_recommendations": getattr(narrative, 'working_capital_recommendations', None) or [],
+        "tax_optimization_recommendations": getattr(narrative, 'tax_optimization_recommendations', None) or [],
+        "recommended_products": getattr(narrative, 'recommended_products', None) or [],
         "financial_ratios": getattr(assessment, 'financial_ratios', {}),
     }
     
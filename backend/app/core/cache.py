@@ -0,0 +1,97 @@
+"""
+Redis-backed response cache for hot read endpoints
+Falls back to a no-op when Redis is unavailable so local development
+works without a running Redis instance
+"""
+from typing import Any, Optional
+import logging
+
+import orjson
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Default TTL for cached responses (seconds)
+DEFAULT_TTL = 300
+
+_client = None
+_unavailable = redis is None
+
+
+def _get_client():
+    """Lazily create the Redis client; disable caching on connection failure"""
+    global _client, _unavailable
+    if _unavailable:
+        return None
+    if _client is None:
+        try:
+            _client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+                decode_responses=True
+            )
+            _client.ping()
+        except Exception:
+            logger.warning("Redis unavailable at %s - response caching disabled", settings.REDIS_URL)
+            _client = None
+            _unavailable = True
+    return _client
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """Get a cached JSON value, or None on miss/unavailable cache"""
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        cached = client.get(key)
+        return orjson.loads(cached) if cached else None
+    except Exception:
+        return None
+
+
+def cache_set(key: str, value: Any, ttl: int = DEFAULT_TTL) -> None:
+    """Cache a JSON-serializable value with a TTL
+
+    Serialized with orjson so datetimes come out in the same ISO form
+    the uncached responses get from ORJSONResponse - a cache hit and a
+    miss must be byte-compatible to clients
+    """
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, orjson.dumps(value, default=str))
+    except Exception:
+        pass
+
+
+def cache_invalidate(*keys: str) -> None:
+    """Delete specific cache keys"""
+    client = _get_client()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception:
+        pass
+
+
+def cache_invalidate_prefix(prefix: str) -> None:
+    """Delete all cache keys under a prefix (e.g. one user's cached lists)"""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        keys = list(client.scan_iter(match=f"{prefix}*", count=100))
+        if keys:
+            client.delete(*keys)
+    except Exception:
+        pass
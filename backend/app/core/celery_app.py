@@ -0,0 +1,28 @@
+"""
+Celery application for background analysis tasks
+
+Runs the AI analysis pipeline outside the API process so a slow model
+call never pins an API worker. Workers start with:
+
+    celery -A app.core.celery_app worker --loglevel=info
+"""
+from celery import Celery
+
+from app.core.config import settings
+
+
+celery_app = Celery(
+    "fha",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+)
+
+# Register task modules
+celery_app.conf.imports = ("app.api.routes.financial_data",)
@@ -2,6 +2,7 @@
 Application Configuration
 Manages all environment variables and application settings
 """
+from functools import lru_cache
 from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
@@ -40,6 +41,14 @@ class Settings(BaseSettings):
     CLAUDE_API_KEY: Optional[str] = None
     AI_MODEL: str = "gemini-3-flash-preview"  # gemini-3-flash-preview, gemini-3-pro-preview, gpt-4, claude-3-opus
     GEMINI_THINKING_LEVEL: str = "medium"  # minimal, low, medium, high
+    # Max in-flight async calls per provider (tiers differ, so separate knobs)
+    AI_CONCURRENCY: int = 5
+    # Exponential-backoff retry policy for 429/quota errors
+    AI_MAX_RETRIES: int = 6
+    AI_RETRY_BASE_DELAY: float = 10.0  # seconds; delay = base * 2**attempt
+    # Race primary and fallback providers concurrently (lower p99, but
+    # bills the loser's partial tokens) - off by default to save cost
+    AI_PARALLEL_FALLBACK: bool = False
     
     # Banking APIs
     PLAID_CLIENT_ID: Optional[str] = None
@@ -66,6 +75,13 @@ class Settings(BaseSettings):
     AES_ENCRYPTION_KEY: str = "d3v-a3s-k3y-for-t3sting-only-32ch"
     
     # File Upload
+    # Parse CSV uploads with pyarrow's multi-threaded reader when the
+    # package is installed; off falls back to pandas' C parser
+    USE_ARROW_IO: bool = True
+    # Opt-in: read CSV/Excel uploads with polars' Rust readers (tried
+    # before the pyarrow/calamine paths). Off by default so installs
+    # without the package behave identically
+    USE_POLARS: bool = False
     MAX_UPLOAD_SIZE_MB: int = 50
     ALLOWED_EXTENSIONS: List[str] = ["csv", "xlsx", "pdf"]
     UPLOAD_FOLDER: str = "./uploads"
@@ -101,7 +117,16 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+        # Immutable after load - lets Pydantic skip change tracking and
+        # makes accidental runtime mutation an error
+        frozen = True
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance (built once)"""
+    return Settings()
 
 
 # Create settings instance
-settings = Settings()
+settings = get_settings()
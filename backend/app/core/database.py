@@ -1,26 +1,97 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import orjson
+from sqlalchemy import JSON, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 
+# JSON column type for models: binary jsonb on PostgreSQL (parsed once at
+# write time, supports indexable @> containment), plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+def _json_serializer(value) -> str:
+    """Encode JSON column values with orjson instead of stdlib json
+
+    orjson is a C extension and roughly halves the CPU cost of writing
+    the large narrative/benchmark JSON blobs
+    """
+    return orjson.dumps(value).decode()
+
+
+def _async_database_url(url: str) -> str:
+    """Map the configured DATABASE_URL onto its async driver"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
 
 # Create database engine
+# insertmanyvalues_page_size bounds how many rows a single batched
+# INSERT ... VALUES carries, so bulk ingest stays one (or few) round-trips
+# without building an unbounded statement
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     echo=settings.DEBUG,
+    insertmanyvalues_page_size=10_000,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    # The default 500-entry compiled-SQL cache thrashes with this many
+    # models/endpoints; a bigger bound keeps statement compilation out
+    # of the steady-state request path
+    query_cache_size=5000,
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps attribute access after commit() served from
+# the instances already in memory instead of re-SELECTing the row
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
 
-# Base class for models
-Base = declarative_base()
+# Async engine/session factory for endpoints that await their DB I/O
+# instead of blocking the event loop
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    insertmanyvalues_page_size=10_000,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    query_cache_size=5000,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if settings.DATABASE_URL.startswith("sqlite"):
+    # SQLite ships with FK enforcement off; turn it on so the ON DELETE
+    # CASCADE declarations behave the same as on PostgreSQL
+    def _sqlite_fk_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    event.listen(engine, "connect", _sqlite_fk_pragma)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_fk_pragma)
+
+# Base class for models (SQLAlchemy 2.0 declarative style)
+class Base(DeclarativeBase):
+    pass
 
 
 def get_db():
@@ -35,6 +106,15 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Async database session dependency for FastAPI
+    Yields an AsyncSession and ensures it's closed after use
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
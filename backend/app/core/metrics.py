@@ -0,0 +1,36 @@
+"""
+Prometheus metrics for the AI analysis path
+Cache hit rates and neighbour distances make the semantic-cache
+threshold tunable from data instead of guesswork; provider latency
+histograms show where analysis time actually goes. Scraped at /metrics
+"""
+from prometheus_client import Counter, Histogram
+
+
+AI_CACHE_HITS = Counter(
+    "ai_cache_hits_total",
+    "LLM response cache hits",
+    ["layer"],  # exact | semantic
+)
+
+AI_CACHE_MISSES = Counter(
+    "ai_cache_misses_total",
+    "LLM response cache misses",
+    ["layer"],
+)
+
+# Cosine distance of the nearest semantic-cache neighbour, recorded on
+# every lookup that reaches the vector index. The mass near/above the
+# match threshold shows whether it should move
+AI_CACHE_DISTANCE = Histogram(
+    "ai_cache_semantic_distance",
+    "Cosine distance of nearest semantic-cache neighbour",
+    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0),
+)
+
+AI_LLM_LATENCY = Histogram(
+    "ai_llm_latency_seconds",
+    "Wall time of LLM provider calls",
+    ["provider"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
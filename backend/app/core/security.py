@@ -3,17 +3,32 @@ Security utilities for authentication, authorization, and encryption
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
 from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cachetools import TTLCache
+from threading import RLock
+import asyncio
 import base64
+import hmac
 import os
+import secrets
+import time
 
 from app.core.config import settings
 
 
+# Hot-path settings bound to module constants once at import - token
+# encode/decode skips Pydantic attribute lookup entirely
+JWT_KEY_BYTES = settings.JWT_SECRET_KEY.encode()
+_JWT_ALG = settings.JWT_ALGORITHM
+_ACCESS_MIN = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+_REFRESH_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+
+
 # Password hashing - use argon2 instead of bcrypt to avoid 72-byte limit
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -28,6 +43,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so argon2 doesn't block the event loop"""
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password in a worker thread so argon2 doesn't block the event loop"""
+    return await asyncio.to_thread(pwd_context.hash, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
@@ -43,10 +68,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=_ACCESS_MIN)
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY_BYTES, algorithm=_JWT_ALG)
     return encoded_jwt
 
 
@@ -61,28 +86,43 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
         Encoded JWT refresh token
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + timedelta(days=_REFRESH_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY_BYTES, algorithm=_JWT_ALG)
     return encoded_jwt
 
 
+# Verified-token cache: the same token arrives on every request from a
+# client for its whole lifetime, so skip the HMAC + JSON work on repeats.
+# Entries are re-checked against their own exp before being served.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_token_cache_lock = RLock()
+
+
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode and validate JWT token
-    
+
     Args:
         token: JWT token to decode
-    
+
     Returns:
         Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+    if payload is not None and payload.get("exp", 0) > time.time():
         return payload
-    except JWTError:
+
+    try:
+        payload = jwt.decode(token, JWT_KEY_BYTES, algorithms=[_JWT_ALG])
+    except jwt.InvalidTokenError:
         return None
 
+    with _token_cache_lock:
+        _token_cache[token] = payload
+    return payload
+
 
 # Data Encryption using Fernet (symmetric encryption)
 class DataEncryption:
@@ -90,64 +130,79 @@ class DataEncryption:
     
     def __init__(self):
         self.fernet = Fernet(settings.ENCRYPTION_KEY.encode())
-    
+
     def encrypt(self, data: str) -> str:
         """Encrypt string data"""
         if not data:
             return data
-        encrypted = self.fernet.encrypt(data.encode())
-        return base64.b64encode(encrypted).decode()
-    
+        # Fernet tokens are already urlsafe base64 - no second encode needed
+        return self.fernet.encrypt(data.encode()).decode()
+
     def decrypt(self, encrypted_data: str) -> str:
         """Decrypt string data"""
         if not encrypted_data:
             return encrypted_data
         try:
-            decoded = base64.b64decode(encrypted_data.encode())
-            decrypted = self.fernet.decrypt(decoded)
-            return decrypted.decode()
-        except Exception as e:
-            raise ValueError(f"Decryption failed: {str(e)}")
+            return self.fernet.decrypt(encrypted_data.encode()).decode()
+        except Exception:
+            # Older values were wrapped in an extra base64 layer
+            try:
+                decoded = base64.b64decode(encrypted_data.encode())
+                return self.fernet.decrypt(decoded).decode()
+            except Exception as e:
+                raise ValueError(f"Decryption failed: {str(e)}")
 
 
 # AES Encryption for file data
 class AESEncryption:
-    """AES-256 encryption for files and large data"""
-    
+    """AES-256-GCM encryption for files and large data
+
+    GCM runs on the AES-NI/PCLMULQDQ fast path in OpenSSL, needs no
+    Python-level padding (so no full plaintext copy) and authenticates
+    the ciphertext
+    """
+
+    NONCE_SIZE = 12
+
     def __init__(self):
         self.key = settings.AES_ENCRYPTION_KEY.encode()[:32]  # Ensure 32 bytes for AES-256
-    
-    def encrypt(self, data: bytes) -> bytes:
-        """Encrypt bytes data using AES-256"""
-        iv = os.urandom(16)
-        cipher = Cipher(
-            algorithms.AES(self.key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        
-        # Pad data to be multiple of 16 bytes
-        padding_length = 16 - (len(data) % 16)
-        padded_data = data + (bytes([padding_length]) * padding_length)
-        
-        encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
-        return iv + encrypted_data
-    
+        self.aead = AESGCM(self.key)
+        # Key schedule for the legacy CBC fallback, computed once
+        self._legacy_algo = algorithms.AES(self.key)
+
+    def encrypt(self, data: bytes, nonce: Optional[bytes] = None) -> bytes:
+        """Encrypt bytes data using AES-256-GCM"""
+        if nonce is None:
+            nonce = os.urandom(self.NONCE_SIZE)
+        return nonce + self.aead.encrypt(nonce, data, None)
+
+    def encrypt_many(self, items: list) -> list:
+        """Encrypt a batch of byte strings with one urandom call for all nonces"""
+        n = self.NONCE_SIZE
+        nonce_pool = os.urandom(n * len(items))
+        return [
+            self.encrypt(data, nonce=nonce_pool[i * n:(i + 1) * n])
+            for i, data in enumerate(items)
+        ]
+
     def decrypt(self, encrypted_data: bytes) -> bytes:
-        """Decrypt bytes data using AES-256"""
+        """Decrypt bytes data, falling back to the legacy CBC format"""
+        try:
+            nonce = encrypted_data[:self.NONCE_SIZE]
+            return self.aead.decrypt(nonce, encrypted_data[self.NONCE_SIZE:], None)
+        except InvalidTag:
+            return self._decrypt_legacy_cbc(encrypted_data)
+
+    def _decrypt_legacy_cbc(self, encrypted_data: bytes) -> bytes:
+        """Decrypt data written by the old AES-256-CBC implementation"""
         iv = encrypted_data[:16]
         encrypted_content = encrypted_data[16:]
-        
-        cipher = Cipher(
-            algorithms.AES(self.key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
+
+        cipher = Cipher(self._legacy_algo, modes.CBC(iv))
         decryptor = cipher.decryptor()
-        
+
         decrypted_padded = decryptor.update(encrypted_content) + decryptor.finalize()
-        
+
         # Remove padding
         padding_length = decrypted_padded[-1]
         return decrypted_padded[:-padding_length]
@@ -180,7 +235,15 @@ def decrypt_file_data(encrypted_data: bytes) -> bytes:
 
 def generate_api_key() -> str:
     """Generate a random API key for external integrations"""
-    return base64.urlsafe_b64encode(os.urandom(32)).decode()
+    # secrets.token_urlsafe does urandom + base64 + decode in one call
+    return secrets.token_urlsafe(32)
+
+
+def verify_api_key(provided_key: str, stored_key: Optional[str]) -> bool:
+    """Compare an API key in constant time to avoid a timing side-channel"""
+    if not provided_key or not stored_key:
+        return False
+    return hmac.compare_digest(provided_key, stored_key)
 
 
 def mask_sensitive_info(data: str, visible_chars: int = 4) -> str:
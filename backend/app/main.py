@@ -4,15 +4,19 @@ Financial Health Assessment Tool for SMEs
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from prometheus_client import make_asgi_app
+from sqlalchemy import text
+from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.services.ai_analysis import get_ai_service
 from app.api.routes import auth, business, financial_data, assessment, reports
 
 # Configure logging
@@ -26,7 +30,42 @@ logger = logging.getLogger(__name__)
 Path(settings.UPLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
 
 # Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Redis-backed so all workers enforce one shared budget (the default
+# in-memory storage counts per process); moving-window costs a single
+# Redis round-trip per request. Falls back to per-process counters if
+# Redis is down.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.REDIS_URL,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks for database checks and AI client lifecycle"""
+    logger.info("Starting Financial Health Assessment Tool...")
+    if settings.ENVIRONMENT == "production":
+        # Schema is managed by migrations at deploy time; with multiple
+        # workers booting together, per-process create_all would issue a
+        # reflection round-trip per table and can race on index creation.
+        # A single ping is enough to fail fast on a bad DB config.
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        logger.info("Database connection verified")
+    else:
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+
+    # Build provider clients at startup (not import) and close their
+    # HTTP sessions on shutdown so sockets don't leak across reloads
+    app.state.ai = get_ai_service()
+
+    yield
+
+    logger.info("Shutting down Financial Health Assessment Tool...")
+    await app.state.ai.aclose()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -34,9 +73,15 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="AI-powered financial health assessment platform for SMEs",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Prometheus scrape endpoint (cache hit rates, LLM latency - see
+# app.core.metrics)
+app.mount("/metrics", make_asgi_app())
+
 # Add rate limiter
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -51,21 +96,6 @@ app.add_middleware(
 )
 
 
-# Create database tables
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and perform startup tasks"""
-    logger.info("Starting Financial Health Assessment Tool...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup tasks on shutdown"""
-    logger.info("Shutting down Financial Health Assessment Tool...")
-
-
 # Exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -135,10 +165,16 @@ app.include_router(
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
+    # uvloop + httptools skip the pure-Python selector/parser layers;
+    # reload mode keeps a single worker since the two options conflict
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.DEBUG else (os.cpu_count() or 1),
         reload=settings.DEBUG
     )
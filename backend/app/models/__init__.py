@@ -5,6 +5,7 @@ from app.models.user import User, UserRole
 from app.models.business import Business, FinancialData, Transaction, IndustryType, BusinessSize
 from app.models.assessment import (
     FinancialAssessment,
+    FinancialAssessmentNarrative,
     FinancialReport,
     IndustryBenchmark,
     RiskLevel,
@@ -20,6 +21,7 @@ __all__ = [
     "IndustryType",
     "BusinessSize",
     "FinancialAssessment",
+    "FinancialAssessmentNarrative",
     "FinancialReport",
     "IndustryBenchmark",
     "RiskLevel",
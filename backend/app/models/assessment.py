@@ -1,12 +1,15 @@
 """
 Financial Assessment and Report models
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, CheckConstraint, Computed, Index, SmallInteger, desc, event, func, select, text
+from sqlalchemy.orm import relationship, validates
+from cachetools import LRUCache
+from collections import namedtuple
 from datetime import datetime
 import enum
 
-from app.core.database import Base
+from app.core.cache import cache_get, cache_set, cache_invalidate
+from app.core.database import Base, JSONType
 
 
 class RiskLevel(str, enum.Enum):
@@ -31,15 +34,72 @@ class CreditRating(str, enum.Enum):
     D = "D"      # Default
 
 
+# Sortable integer tier per rating (0=D ... 9=AAA); "investment grade"
+# becomes credit_tier >= 6, a B-tree range scan
+CREDIT_TIER = {
+    rating.value: tier
+    for tier, rating in enumerate(reversed(list(CreditRating)))
+}
+
+
 class FinancialAssessment(Base):
     """AI-powered financial health assessment"""
     __tablename__ = "financial_assessments"
-    
+    __table_args__ = (
+        # Covers the hot "newest assessments for a business" scan and the
+        # keyset pagination cursor (business_id, assessment_date DESC, id DESC)
+        Index(
+            "ix_fa_business_date",
+            "business_id",
+            desc("assessment_date"),
+            desc("id")
+        ),
+        # Varchar + CHECK rather than native PG enums - cheap to extend
+        # and no enum OID lookup per insert
+        CheckConstraint(
+            "credit_rating IN ({})".format(
+                ",".join(f"'{m.value}'" for m in CreditRating)
+            ),
+            name="ck_assessment_credit_rating",
+        ),
+        CheckConstraint(
+            "risk_level IN ({})".format(
+                ",".join(f"'{m.value}'" for m in RiskLevel)
+            ),
+            name="ck_assessment_risk_level",
+        ),
+        # At-risk dashboards only ever read high/critical rows; a partial
+        # index keeps that scan tiny regardless of total assessment volume
+        Index(
+            "ix_fa_high_risk",
+            "business_id",
+            "assessment_date",
+            sqlite_where=text("risk_level IN ('high','critical')"),
+            postgresql_where=text("risk_level IN ('high','critical')"),
+        ),
+        # "latest assessment above rating threshold" queries range-scan
+        # the integer tier instead of comparing enum label strings
+        Index(
+            "ix_fa_credit_tier",
+            "business_id",
+            desc("credit_tier"),
+            desc("assessment_date"),
+        ),
+        # Same dashboard scan keyed off the generated score bucket
+        Index(
+            "ix_fa_risk_bucket",
+            "business_id",
+            "assessment_date",
+            sqlite_where=text("risk_bucket IN ('high','critical')"),
+            postgresql_where=text("risk_bucket IN ('high','critical')"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     
     # Assessment period
-    assessment_date = Column(DateTime, default=datetime.utcnow)
+    assessment_date = Column(DateTime(timezone=True), server_default=func.now())
     period_start = Column(DateTime, nullable=False)
     period_end = Column(DateTime, nullable=False)
     
@@ -50,9 +110,35 @@ class FinancialAssessment(Base):
     profitability_score = Column(Float, nullable=False)
     efficiency_score = Column(Float, nullable=False)
     
-    # Credit rating
-    credit_rating = Column(Enum(CreditRating), nullable=False)
-    risk_level = Column(Enum(RiskLevel), nullable=False)
+    # Credit rating (value strings; CHECK constraints enforce the set)
+    credit_rating = Column(String(3), nullable=False)
+    risk_level = Column(String(8), nullable=False)
+    # Integer rating tier generated from credit_rating; the string label
+    # stays for display, sorts and threshold filters use this column
+    credit_tier = Column(
+        SmallInteger,
+        Computed(
+            "CASE credit_rating {} END".format(
+                " ".join(
+                    f"WHEN '{rating}' THEN {tier}"
+                    for rating, tier in CREDIT_TIER.items()
+                )
+            ),
+            persisted=True,
+        ),
+    )
+    # Score bucket computed by the database at write time (stored
+    # generated column) so reads never re-derive it in Python
+    risk_bucket = Column(
+        String(8),
+        Computed(
+            "CASE WHEN overall_health_score >= 75 THEN 'low' "
+            "WHEN overall_health_score >= 50 THEN 'moderate' "
+            "WHEN overall_health_score >= 25 THEN 'high' "
+            "ELSE 'critical' END",
+            persisted=True,
+        ),
+    )
     
     # Financial ratios
     current_ratio = Column(Float, nullable=True)
@@ -77,21 +163,101 @@ class FinancialAssessment(Base):
     operating_cash_flow_ratio = Column(Float, nullable=True)
     free_cash_flow = Column(Float, nullable=True)
     
+    # Industry benchmarking
+    percentile_rank = Column(Float, nullable=True)  # 0-100
+
+    # Forecasting
+    revenue_forecast_3m = Column(Float, nullable=True)
+    revenue_forecast_6m = Column(Float, nullable=True)
+    revenue_forecast_12m = Column(Float, nullable=True)
+    cash_flow_forecast_3m = Column(Float, nullable=True)
+
+    # Compliance
+    tax_compliance_score = Column(Float, nullable=True)  # 0-100
+
+    # AI model metadata
+    ai_model_used = Column(String(64), nullable=True)  # "gpt-4", "claude-3-opus"
+    ai_confidence_score = Column(Float, nullable=True)  # 0-1
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    business = relationship("Business", back_populates="assessments")
+    # lazy="raise" so an accidental lazy load of the heavy payload fails
+    # loudly - detail endpoints must join the narrative explicitly
+    narrative = relationship(
+        "FinancialAssessmentNarrative",
+        uselist=False,
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        back_populates="assessment",
+    )
+
+    @validates("credit_rating", "risk_level")
+    def _coerce_enum(self, key, value):
+        """Accept enum members on assignment, store their value strings"""
+        return value.value if isinstance(value, enum.Enum) else value
+
+    @classmethod
+    def list_scores(cls, session, business_id: int, limit: int = 100):
+        """Scoreboard rows as plain dicts, skipping ORM hydration
+
+        Dashboard listings serialize straight to JSON, so this selects
+        just the score columns and returns row mappings instead of
+        identity-mapped instances
+        """
+        stmt = (
+            select(
+                cls.id,
+                cls.assessment_date,
+                cls.overall_health_score,
+                cls.creditworthiness_score,
+                cls.liquidity_score,
+                cls.profitability_score,
+                cls.efficiency_score,
+                cls.credit_rating,
+                cls.risk_level,
+                cls.risk_bucket,
+            )
+            .where(cls.business_id == business_id)
+            .order_by(cls.assessment_date.desc(), cls.id.desc())
+            .limit(limit)
+        )
+        return [dict(row) for row in session.execute(stmt).mappings()]
+
+
+class FinancialAssessmentNarrative(Base):
+    """Cold AI-generated payload of an assessment, split from the scalars
+
+    Scoreboard and list queries scan the narrow financial_assessments
+    rows; the large JSON/text payloads live here and are only joined in
+    for single-record detail reads
+    """
+    __tablename__ = "financial_assessment_narratives"
+
+    assessment_id = Column(
+        Integer,
+        ForeignKey("financial_assessments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
     # AI-generated insights
     ai_summary = Column(Text, nullable=True)
-    strengths = Column(JSON, nullable=True)  # List of strengths
-    weaknesses = Column(JSON, nullable=True)  # List of weaknesses
-    opportunities = Column(JSON, nullable=True)  # List of opportunities
-    threats = Column(JSON, nullable=True)  # List of threats
-    
+    strengths = Column(JSONType, nullable=True)  # List of strengths
+    weaknesses = Column(JSONType, nullable=True)  # List of weaknesses
+    opportunities = Column(JSONType, nullable=True)  # List of opportunities
+    threats = Column(JSONType, nullable=True)  # List of threats
+
     # Recommendations
-    cost_optimization_recommendations = Column(JSON, nullable=True)
-    revenue_enhancement_recommendations = Column(JSON, nullable=True)
-    working_capital_recommendations = Column(JSON, nullable=True)
-    tax_optimization_recommendations = Column(JSON, nullable=True)
-    
+    cost_optimization_recommendations = Column(JSONType, nullable=True)
+    revenue_enhancement_recommendations = Column(JSONType, nullable=True)
+    working_capital_recommendations = Column(JSONType, nullable=True)
+    tax_optimization_recommendations = Column(JSONType, nullable=True)
+
     # Financial product recommendations
-    recommended_products = Column(JSON, nullable=True)
+    recommended_products = Column(JSONType, nullable=True)
     """
     Example:
     [
@@ -104,34 +270,19 @@ class FinancialAssessment(Base):
         }
     ]
     """
-    
+
     # Risk assessment
-    identified_risks = Column(JSON, nullable=True)
-    risk_mitigation_strategies = Column(JSON, nullable=True)
-    
+    identified_risks = Column(JSONType, nullable=True)
+    risk_mitigation_strategies = Column(JSONType, nullable=True)
+
     # Industry benchmarking
-    industry_comparison = Column(JSON, nullable=True)
-    percentile_rank = Column(Float, nullable=True)  # 0-100
-    
-    # Forecasting
-    revenue_forecast_3m = Column(Float, nullable=True)
-    revenue_forecast_6m = Column(Float, nullable=True)
-    revenue_forecast_12m = Column(Float, nullable=True)
-    cash_flow_forecast_3m = Column(Float, nullable=True)
-    
+    industry_comparison = Column(JSONType, nullable=True)
+
     # Compliance
-    tax_compliance_score = Column(Float, nullable=True)  # 0-100
-    compliance_issues = Column(JSON, nullable=True)
-    
-    # AI model metadata
-    ai_model_used = Column(String, nullable=True)  # "gpt-4", "claude-3-opus"
-    ai_confidence_score = Column(Float, nullable=True)  # 0-1
-    
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+    compliance_issues = Column(JSONType, nullable=True)
+
     # Relationships
-    business = relationship("Business", back_populates="assessments")
+    assessment = relationship("FinancialAssessment", back_populates="narrative")
 
 
 class FinancialReport(Base):
@@ -139,16 +290,16 @@ class FinancialReport(Base):
     __tablename__ = "financial_reports"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     assessment_id = Column(Integer, ForeignKey("financial_assessments.id"), nullable=True)
     
     # Report details
     report_name = Column(String, nullable=False)
-    report_type = Column(String, nullable=False)  # "investor", "bank", "tax", "compliance"
-    language = Column(String, default="en")  # "en", "hi", etc.
+    report_type = Column(String(16), nullable=False)  # "investor", "bank", "tax", "compliance"
+    language = Column(String(5), default="en")  # "en", "hi", etc.
     
     # Content
-    report_data = Column(JSON, nullable=False)
+    report_data = Column(JSONType, nullable=False)
     summary = Column(Text, nullable=True)
     
     # File storage
@@ -157,15 +308,27 @@ class FinancialReport(Base):
     
     # Metadata
     is_public = Column(Boolean, default=False)
-    generated_at = Column(DateTime, default=datetime.utcnow)
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="financial_reports")
 
 
+# Fixed order of the median metrics; comparison code treats a benchmark
+# row as one vector (np.asarray(benchmark.medians)) instead of nine
+# attribute loads
+_MEDIAN_FIELDS = (
+    "current_ratio_median", "debt_to_equity_median", "gross_margin_median",
+    "net_margin_median", "roa_median", "roe_median",
+    "inventory_turnover_median", "receivables_days_median",
+    "payables_days_median",
+)
+IndexedMedians = namedtuple("IndexedMedians", _MEDIAN_FIELDS)
+
+
 class IndustryBenchmark(Base):
     """Industry-specific benchmark data"""
     __tablename__ = "industry_benchmarks"
@@ -173,8 +336,8 @@ class IndustryBenchmark(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Industry classification
-    industry = Column(String, nullable=False, index=True)
-    business_size = Column(String, nullable=False)  # "micro", "small", "medium"
+    industry = Column(String(16), nullable=False, index=True)
+    business_size = Column(String(8), nullable=False)  # "micro", "small", "medium"
     
     # Period
     year = Column(Integer, nullable=False)
@@ -192,7 +355,7 @@ class IndustryBenchmark(Base):
     payables_days_median = Column(Integer, nullable=True)
     
     # Percentile data
-    percentile_data = Column(JSON, nullable=True)
+    percentile_data = Column(JSONType, nullable=True)
     """
     Example:
     {
@@ -203,6 +366,66 @@ class IndustryBenchmark(Base):
     
     # Sample size
     sample_size = Column(Integer, nullable=True)
-    
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def medians(self) -> IndexedMedians:
+        """The nine median metrics as one fixed-order tuple"""
+        return IndexedMedians(*(getattr(self, f) for f in _MEDIAN_FIELDS))
+
+    @classmethod
+    def get_cached(cls, session, industry: str, business_size: str,
+                   year: int, quarter=None):
+        """Fetch a benchmark row as a dict through the two cache tiers
+
+        Benchmarks are read on every assessment but rewritten at most
+        quarterly, so lookups go process-local LRU -> Redis -> SQL; the
+        Redis entry lives for 7 days and both tiers are dropped when a
+        benchmark row is written
+        """
+        key = (industry, business_size, year, quarter)
+        payload = _benchmark_l1.get(key)
+        if payload is not None:
+            return payload
+
+        redis_key = f"fha:bench:{industry}:{business_size}:{year}:{quarter}"
+        payload = cache_get(redis_key)
+        if payload is None:
+            row = session.execute(
+                select(cls).where(
+                    cls.industry == industry,
+                    cls.business_size == business_size,
+                    cls.year == year,
+                    cls.quarter == quarter,
+                )
+            ).scalar()
+            if row is None:
+                return None
+            payload = {f: getattr(row, f) for f in _BENCHMARK_FIELDS}
+            cache_set(redis_key, payload, ttl=7 * 24 * 3600)
+
+        _benchmark_l1[key] = payload
+        return payload
+
+
+# Benchmark cache plumbing: fields served to assessment code, a small
+# process-local L1 in front of Redis, and write-through invalidation
+_BENCHMARK_FIELDS = (
+    "current_ratio_median", "debt_to_equity_median", "gross_margin_median",
+    "net_margin_median", "roa_median", "roe_median",
+    "inventory_turnover_median", "receivables_days_median",
+    "payables_days_median", "percentile_data", "sample_size",
+)
+_benchmark_l1: LRUCache = LRUCache(maxsize=512)
+
+
+@event.listens_for(IndustryBenchmark, "after_insert")
+@event.listens_for(IndustryBenchmark, "after_update")
+def _invalidate_benchmark_cache(mapper, connection, target):
+    """Drop both cache tiers when a benchmark row changes"""
+    _benchmark_l1.clear()
+    cache_invalidate(
+        f"fha:bench:{target.industry}:{target.business_size}:{target.year}:{target.quarter}"
+    )
@@ -1,12 +1,16 @@
 """
 Business and Financial models
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Numeric, DateTime, ForeignKey, MetaData, Table, Text, Boolean, CheckConstraint, Index, UniqueConstraint, desc, func, insert, select, update
+from sqlalchemy.orm import load_only, relationship, selectinload, validates
 from datetime import datetime
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, JSONType
+
+# Money columns: exact NUMERIC storage in the database, plain floats on the
+# Python side (asdecimal=False) so ratio arithmetic stays Decimal-free
+Money = Numeric(18, 2, asdecimal=False)
 
 
 class IndustryType(str, enum.Enum):
@@ -31,55 +35,129 @@ class BusinessSize(str, enum.Enum):
     MEDIUM = "medium"  # 50-250 employees
 
 
+# Serialization lookups for hot loops, with the serving defaults baked in
+# for NULL columns. The columns store plain value strings (see below), but
+# enum members are accepted as keys too since they are str subclasses
+INDUSTRY_VALUES = {m.value: m.value for m in IndustryType}
+INDUSTRY_VALUES[None] = "other"
+
+BUSINESS_SIZE_VALUES = {m.value: m.value for m in BusinessSize}
+BUSINESS_SIZE_VALUES[None] = "small"
+
+
 class Business(Base):
     """Business entity model"""
     __tablename__ = "businesses"
-    
+    __table_args__ = (
+        # Plain varchar + CHECK instead of a native PG enum type: no ALTER
+        # TYPE on new values and no per-insert enum OID lookup
+        CheckConstraint(
+            "industry IN ({})".format(
+                ",".join(f"'{m.value}'" for m in IndustryType)
+            ),
+            name="ck_business_industry",
+        ),
+        CheckConstraint(
+            "business_size IN ({})".format(
+                ",".join(f"'{m.value}'" for m in BusinessSize)
+            ),
+            name="ck_business_size",
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Basic information
     business_name = Column(String, nullable=False)
     legal_name = Column(String, nullable=True)
     registration_number = Column(String, nullable=True)
-    gst_number = Column(String, nullable=True, index=True)
-    pan_number = Column(String, nullable=True)
+    gst_number = Column(String(15), nullable=True, index=True)
+    pan_number = Column(String(10), nullable=True)
     
-    # Classification
-    industry = Column(Enum(IndustryType), nullable=False)
-    business_size = Column(Enum(BusinessSize), default=BusinessSize.SMALL)
+    # Classification (value strings; CHECK constraints enforce the set)
+    industry = Column(String(16), nullable=False)
+    business_size = Column(String(8), default=BusinessSize.SMALL.value)
     
     # Contact information
     address = Column(Text, nullable=True)
     city = Column(String, nullable=True)
     state = Column(String, nullable=True)
-    pincode = Column(String, nullable=True)
-    phone = Column(String, nullable=True)
+    pincode = Column(String(6), nullable=True)
+    phone = Column(String(20), nullable=True)
     email = Column(String, nullable=True)
     website = Column(String, nullable=True)
     
     # Business metrics
-    annual_revenue = Column(Float, nullable=True)
+    annual_revenue = Column(Money, nullable=True)
     employee_count = Column(Integer, nullable=True)
     established_year = Column(Integer, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # Relationships
+    # Relationships. Deletes cascade in the database (ON DELETE CASCADE on
+    # the child FKs); passive_deletes keeps the ORM from loading every
+    # child row just to emit per-row DELETEs. Collections are
+    # lazy="raise_on_sql" so an accidental iteration can't fan out into
+    # an N+1 - callers state their intent with an explicit loader
     owner = relationship("User", back_populates="businesses")
-    financial_data = relationship("FinancialData", back_populates="business", cascade="all, delete-orphan")
-    assessments = relationship("FinancialAssessment", back_populates="business", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="business", cascade="all, delete-orphan")
+    financial_data = relationship("FinancialData", back_populates="business", cascade="save-update, merge", passive_deletes=True, lazy="raise_on_sql")
+    assessments = relationship("FinancialAssessment", back_populates="business", cascade="save-update, merge", passive_deletes=True, lazy="raise_on_sql")
+    transactions = relationship("Transaction", back_populates="business", cascade="save-update, merge", passive_deletes=True, lazy="raise_on_sql")
+
+    @validates("industry", "business_size")
+    def _coerce_enum(self, key, value):
+        """Accept enum members on assignment, store their value strings"""
+        return value.value if isinstance(value, enum.Enum) else value
+
+    @classmethod
+    def with_latest_financials(cls, session, user_id: int = None):
+        """Businesses with financial_data batch-preloaded
+
+        Collections are lazy="raise_on_sql", so list views that walk
+        .financial_data come through here: one selectinload batch query
+        carrying only the columns the dashboards actually read
+        """
+        stmt = select(cls).options(
+            selectinload(cls.financial_data).options(
+                load_only(
+                    FinancialData.period_end,
+                    FinancialData.total_revenue,
+                    FinancialData.total_assets,
+                )
+            )
+        )
+        if user_id is not None:
+            stmt = stmt.where(cls.user_id == user_id)
+        return session.execute(stmt).scalars().all()
 
 
 class FinancialData(Base):
     """Financial statements and data"""
     __tablename__ = "financial_data"
-    
+    __table_args__ = (
+        # One statement per business per fiscal year; upload upserts
+        # target this constraint
+        UniqueConstraint("business_id", "fiscal_year", name="uq_financial_data_business_year"),
+        # Covers "latest financials for a business"; on PostgreSQL the
+        # INCLUDE payload carries the ratio inputs so the scan never
+        # touches the heap (index-only, Heap Fetches: 0)
+        Index(
+            "ix_findata_biz_period",
+            "business_id",
+            desc("period_end"),
+            postgresql_include=[
+                "total_revenue", "total_expenses", "total_assets",
+                "total_liabilities", "current_assets", "current_liabilities",
+                "cash_and_equivalents", "inventory",
+            ],
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     
     # Period information
     period_start = Column(DateTime, nullable=False)
@@ -88,67 +166,124 @@ class FinancialData(Base):
     quarter = Column(Integer, nullable=True)  # 1-4 for quarterly data
     
     # Revenue
-    total_revenue = Column(Float, default=0.0)
-    revenue_breakdown = Column(JSON, nullable=True)  # {"product_a": 1000, "service_b": 2000}
+    total_revenue = Column(Money, default=0)
+    revenue_breakdown = Column(JSONType, nullable=True)  # {"product_a": 1000, "service_b": 2000}
     
     # Expenses
-    total_expenses = Column(Float, default=0.0)
-    cost_of_goods_sold = Column(Float, default=0.0)
-    operating_expenses = Column(Float, default=0.0)
-    salaries_wages = Column(Float, default=0.0)
-    rent = Column(Float, default=0.0)
-    utilities = Column(Float, default=0.0)
-    marketing = Column(Float, default=0.0)
-    other_expenses = Column(Float, default=0.0)
-    expense_breakdown = Column(JSON, nullable=True)
+    total_expenses = Column(Money, default=0)
+    cost_of_goods_sold = Column(Money, default=0)
+    operating_expenses = Column(Money, default=0)
+    salaries_wages = Column(Money, default=0)
+    rent = Column(Money, default=0)
+    utilities = Column(Money, default=0)
+    marketing = Column(Money, default=0)
+    other_expenses = Column(Money, default=0)
+    expense_breakdown = Column(JSONType, nullable=True)
     
     # Assets
-    total_assets = Column(Float, default=0.0)
-    current_assets = Column(Float, default=0.0)
-    cash_and_equivalents = Column(Float, default=0.0)
-    accounts_receivable = Column(Float, default=0.0)
-    inventory = Column(Float, default=0.0)
-    fixed_assets = Column(Float, default=0.0)
+    total_assets = Column(Money, default=0)
+    current_assets = Column(Money, default=0)
+    cash_and_equivalents = Column(Money, default=0)
+    accounts_receivable = Column(Money, default=0)
+    inventory = Column(Money, default=0)
+    fixed_assets = Column(Money, default=0)
     
     # Liabilities
-    total_liabilities = Column(Float, default=0.0)
-    current_liabilities = Column(Float, default=0.0)
-    accounts_payable = Column(Float, default=0.0)
-    short_term_debt = Column(Float, default=0.0)
-    long_term_debt = Column(Float, default=0.0)
+    total_liabilities = Column(Money, default=0)
+    current_liabilities = Column(Money, default=0)
+    accounts_payable = Column(Money, default=0)
+    short_term_debt = Column(Money, default=0)
+    long_term_debt = Column(Money, default=0)
     
     # Equity
-    owners_equity = Column(Float, default=0.0)
+    owners_equity = Column(Money, default=0)
     
     # Cash Flow
-    operating_cash_flow = Column(Float, default=0.0)
-    investing_cash_flow = Column(Float, default=0.0)
-    financing_cash_flow = Column(Float, default=0.0)
+    operating_cash_flow = Column(Money, default=0)
+    investing_cash_flow = Column(Money, default=0)
+    financing_cash_flow = Column(Money, default=0)
     
     # Tax information
-    tax_paid = Column(Float, default=0.0)
-    tax_deductions = Column(Float, default=0.0)
-    gst_collected = Column(Float, default=0.0)
-    gst_paid = Column(Float, default=0.0)
+    tax_paid = Column(Money, default=0)
+    tax_deductions = Column(Money, default=0)
+    gst_collected = Column(Money, default=0)
+    gst_paid = Column(Money, default=0)
     
     # Metadata
-    data_source = Column(String, nullable=True)  # "manual", "csv", "api", "gst"
+    data_source = Column(String(16), nullable=True)  # "manual", "csv", "api", "gst"
     is_verified = Column(Boolean, default=False)
     uploaded_file_path = Column(String, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     business = relationship("Business", back_populates="financial_data")
 
+    @classmethod
+    def bulk_create(cls, session, records: list) -> list:
+        """Insert a batch of financial records in one round-trip
+
+        One INSERT ... VALUES ... RETURNING id for the whole batch instead
+        of the per-row INSERT + refresh cycle of add_all/flush
+        """
+        return session.execute(
+            insert(cls).returning(cls.id), records
+        ).scalars().all()
+
+    @classmethod
+    def iter_for_business(cls, session, business_id: int):
+        """Stream a business's financial records without materializing them
+
+        stream_results opens a server-side cursor on PostgreSQL and
+        yield_per hydrates rows in batches, keeping memory at one batch
+        instead of the whole history
+        """
+        return session.execute(
+            select(cls).where(cls.business_id == business_id)
+            .order_by(cls.period_end)
+            .execution_options(stream_results=True, yield_per=1000)
+        ).scalars()
+
+    @classmethod
+    def recompute_ratios(cls, session, business_id: int) -> None:
+        """Recompute stored assessment ratios for a business in the database
+
+        One UPDATE ... FROM joins each assessment to its financial period
+        and derives the ratios server-side - no pulling 24 numeric columns
+        per row into Python and shipping results back
+        """
+        from app.models.assessment import FinancialAssessment
+
+        session.execute(
+            update(FinancialAssessment)
+            .where(
+                FinancialAssessment.business_id == business_id,
+                cls.business_id == FinancialAssessment.business_id,
+                cls.period_end == FinancialAssessment.period_end,
+            )
+            .values(
+                current_ratio=cls.current_assets / func.nullif(cls.current_liabilities, 0),
+                quick_ratio=(cls.current_assets - cls.inventory) / func.nullif(cls.current_liabilities, 0),
+                debt_to_equity=cls.total_liabilities / func.nullif(cls.owners_equity, 0),
+                debt_to_asset=cls.total_liabilities / func.nullif(cls.total_assets, 0),
+                working_capital=cls.current_assets - cls.current_liabilities,
+            )
+        )
+
 
 class Transaction(Base):
     """Individual transactions"""
     __tablename__ = "transactions"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    __table_args__ = (
+        # Category-filtered analytics scans (sum by category over a date
+        # range) resolve entirely inside this composite index
+        Index("ix_tx_biz_cat_date", "business_id", "category", "transaction_date"),
+    )
+
+    # No index=True on id - the primary key already has one
+    id = Column(Integer, primary_key=True)
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     
     # Transaction details
     transaction_date = Column(DateTime, nullable=False)
@@ -157,23 +292,84 @@ class Transaction(Base):
     subcategory = Column(String, nullable=True)
     
     # Amounts
-    amount = Column(Float, nullable=False)
-    currency = Column(String, default="INR")
+    amount = Column(Money, nullable=False)
+    currency = Column(String(3), default="INR")
     
     # Payment information
-    payment_method = Column(String, nullable=True)  # "cash", "bank", "upi", "card"
+    payment_method = Column(String(16), nullable=True)  # "cash", "bank", "upi", "card"
     reference_number = Column(String, nullable=True)
     
     # Tax
     is_taxable = Column(Boolean, default=True)
-    tax_amount = Column(Float, default=0.0)
+    tax_amount = Column(Money, default=0)
     gst_rate = Column(Float, default=0.0)
     
     # Metadata
-    source = Column(String, nullable=True)  # "manual", "bank_api", "payment_gateway"
+    source = Column(String(32), nullable=True)  # "manual", "bank_api", "payment_gateway"
     notes = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     business = relationship("Business", back_populates="transactions")
+
+    @classmethod
+    def bulk_create(cls, session, records: list) -> list:
+        """Insert a batch of transactions in one round-trip
+
+        One INSERT ... VALUES ... RETURNING id for the whole batch instead
+        of the per-row INSERT + refresh cycle of add_all/flush
+        """
+        return session.execute(
+            insert(cls).returning(cls.id), records
+        ).scalars().all()
+
+    @classmethod
+    def iter_for_business(cls, session, business_id: int):
+        """Stream a business's transactions without materializing them
+
+        stream_results opens a server-side cursor on PostgreSQL and
+        yield_per hydrates rows in batches, keeping memory at one batch
+        instead of the whole history
+        """
+        return session.execute(
+            select(cls).where(cls.business_id == business_id)
+            .order_by(cls.transaction_date)
+            .execution_options(stream_results=True, yield_per=1000)
+        ).scalars()
+
+    @classmethod
+    def query_for_business(cls, session, business_id: int, start, end):
+        """Select a business's transactions within an explicit date range
+
+        Analytics reads must always be date-bounded: on a partitioned
+        transactions table (see POSTGRESQL_SETUP.md) the predicate is what
+        lets the planner prune cold partitions, so the range is required
+        rather than optional
+        """
+        return session.execute(
+            select(cls).where(
+                cls.business_id == business_id,
+                cls.transaction_date >= start,
+                cls.transaction_date < end,
+            ).order_by(cls.transaction_date)
+        ).scalars()
+
+
+# Read-only mapping of the mv_tx_monthly materialized view (PostgreSQL
+# only; DDL and refresh schedule in POSTGRESQL_SETUP.md). Declared on its
+# own MetaData so create_all never tries to create it - assessment code
+# reads month x business x category aggregates from here instead of
+# re-scanning the transactions table:
+#     select(tx_monthly).where(tx_monthly.c.business_id == bid)
+_view_metadata = MetaData()
+
+tx_monthly = Table(
+    "mv_tx_monthly",
+    _view_metadata,
+    Column("business_id", Integer, primary_key=True),
+    Column("month", DateTime, primary_key=True),
+    Column("category", String, primary_key=True),
+    Column("total", Money),
+    Column("n", Integer),
+)
@@ -1,13 +1,19 @@
 """
 User model for authentication and authorization
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, CheckConstraint, Index, func, text
+from sqlalchemy.dialects.postgresql import CITEXT
+from sqlalchemy.orm import deferred, relationship, validates
 from datetime import datetime
 import enum
 
 from app.core.database import Base
 
+# Case-insensitive email on PostgreSQL (CITEXT extension), so lookups
+# don't need lower() wrappers that bypass the unique index; plain string
+# elsewhere
+EmailType = String().with_variant(CITEXT(), "postgresql")
+
 
 class UserRole(str, enum.Enum):
     """User roles for RBAC"""
@@ -20,16 +26,36 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """User model"""
     __tablename__ = "users"
-    
+    __table_args__ = (
+        # Varchar + CHECK instead of a native PG enum type
+        CheckConstraint(
+            "role IN ({})".format(
+                ",".join(f"'{m.value}'" for m in UserRole)
+            ),
+            name="ck_user_role",
+        ),
+        # api_key is nullable: a partial unique index skips the NULL
+        # entries a plain unique constraint would still store
+        Index(
+            "uq_users_api_key",
+            "api_key",
+            unique=True,
+            sqlite_where=text("api_key IS NOT NULL"),
+            postgresql_where=text("api_key IS NOT NULL"),
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(EmailType, unique=True, index=True, nullable=False)
     username = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    role = Column(Enum(UserRole), default=UserRole.BUSINESS_OWNER, nullable=False)
+    # Deferred: every authenticated endpoint loads the user row, but only
+    # the login path needs the hash - it opts in with undefer()
+    hashed_password = deferred(Column(String, nullable=False))
+    role = Column(String(16), default=UserRole.BUSINESS_OWNER.value, nullable=False)
     
     # Profile fields
-    phone = Column(String, nullable=True)
+    phone = Column(String(20), nullable=True)
     company_name = Column(String, nullable=True)
     industry = Column(String, nullable=True)
     
@@ -38,13 +64,21 @@ class User(Base):
     is_verified = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_login = Column(DateTime, nullable=True)
     
-    # API Key for integrations
-    api_key = Column(String, nullable=True, unique=True)
+    # API Key for integrations (uniqueness enforced by the partial
+    # index above); deferred like the password hash
+    api_key = deferred(Column(String, nullable=True))
     
-    # Relationships
-    businesses = relationship("Business", back_populates="owner", cascade="all, delete-orphan")
-    financial_reports = relationship("FinancialReport", back_populates="user", cascade="all, delete-orphan")
+    # Relationships. Deletes cascade in the database (ON DELETE CASCADE on
+    # the child FKs); passive_deletes keeps the ORM from loading every
+    # child row just to emit per-row DELETEs
+    businesses = relationship("Business", back_populates="owner", cascade="save-update, merge", passive_deletes=True, lazy="raise_on_sql")
+    financial_reports = relationship("FinancialReport", back_populates="user", cascade="save-update, merge", passive_deletes=True, lazy="raise_on_sql")
+
+    @validates("role")
+    def _coerce_enum(self, key, value):
+        """Accept enum members on assignment, store their value strings"""
+        return value.value if isinstance(value, enum.Enum) else value
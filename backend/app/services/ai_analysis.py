@@ -2,56 +2,374 @@
 AI-powered Financial Analysis Service
 Integrates with Google Gemini 3 Flash, OpenAI GPT-4, and Claude for intelligent financial insights
 """
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+import asyncio
+import hashlib
+import io
 import json
+import orjson
+import re
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from cachetools import LRUCache
 from google import genai
 from google.genai import types
 
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+from pydantic import BaseModel, Field
+
+from app.core.cache import cache_get, cache_set
 from app.core.config import settings
+from app.core.metrics import AI_CACHE_HITS, AI_CACHE_MISSES, AI_LLM_LATENCY
+from app.services.semantic_cache import SemanticCache
+
+
+class CostRecommendation(BaseModel):
+    area: str
+    recommendation: str
+    potential_savings: Optional[float] = None
+
+
+class RevenueRecommendation(BaseModel):
+    strategy: str
+    recommendation: str
+    potential_increase: Optional[float] = None
+
+
+class WorkingCapitalRecommendation(BaseModel):
+    aspect: str
+    recommendation: str
+    impact: Optional[str] = None
+
+
+class RecommendedProduct(BaseModel):
+    product_type: str
+    provider: Optional[str] = None
+    amount: Optional[float] = None
+    interest_rate: Optional[float] = None
+    reason: Optional[str] = None
+
+
+class IdentifiedRisk(BaseModel):
+    risk: str
+    severity: Optional[str] = None
+    probability: Optional[str] = None
+
+
+class RiskMitigation(BaseModel):
+    risk: str
+    strategy: str
+
+
+class AssessmentResult(BaseModel):
+    """Shape of an LLM financial assessment, mirroring _SCHEMA_PROMPT
+
+    Passed to Gemini as response_schema and to OpenAI as a json_schema
+    response_format so the provider constrains its own output; replies
+    are then parsed and validated in one pass by pydantic-core instead
+    of a bare json.loads that downstream code has to defensively .get()
+    around. Defaults match what the upload route previously substituted
+    for missing keys
+    """
+    overall_health_score: float = 0
+    creditworthiness_score: float = 0
+    liquidity_score: float = 0
+    profitability_score: float = 0
+    efficiency_score: float = 0
+    credit_rating: str = "BBB"
+    risk_level: str = "moderate"
+    ai_summary: str = ""
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    opportunities: List[str] = Field(default_factory=list)
+    threats: List[str] = Field(default_factory=list)
+    cost_optimization_recommendations: List[CostRecommendation] = Field(default_factory=list)
+    revenue_enhancement_recommendations: List[RevenueRecommendation] = Field(default_factory=list)
+    working_capital_recommendations: List[WorkingCapitalRecommendation] = Field(default_factory=list)
+    tax_optimization_recommendations: List[CostRecommendation] = Field(default_factory=list)
+    recommended_products: List[RecommendedProduct] = Field(default_factory=list)
+    identified_risks: List[IdentifiedRisk] = Field(default_factory=list)
+    risk_mitigation_strategies: List[RiskMitigation] = Field(default_factory=list)
+    revenue_forecast_3m: Optional[float] = None
+    revenue_forecast_6m: Optional[float] = None
+    revenue_forecast_12m: Optional[float] = None
+    cash_flow_forecast_3m: Optional[float] = None
+    tax_compliance_score: Optional[float] = None
+    compliance_issues: List[str] = Field(default_factory=list)
+    percentile_rank: Optional[float] = None
+    ai_confidence_score: Optional[float] = None
+
+
+class BatchItemResult(AssessmentResult):
+    """One entry of a batched reply: an assessment tagged with the
+    input id it answers"""
+    id: int = -1
+
+
+class BatchAssessmentResult(BaseModel):
+    """Envelope for multi-business batch replies ({"results": [...]})
+
+    The single-assessment schema would make the provider drop the
+    envelope (and the validator silently coerce it away), so batch
+    calls constrain and validate against this shape instead
+    """
+    results: List[BatchItemResult] = Field(default_factory=list)
+
+
+# OpenAI structured-output formats, built once from the Pydantic models
+# so they can't drift from what the validators accept
+_OPENAI_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "financial_assessment",
+        "schema": AssessmentResult.model_json_schema(),
+    },
+}
+_OPENAI_BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "financial_assessment_batch",
+        "schema": BatchAssessmentResult.model_json_schema(),
+    },
+}
+
+
+def _timed(provider: str):
+    """Record a provider call's wall time in the latency histogram
+
+    Works on both sync and async analyzer methods so every provider
+    path reports under the same metric
+    """
+    def wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def inner(*args, **kwargs):
+                with AI_LLM_LATENCY.labels(provider).time():
+                    return await fn(*args, **kwargs)
+            return inner
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with AI_LLM_LATENCY.labels(provider).time():
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# Supported report languages, frozen so it is built once at import and
+# can't be mutated by a caller
+_LANGUAGE_NAMES = MappingProxyType({
+    "hi": "Hindi",
+    "en": "English",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "mr": "Marathi",
+    "gu": "Gujarati",
+})
 
 
 class AIAnalysisService:
     """Service for AI-powered financial analysis"""
-    
+
+    # Immutable instruction + JSON-schema prefix shared by every
+    # analysis call. Kept byte-identical across requests so provider
+    # prompt caches (OpenAI automatic prefix caching, Anthropic
+    # cache_control, Gemini implicit caching) reuse it instead of
+    # re-billing ~2KB of input tokens per request; only the financial
+    # data varies per call
+    _SCHEMA_PROMPT = """You are an expert financial analyst specializing in SME financial health assessment.
+Respond with a comprehensive financial health assessment in the following JSON format:
+
+{
+  "overall_health_score": <0-100>,
+  "creditworthiness_score": <0-100>,
+  "liquidity_score": <0-100>,
+  "profitability_score": <0-100>,
+  "efficiency_score": <0-100>,
+  "credit_rating": "<AAA|AA|A|BBB|BB|B|CCC|CC|C|D>",
+  "risk_level": "<low|moderate|high|critical>",
+  "ai_summary": "<2-3 paragraph executive summary>",
+  "strengths": ["strength1", "strength2", "strength3"],
+  "weaknesses": ["weakness1", "weakness2", "weakness3"],
+  "opportunities": ["opportunity1", "opportunity2", "opportunity3"],
+  "threats": ["threat1", "threat2", "threat3"],
+  "cost_optimization_recommendations": [
+    {"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}
+  ],
+  "revenue_enhancement_recommendations": [
+    {"strategy": "strategy_name", "recommendation": "detailed_recommendation", "potential_increase": amount}
+  ],
+  "working_capital_recommendations": [
+    {"aspect": "aspect_name", "recommendation": "detailed_recommendation", "impact": "high|medium|low"}
+  ],
+  "tax_optimization_recommendations": [
+    {"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}
+  ],
+  "recommended_products": [
+    {
+      "product_type": "loan_type",
+      "provider": "bank_name",
+      "amount": suggested_amount,
+      "interest_rate": estimated_rate,
+      "reason": "why_this_product"
+    }
+  ],
+  "identified_risks": [
+    {"risk": "risk_description", "severity": "high|medium|low", "probability": "high|medium|low"}
+  ],
+  "risk_mitigation_strategies": [
+    {"risk": "risk_name", "strategy": "mitigation_strategy"}
+  ],
+  "revenue_forecast_3m": estimated_amount,
+  "revenue_forecast_6m": estimated_amount,
+  "revenue_forecast_12m": estimated_amount,
+  "cash_flow_forecast_3m": estimated_amount,
+  "tax_compliance_score": <0-100>,
+  "compliance_issues": ["issue1", "issue2"],
+  "percentile_rank": <0-100 compared to industry>,
+  "ai_confidence_score": <0-1>
+}
+
+Provide actionable, specific recommendations tailored to Indian SMEs. Consider GST compliance, working capital challenges, and growth opportunities.
+"""
+
+    # Label/key table driving the FINANCIAL DATA prompt section
+    _FIN_SECTIONS = (
+        ("Assets", (
+            ("Total Assets", "total_assets"),
+            ("Current Assets", "current_assets"),
+            ("Cash", "cash_and_equivalents"),
+            ("Receivables", "accounts_receivable"),
+            ("Inventory", "inventory"),
+        )),
+        ("Liabilities", (
+            ("Total Liabilities", "total_liabilities"),
+            ("Current Liabilities", "current_liabilities"),
+            ("Accounts Payable", "accounts_payable"),
+            ("Short-term Debt", "short_term_debt"),
+            ("Long-term Debt", "long_term_debt"),
+        )),
+        ("Cash Flow", (
+            ("Operating Cash Flow", "operating_cash_flow"),
+            ("Investing Cash Flow", "investing_cash_flow"),
+            ("Financing Cash Flow", "financing_cash_flow"),
+        )),
+        ("Tax Information", (
+            ("Tax Paid", "tax_paid"),
+            ("GST Collected", "gst_collected"),
+            ("GST Paid", "gst_paid"),
+        )),
+    )
+
     def __init__(self):
         # Initialize Gemini client (primary)
         if settings.GEMINI_API_KEY:
             self.gemini_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+            # Separate v1alpha client for PDF analysis (media_resolution
+            # support), built once so its connection pool is reused across
+            # calls instead of paying TLS setup per document
+            self.gemini_pdf_client = genai.Client(
+                api_key=settings.GEMINI_API_KEY,
+                http_options={'api_version': 'v1alpha'}
+            )
         else:
             self.gemini_client = None
+            self.gemini_pdf_client = None
         
-        # Initialize OpenAI client (fallback)
+        # Initialize OpenAI clients (fallback). The async client shares
+        # the event loop instead of freezing a worker for the whole call
         if settings.OPENAI_API_KEY:
-            from openai import OpenAI
+            from openai import AsyncOpenAI, OpenAI
             self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.openai_async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         else:
             self.openai_client = None
-        
-        # Initialize Claude client (fallback)
+            self.openai_async_client = None
+
+        # Initialize Claude clients (fallback)
         if settings.CLAUDE_API_KEY:
-            from anthropic import Anthropic
+            from anthropic import Anthropic, AsyncAnthropic
             self.claude_client = Anthropic(api_key=settings.CLAUDE_API_KEY)
+            self.claude_async_client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY)
         else:
             self.claude_client = None
+            self.claude_async_client = None
         
         self.model = settings.AI_MODEL
+
+        # Per-provider concurrency caps for the async paths - unbounded
+        # gather() just turns into provider 429s. Separate semaphores
+        # because rate-limit tiers differ between providers
+        self._gemini_sem = asyncio.Semaphore(settings.AI_CONCURRENCY)
+        self._openai_sem = asyncio.Semaphore(settings.AI_CONCURRENCY)
+        self._claude_sem = asyncio.Semaphore(settings.AI_CONCURRENCY)
+
+        # Near-duplicate prompts (report regeneration, re-uploads) reuse
+        # a previous response instead of paying for a fresh LLM call
+        self._embed_cache: LRUCache = LRUCache(maxsize=512)
+        self.semantic_cache = SemanticCache(embed=self._embed_prompt)
+
+    def _embed_prompt(self, text: str) -> Optional[list]:
+        """Embed a prompt for the semantic cache (768-dim)
+
+        Uses whichever embedding provider is configured; returns None
+        when there is none, which disables the cache. Vectors are
+        memoized per prompt hash: a cache miss embeds the same prompt
+        once for the lookup and again for the insert, and memoizing
+        turns that into a single embedding API call
+        """
+        key = hashlib.sha256(text.encode()).hexdigest()
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            return cached
+        vector = self._embed_prompt_uncached(text)
+        if vector is not None:
+            self._embed_cache[key] = vector
+        return vector
+
+    def _embed_prompt_uncached(self, text: str) -> Optional[list]:
+        """Call the configured embedding provider directly"""
+        try:
+            if self.gemini_client:
+                result = self.gemini_client.models.embed_content(
+                    model="text-embedding-004",
+                    contents=text,
+                )
+                return list(result.embeddings[0].values)
+            if self.openai_client:
+                result = self.openai_client.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=text,
+                    dimensions=768,
+                )
+                return list(result.data[0].embedding)
+        except Exception:
+            pass
+        return None
     
     def analyze_financial_health(
         self,
         financial_data: Dict[str, Any],
         business_info: Dict[str, Any],
         industry_benchmarks: Optional[Dict[str, Any]] = None,
-        pdf_bytes: Optional[bytes] = None
+        pdf_bytes: Optional[bytes] = None,
+        stream_callback: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Comprehensive AI analysis of financial health
-        
+
         Args:
             financial_data: Financial statements and metrics
             business_info: Business profile information
             industry_benchmarks: Industry comparison data
             pdf_bytes: Raw PDF bytes for direct analysis (if PDF uploaded)
-        
+            stream_callback: Called with each raw text chunk as the
+                provider streams it (e.g. to forward over SSE)
+
         Returns:
             Comprehensive analysis with insights and recommendations
         """
@@ -59,147 +377,403 @@ class AIAnalysisService:
         if pdf_bytes and self.gemini_client:
             return self._analyze_pdf_with_gemini(pdf_bytes, business_info)
         
+        # Exact-hash fast path: true duplicates (UI retries, report
+        # regeneration) return in microseconds without even paying for
+        # the embedding lookup below
+        exact_key = "aifh:exact:{}".format(
+            hashlib.sha256(json.dumps(
+                {
+                    "fd": financial_data,
+                    "bi": business_info,
+                    "ib": industry_benchmarks,
+                    "m": self.model,
+                },
+                sort_keys=True, default=str,
+            ).encode()).hexdigest()
+        )
+        cached = cache_get(exact_key)
+        if cached is not None:
+            AI_CACHE_HITS.labels("exact").inc()
+            return cached
+        AI_CACHE_MISSES.labels("exact").inc()
+
         # Otherwise use traditional text-based analysis
         prompt = self._create_analysis_prompt(financial_data, business_info, industry_benchmarks)
-        
-        # Priority: Gemini > GPT > Claude
+
+        # Semantic cache: near-identical prompts (same business, similar
+        # snapshot) reuse a previous response; namespaced by industry +
+        # size so unrelated businesses can't match
+        cache_namespace = "{}:{}".format(
+            business_info.get('industry', 'other'),
+            business_info.get('business_size', 'small'),
+        )
+        cached = self.semantic_cache.get(cache_namespace, prompt)
+        if cached is not None:
+            AI_CACHE_HITS.labels("semantic").inc()
+            return cached
+        AI_CACHE_MISSES.labels("semantic").inc()
+
+        result = self._dispatch(prompt, stream_callback)
+
+        # Write both cache layers with the same TTL
+        cache_set(exact_key, result, ttl=self.semantic_cache.ttl)
+        self.semantic_cache.set(cache_namespace, prompt, result)
+        return result
+
+    def _dispatch(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None, batch: bool = False) -> Dict[str, Any]:
+        """Route a prompt to the configured provider (Gemini > GPT > Claude)
+
+        batch=True constrains and validates the reply against the
+        BatchAssessmentResult envelope instead of a single assessment
+        """
         if "gemini" in self.model.lower() and self.gemini_client:
-            return self._analyze_with_gemini(prompt)
+            return self._analyze_with_gemini(prompt, stream_callback, batch=batch)
         elif "gpt" in self.model.lower() and self.openai_client:
-            return self._analyze_with_gpt(prompt)
+            return self._analyze_with_gpt(prompt, stream_callback, batch=batch)
         elif "claude" in self.model.lower() and self.claude_client:
-            return self._analyze_with_claude(prompt)
+            return self._analyze_with_claude(prompt, stream_callback, batch=batch)
         elif self.gemini_client:
-            return self._analyze_with_gemini(prompt)  # Default to Gemini if available
+            return self._analyze_with_gemini(prompt, stream_callback, batch=batch)  # Default to Gemini if available
         elif self.openai_client:
-            return self._analyze_with_gpt(prompt)  # Fallback to GPT
+            return self._analyze_with_gpt(prompt, stream_callback, batch=batch)  # Fallback to GPT
         else:
             raise Exception("No AI provider configured. Please set GEMINI_API_KEY, OPENAI_API_KEY, or CLAUDE_API_KEY")
-    
+
+    def analyze_batch(
+        self,
+        inputs: List[tuple],
+        batch_size: int = 25
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Score many businesses with one LLM call per batch
+
+        For nightly re-scoring / portfolio runs, packing N inputs into a
+        single prompt pays for the schema prefix once instead of N
+        times and cuts request count by ~batch_size.
+
+        Args:
+            inputs: (financial_data, business_info, industry_benchmarks)
+                tuples, one per business
+            batch_size: businesses per LLM call (clamped to 1-50 so the
+                combined prompt stays inside the context window)
+
+        Returns:
+            One assessment dict per input, positionally aligned; None
+            where the model failed to return that entry
+        """
+        batch_size = max(1, min(batch_size, 50))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+
+        for start in range(0, len(inputs), batch_size):
+            chunk = inputs[start:start + batch_size]
+            response = self._dispatch(self._create_batch_prompt(chunk, start), batch=True)
+            for entry in response["results"]:
+                idx = entry.pop("id", None)
+                if isinstance(idx, int) and 0 <= idx < len(results):
+                    entry["ai_model_used"] = self.model
+                    results[idx] = entry
+
+        return results
+
+    def submit_batch(self, inputs: List[tuple]) -> str:
+        """Submit offline bulk scoring through a provider batch API
+
+        For non-interactive workloads (scheduled portfolio
+        reassessment) the asynchronous batch endpoints cost half the
+        synchronous price and don't eat into rate limits; results
+        arrive within 24h via poll_batch.
+
+        Args:
+            inputs: (financial_data, business_info, industry_benchmarks)
+                tuples, one per business
+
+        Returns:
+            Provider batch id to poll with poll_batch
+        """
+        if self.openai_client:
+            import io
+            lines = []
+            for i, (financial_data, business_info, industry_benchmarks) in enumerate(inputs):
+                prompt = self._create_analysis_prompt(financial_data, business_info, industry_benchmarks)
+                lines.append(json.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [
+                            {"role": "system", "content": self._SCHEMA_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        "temperature": 0.3,
+                        "response_format": {"type": "json_object"},
+                    },
+                }))
+            batch_file = self.openai_client.files.create(
+                file=io.BytesIO("\n".join(lines).encode()),
+                purpose="batch",
+            )
+            batch = self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+            return batch.id
+
+        if self.claude_client:
+            batch = self.claude_client.messages.batches.create(
+                requests=[
+                    {
+                        "custom_id": str(i),
+                        "params": {
+                            "model": self.model,
+                            "max_tokens": 4096,
+                            "temperature": 0.3,
+                            "system": self._SCHEMA_PROMPT,
+                            "messages": [{
+                                "role": "user",
+                                "content": self._create_analysis_prompt(
+                                    financial_data, business_info, industry_benchmarks
+                                ),
+                            }],
+                        },
+                    }
+                    for i, (financial_data, business_info, industry_benchmarks)
+                    in enumerate(inputs)
+                ]
+            )
+            return batch.id
+
+        raise Exception("Batch scoring requires an OpenAI or Claude client")
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Fetch batch results, or None while the batch is still running
+
+        Returns:
+            {input index: assessment dict} for every entry the provider
+            completed successfully
+        """
+        if self.openai_client:
+            batch = self.openai_client.batches.retrieve(batch_id)
+            if batch.status != "completed":
+                if batch.status in ("failed", "expired", "cancelled"):
+                    raise Exception(f"Batch {batch_id} ended with status {batch.status}")
+                return None
+            results: Dict[int, Dict[str, Any]] = {}
+            content = self.openai_client.files.content(batch.output_file_id).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                entry = orjson.loads(line)
+                body = (entry.get("response") or {}).get("body") or {}
+                choices = body.get("choices") or []
+                if choices:
+                    result = orjson.loads(choices[0]["message"]["content"])
+                    result["ai_model_used"] = self.model
+                    results[int(entry["custom_id"])] = result
+            return results
+
+        if self.claude_client:
+            batch = self.claude_client.messages.batches.retrieve(batch_id)
+            if batch.processing_status != "ended":
+                return None
+            results = {}
+            for entry in self.claude_client.messages.batches.results(batch_id):
+                if entry.result.type == "succeeded":
+                    result = self._extract_json(entry.result.message.content[0].text)
+                    result["ai_model_used"] = self.model
+                    results[int(entry.custom_id)] = result
+            return results
+
+        raise Exception("Batch scoring requires an OpenAI or Claude client")
+
+    def _create_batch_prompt(self, chunk: List[tuple], offset: int) -> str:
+        """Variable data portion for a batched multi-business prompt"""
+        payload = [
+            {
+                "id": offset + i,
+                "business_info": business_info,
+                "financial_data": financial_data,
+                "industry_benchmarks": industry_benchmarks,
+            }
+            for i, (financial_data, business_info, industry_benchmarks)
+            in enumerate(chunk)
+        ]
+        return (
+            "\nINPUTS (produce one assessment per entry):\n"
+            + json.dumps(payload, default=str)
+            + '\n\nReturn a JSON object of the form '
+            '{"results": [{"id": <input id>, ...assessment fields in the '
+            'format above...}, ...]} with exactly one entry per input.\n'
+        )
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        """Quota and transient server errors are worth retrying
+
+        Checked by status code / class name so we don't import every
+        optional provider SDK just to reference its exception types
+        """
+        status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+        if status in (429, 500, 502, 503, 504):
+            return True
+        return type(exc).__name__ in (
+            "RateLimitError", "ResourceExhausted",
+            "InternalServerError", "ServiceUnavailable",
+        )
+
+    async def _call_with_retry(self, semaphore: asyncio.Semaphore, call):
+        """Run a provider call under its concurrency cap with backoff
+
+        Retries rate-limit/5xx failures with exponential backoff
+        (base * 2**attempt); the semaphore is released while sleeping so
+        other requests keep flowing
+        """
+        last_exc = None
+        for attempt in range(settings.AI_MAX_RETRIES):
+            async with semaphore:
+                try:
+                    return await call()
+                except Exception as e:
+                    if not self._is_retryable(e):
+                        raise
+                    last_exc = e
+            await asyncio.sleep(settings.AI_RETRY_BASE_DELAY * 2 ** attempt)
+        raise last_exc
+
+    async def _race_providers(self, prompt: str) -> Dict[str, Any]:
+        """Run Gemini and GPT concurrently and return the first success
+
+        Trades the loser's partial token bill for the best provider's
+        latency; pending tasks are cancelled as soon as one finishes
+        cleanly. Raises the first error only if every provider fails
+        """
+        pending = {
+            asyncio.ensure_future(self._analyze_with_gemini_async(prompt)),
+            asyncio.ensure_future(self._analyze_with_gpt_async(prompt)),
+        }
+        first_exc = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    first_exc = first_exc or task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise first_exc
+
+    async def analyze_financial_health_async(
+        self,
+        financial_data: Dict[str, Any],
+        business_info: Dict[str, Any],
+        industry_benchmarks: Optional[Dict[str, Any]] = None,
+        pdf_bytes: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """Async counterpart of analyze_financial_health
+
+        Awaiting the provider call frees the event loop for the multi-
+        second LLM round-trip, so one process can run many assessments
+        concurrently; the sync version stays for the Celery worker path
+        """
+        if pdf_bytes and self.gemini_client:
+            return await self._analyze_pdf_with_gemini_async(pdf_bytes, business_info)
+
+        prompt = self._create_analysis_prompt(financial_data, business_info, industry_benchmarks)
+
+        if settings.AI_PARALLEL_FALLBACK and self.gemini_client and self.openai_async_client:
+            return await self._race_providers(prompt)
+
+        # Priority: Gemini > GPT > Claude
+        if "gemini" in self.model.lower() and self.gemini_client:
+            return await self._analyze_with_gemini_async(prompt)
+        elif "gpt" in self.model.lower() and self.openai_async_client:
+            return await self._analyze_with_gpt_async(prompt)
+        elif "claude" in self.model.lower() and self.claude_async_client:
+            return await self._analyze_with_claude_async(prompt)
+        elif self.gemini_client:
+            return await self._analyze_with_gemini_async(prompt)
+        elif self.openai_async_client:
+            return await self._analyze_with_gpt_async(prompt)
+        else:
+            raise Exception("No AI provider configured. Please set GEMINI_API_KEY, OPENAI_API_KEY, or CLAUDE_API_KEY")
+
     def _create_analysis_prompt(
         self,
         financial_data: Dict[str, Any],
         business_info: Dict[str, Any],
         industry_benchmarks: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Create detailed prompt for AI analysis"""
-        
-        prompt = f"""
-You are an expert financial analyst specializing in SME financial health assessment. 
-Analyze the following financial data and provide comprehensive insights.
+        """Create the variable data portion of the analysis prompt
 
-BUSINESS INFORMATION:
-- Business Name: {business_info.get('business_name')}
-- Industry: {business_info.get('industry')}
-- Business Size: {business_info.get('business_size')}
-- Years in Operation: {business_info.get('years_in_operation', 'N/A')}
-
-FINANCIAL DATA:
-Revenue: ₹{financial_data.get('total_revenue', 0):,.2f}
-Expenses: ₹{financial_data.get('total_expenses', 0):,.2f}
-Net Profit: ₹{financial_data.get('total_revenue', 0) - financial_data.get('total_expenses', 0):,.2f}
-
-Assets:
-- Total Assets: ₹{financial_data.get('total_assets', 0):,.2f}
-- Current Assets: ₹{financial_data.get('current_assets', 0):,.2f}
-- Cash: ₹{financial_data.get('cash_and_equivalents', 0):,.2f}
-- Receivables: ₹{financial_data.get('accounts_receivable', 0):,.2f}
-- Inventory: ₹{financial_data.get('inventory', 0):,.2f}
-
-Liabilities:
-- Total Liabilities: ₹{financial_data.get('total_liabilities', 0):,.2f}
-- Current Liabilities: ₹{financial_data.get('current_liabilities', 0):,.2f}
-- Accounts Payable: ₹{financial_data.get('accounts_payable', 0):,.2f}
-- Short-term Debt: ₹{financial_data.get('short_term_debt', 0):,.2f}
-- Long-term Debt: ₹{financial_data.get('long_term_debt', 0):,.2f}
-
-Cash Flow:
-- Operating Cash Flow: ₹{financial_data.get('operating_cash_flow', 0):,.2f}
-- Investing Cash Flow: ₹{financial_data.get('investing_cash_flow', 0):,.2f}
-- Financing Cash Flow: ₹{financial_data.get('financing_cash_flow', 0):,.2f}
-
-Tax Information:
-- Tax Paid: ₹{financial_data.get('tax_paid', 0):,.2f}
-- GST Collected: ₹{financial_data.get('gst_collected', 0):,.2f}
-- GST Paid: ₹{financial_data.get('gst_paid', 0):,.2f}
-"""
+        The instruction/schema prefix lives in _SCHEMA_PROMPT; each
+        provider call prepends it so the constant part stays cacheable.
+        The (industry, business_size) block is rendered once per combo
+        via _static_prefix - the combos are low-cardinality, and keeping
+        that stretch byte-identical extends the provider prompt-cache
+        hit past the schema into the profile. Built as a line list +
+        str.join so the batching/retry paths don't concatenate one
+        giant string per call
+        """
+        get = financial_data.get
+        revenue = get('total_revenue', 0)
+        expenses = get('total_expenses', 0)
 
-        if industry_benchmarks:
-            prompt += f"""
-INDUSTRY BENCHMARKS ({business_info.get('industry')}):
-- Median Current Ratio: {industry_benchmarks.get('current_ratio_median', 'N/A')}
-- Median Gross Margin: {industry_benchmarks.get('gross_margin_median', 'N/A')}%
-- Median Net Margin: {industry_benchmarks.get('net_margin_median', 'N/A')}%
-- Median Debt-to-Equity: {industry_benchmarks.get('debt_to_equity_median', 'N/A')}
-"""
+        lines = [
+            self._static_prefix(
+                business_info.get('industry'),
+                business_info.get('business_size'),
+            ),
+            f"- Business Name: {business_info.get('business_name')}",
+            f"- Years in Operation: {business_info.get('years_in_operation', 'N/A')}",
+            "",
+            "FINANCIAL DATA:",
+            f"Revenue: ₹{revenue:,.2f}",
+            f"Expenses: ₹{expenses:,.2f}",
+            f"Net Profit: ₹{revenue - expenses:,.2f}",
+        ]
 
-        prompt += """
+        for section, fields in self._FIN_SECTIONS:
+            lines.append("")
+            lines.append(f"{section}:")
+            lines.extend(f"- {label}: ₹{get(key, 0):,.2f}" for label, key in fields)
 
-Please provide a comprehensive financial health assessment in the following JSON format:
+        if industry_benchmarks:
+            lines.extend([
+                "",
+                f"INDUSTRY BENCHMARKS ({business_info.get('industry')}):",
+                f"- Median Current Ratio: {industry_benchmarks.get('current_ratio_median', 'N/A')}",
+                f"- Median Gross Margin: {industry_benchmarks.get('gross_margin_median', 'N/A')}%",
+                f"- Median Net Margin: {industry_benchmarks.get('net_margin_median', 'N/A')}%",
+                f"- Median Debt-to-Equity: {industry_benchmarks.get('debt_to_equity_median', 'N/A')}",
+            ])
 
-{
-  "overall_health_score": <0-100>,
-  "creditworthiness_score": <0-100>,
-  "liquidity_score": <0-100>,
-  "profitability_score": <0-100>,
-  "efficiency_score": <0-100>,
-  "credit_rating": "<AAA|AA|A|BBB|BB|B|CCC|CC|C|D>",
-  "risk_level": "<low|moderate|high|critical>",
-  "ai_summary": "<2-3 paragraph executive summary>",
-  "strengths": ["strength1", "strength2", "strength3"],
-  "weaknesses": ["weakness1", "weakness2", "weakness3"],
-  "opportunities": ["opportunity1", "opportunity2", "opportunity3"],
-  "threats": ["threat1", "threat2", "threat3"],
-  "cost_optimization_recommendations": [
-    {"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}
-  ],
-  "revenue_enhancement_recommendations": [
-    {"strategy": "strategy_name", "recommendation": "detailed_recommendation", "potential_increase": amount}
-  ],
-  "working_capital_recommendations": [
-    {"aspect": "aspect_name", "recommendation": "detailed_recommendation", "impact": "high|medium|low"}
-  ],
-  "tax_optimization_recommendations": [
-    {"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}
-  ],
-  "recommended_products": [
-    {
-      "product_type": "loan_type",
-      "provider": "bank_name",
-      "amount": suggested_amount,
-      "interest_rate": estimated_rate,
-      "reason": "why_this_product"
-    }
-  ],
-  "identified_risks": [
-    {"risk": "risk_description", "severity": "high|medium|low", "probability": "high|medium|low"}
-  ],
-  "risk_mitigation_strategies": [
-    {"risk": "risk_name", "strategy": "mitigation_strategy"}
-  ],
-  "revenue_forecast_3m": estimated_amount,
-  "revenue_forecast_6m": estimated_amount,
-  "revenue_forecast_12m": estimated_amount,
-  "cash_flow_forecast_3m": estimated_amount,
-  "tax_compliance_score": <0-100>,
-  "compliance_issues": ["issue1", "issue2"],
-  "percentile_rank": <0-100 compared to industry>,
-  "ai_confidence_score": <0-1>
-}
+        lines.append("")
+        return "\n".join(lines)
 
-Provide actionable, specific recommendations tailored to Indian SMEs. Consider GST compliance, working capital challenges, and growth opportunities.
-"""
-        return prompt
-    
-    def _analyze_pdf_with_gemini(self, pdf_bytes: bytes, business_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze PDF directly with Gemini 3 using native PDF support"""
-        try:
-            import base64
-            
-            # Create the analysis prompt
-            analysis_prompt = f"""
-You are an expert financial analyst specializing in SME financial health assessment.
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _static_prefix(industry: Optional[str], business_size: Optional[str]) -> str:
+        """Render the per-(industry, size) profile block once per combo"""
+        return "\n".join([
+            "",
+            "Analyze the following financial data and provide comprehensive insights.",
+            "",
+            "BUSINESS INFORMATION:",
+            f"- Industry: {industry}",
+            f"- Business Size: {business_size}",
+        ])
 
+    def _create_pdf_prompt(self, business_info: Dict[str, Any]) -> str:
+        """Create the document-analysis prompt for PDF uploads
+
+        Schema prefix first, variable business details after, so the
+        constant part lines up with the cacheable prefix of the text path
+        """
+        return self._SCHEMA_PROMPT + f"""
 BUSINESS INFORMATION:
 - Business Name: {business_info.get('business_name')}
 - Industry: {business_info.get('industry')}
@@ -212,125 +786,179 @@ Analyze the financial document provided and extract ALL financial metrics includ
 - Cash flow information
 - Any other relevant financial data
 
-Then provide a comprehensive financial health assessment in the following JSON format:
+Then respond with the assessment in the JSON format above.
+"""
 
-{{
-  "overall_health_score": <0-100>,
-  "creditworthiness_score": <0-100>,
-  "liquidity_score": <0-100>,
-  "profitability_score": <0-100>,
-  "efficiency_score": <0-100>,
-  "credit_rating": "<AAA|AA|A|BBB|BB|B|CCC|CC|C|D>",
-  "risk_level": "<low|moderate|high|critical>",
-  "ai_summary": "<2-3 paragraph executive summary>",
-  "strengths": ["strength1", "strength2", "strength3"],
-  "weaknesses": ["weakness1", "weakness2", "weakness3"],
-  "opportunities": ["opportunity1", "opportunity2", "opportunity3"],
-  "threats": ["threat1", "threat2", "threat3"],
-  "cost_optimization_recommendations": [
-    {{"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}}
-  ],
-  "revenue_enhancement_recommendations": [
-    {{"strategy": "strategy_name", "recommendation": "detailed_recommendation", "potential_increase": amount}}
-  ],
-  "working_capital_recommendations": [
-    {{"aspect": "aspect_name", "recommendation": "detailed_recommendation", "impact": "high|medium|low"}}
-  ],
-  "tax_optimization_recommendations": [
-    {{"area": "area_name", "recommendation": "detailed_recommendation", "potential_savings": amount}}
-  ],
-  "recommended_products": [
-    {{
-      "product_type": "loan_type",
-      "provider": "bank_name",
-      "amount": suggested_amount,
-      "interest_rate": estimated_rate,
-      "reason": "why_this_product"
-    }}
-  ],
-  "identified_risks": [
-    {{"risk": "risk_description", "severity": "high|medium|low", "probability": "high|medium|low"}}
-  ],
-  "risk_mitigation_strategies": [
-    {{"risk": "risk_name", "strategy": "mitigation_strategy"}}
-  ],
-  "revenue_forecast_3m": estimated_amount,
-  "revenue_forecast_6m": estimated_amount,
-  "revenue_forecast_12m": estimated_amount,
-  "cash_flow_forecast_3m": estimated_amount,
-  "tax_compliance_score": <0-100>,
-  "compliance_issues": ["issue1", "issue2"],
-  "percentile_rank": <0-100 compared to industry>,
-  "ai_confidence_score": <0-1>
-}}
+    # PDFs above this go through the Files API instead of inline_data
+    _INLINE_PDF_LIMIT = 5 * 1024 * 1024
 
-Provide actionable, specific recommendations tailored to Indian SMEs. Consider GST compliance, working capital challenges, and growth opportunities.
-"""
-            
-            # Use v1alpha API for media_resolution support
-            client = genai.Client(
-                api_key=settings.GEMINI_API_KEY,
-                http_options={'api_version': 'v1alpha'}
+    def _shrink_pdf(self, pdf_bytes) -> bytes:
+        """Recompress a PDF before upload (smaller body, fewer tokens)
+
+        Stream recompression + object streams via pikepdf; returns the
+        original bytes when pikepdf is missing, the rewrite fails, or
+        it didn't actually get smaller
+        """
+        if pikepdf is None:
+            return pdf_bytes
+        try:
+            out = io.BytesIO()
+            with pikepdf.Pdf.open(io.BytesIO(bytes(pdf_bytes))) as pdf:
+                pdf.save(
+                    out,
+                    compress_streams=True,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                    linearize=True,
+                )
+            shrunk = out.getvalue()
+            return shrunk if len(shrunk) < len(pdf_bytes) else pdf_bytes
+        except Exception:
+            return pdf_bytes
+
+    def _pdf_part(self, pdf_bytes, client) -> types.Part:
+        """Build the PDF part: inline for small files, file_uri for big ones"""
+        if len(pdf_bytes) > self._INLINE_PDF_LIMIT:
+            uploaded = client.files.upload(
+                file=io.BytesIO(bytes(pdf_bytes)),
+                config={"mime_type": "application/pdf"},
             )
-            
+            return types.Part.from_uri(
+                file_uri=uploaded.uri, mime_type="application/pdf"
+            )
+        return types.Part(
+            inline_data=types.Blob(
+                mime_type="application/pdf",
+                data=pdf_bytes,
+            ),
+            media_resolution={"level": "media_resolution_medium"}
+        )
+
+    @_timed("gemini")
+    def _analyze_pdf_with_gemini(self, pdf_bytes: bytes, business_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze PDF directly with Gemini 3 using native PDF support"""
+        try:
+            pdf_bytes = self._shrink_pdf(pdf_bytes)
             # Send PDF directly to Gemini with optimal resolution for documents
-            response = client.models.generate_content(
+            response = self.gemini_pdf_client.models.generate_content(
                 model=self.model,
                 contents=[
                     types.Content(
                         parts=[
-                            types.Part(text=analysis_prompt),
-                            types.Part(
-                                inline_data=types.Blob(
-                                    mime_type="application/pdf",
-                                    data=pdf_bytes,
-                                ),
-                                media_resolution={"level": "media_resolution_medium"}
-                            )
+                            types.Part(text=self._create_pdf_prompt(business_info)),
+                            self._pdf_part(pdf_bytes, self.gemini_pdf_client)
                         ]
                     )
                 ],
                 config=types.GenerateContentConfig(
                     temperature=0.3,
-                    response_mime_type="application/json"
+                    response_mime_type="application/json",
+                    response_schema=AssessmentResult
                 )
             )
             
-            result = json.loads(response.text)
+            result = self._validate_result(response.text)
             result["ai_model_used"] = self.model
             return result
         
         except Exception as e:
             raise Exception(f"Gemini PDF analysis failed: {str(e)}")
-    
-    def _analyze_with_gemini(self, prompt: str) -> Dict[str, Any]:
-        """Analyze using Google Gemini 3 Flash"""
+
+    @_timed("gemini")
+    async def _analyze_pdf_with_gemini_async(self, pdf_bytes: bytes, business_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Async PDF analysis via the client's .aio surface"""
         try:
-            response = self.gemini_client.models.generate_content(
+            # pikepdf recompression is CPU-bound for tens of ms on big
+            # documents - run it off the event loop
+            pdf_bytes = await asyncio.to_thread(self._shrink_pdf, pdf_bytes)
+            pdf_part = self._pdf_part(pdf_bytes, self.gemini_pdf_client)
+            response = await self._call_with_retry(self._gemini_sem, lambda: self.gemini_pdf_client.aio.models.generate_content(
                 model=self.model,
-                contents=prompt,
+                contents=[
+                    types.Content(
+                        parts=[
+                            types.Part(text=self._create_pdf_prompt(business_info)),
+                            pdf_part
+                        ]
+                    )
+                ],
                 config=types.GenerateContentConfig(
                     temperature=0.3,
-                    response_mime_type="application/json"
+                    response_mime_type="application/json",
+                    response_schema=AssessmentResult
+                )
+            ))
+
+            result = await asyncio.to_thread(self._validate_result, response.text)
+            result["ai_model_used"] = self.model
+            return result
+
+        except Exception as e:
+            raise Exception(f"Gemini PDF analysis failed: {str(e)}")
+
+    @_timed("gemini")
+    def _analyze_with_gemini(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None, batch: bool = False) -> Dict[str, Any]:
+        """Analyze using Google Gemini 3 Flash (streamed)"""
+        try:
+            stream = self.gemini_client.models.generate_content_stream(
+                model=self.model,
+                contents=self._SCHEMA_PROMPT + prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                    response_schema=BatchAssessmentResult if batch else AssessmentResult
                 )
             )
-            
-            result = json.loads(response.text)
+            # Accumulate chunks in a list (str += would be O(n^2)) and
+            # parse once at end of stream
+            chunks: List[str] = []
+            for chunk in stream:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    if stream_callback:
+                        stream_callback(chunk.text)
+
+            if batch:
+                return self._validate_batch_result("".join(chunks))
+            result = self._validate_result("".join(chunks))
             result["ai_model_used"] = self.model
             return result
-        
+
         except Exception as e:
             raise Exception(f"Gemini analysis failed: {str(e)}")
-    
-    def _analyze_with_gpt(self, prompt: str) -> Dict[str, Any]:
-        """Analyze using OpenAI GPT"""
+
+    @_timed("gemini")
+    async def _analyze_with_gemini_async(self, prompt: str) -> Dict[str, Any]:
+        """Analyze using Google Gemini 3 Flash (async)"""
+        try:
+            response = await self._call_with_retry(self._gemini_sem, lambda: self.gemini_client.aio.models.generate_content(
+                model=self.model,
+                contents=self._SCHEMA_PROMPT + prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                    response_schema=AssessmentResult
+                )
+            ))
+
+            result = await asyncio.to_thread(self._validate_result, response.text)
+            result["ai_model_used"] = self.model
+            return result
+
+        except Exception as e:
+            raise Exception(f"Gemini analysis failed: {str(e)}")
+
+    @_timed("gpt")
+    def _analyze_with_gpt(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None, batch: bool = False) -> Dict[str, Any]:
+        """Analyze using OpenAI GPT (streamed)"""
         try:
             response = self.openai_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
+                        # Constant schema first so OpenAI's automatic
+                        # prefix cache covers it
                         "role": "system",
-                        "content": "You are an expert financial analyst specializing in SME financial health assessment for Indian businesses. Provide detailed, actionable insights in JSON format."
+                        "content": self._SCHEMA_PROMPT
                     },
                     {
                         "role": "user",
@@ -338,22 +966,112 @@ Provide actionable, specific recommendations tailored to Indian SMEs. Consider G
                     }
                 ],
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format=_OPENAI_BATCH_RESPONSE_FORMAT if batch else _OPENAI_RESPONSE_FORMAT,
+                stream=True
             )
-            
-            result = json.loads(response.choices[0].message.content)
+
+            chunks: List[str] = []
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+                    if stream_callback:
+                        stream_callback(delta)
+
+            if batch:
+                return self._validate_batch_result("".join(chunks))
+            result = self._validate_result("".join(chunks))
             result["ai_model_used"] = self.model
             return result
-        
+
         except Exception as e:
             raise Exception(f"GPT analysis failed: {str(e)}")
-    
-    def _analyze_with_claude(self, prompt: str) -> Dict[str, Any]:
-        """Analyze using Claude"""
+
+    @_timed("gpt")
+    async def _analyze_with_gpt_async(self, prompt: str) -> Dict[str, Any]:
+        """Analyze using OpenAI GPT (async)"""
         try:
-            response = self.claude_client.messages.create(
+            response = await self._call_with_retry(self._openai_sem, lambda: self.openai_async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        # Constant schema first so OpenAI's automatic
+                        # prefix cache covers it
+                        "role": "system",
+                        "content": self._SCHEMA_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,
+                response_format=_OPENAI_RESPONSE_FORMAT
+            ))
+
+            result = await asyncio.to_thread(
+                self._validate_result, response.choices[0].message.content
+            )
+            result["ai_model_used"] = self.model
+            return result
+
+        except Exception as e:
+            raise Exception(f"GPT analysis failed: {str(e)}")
+
+    # Matches a fenced ```json block, or any outermost {...} when the
+    # model omits the fence despite instructions
+    _JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.S)
+    _JSON_BODY_RE = re.compile(r"(\{.*\})", re.S)
+
+    @classmethod
+    def _extract_json(cls, content: str) -> Dict[str, Any]:
+        """Parse a model reply that should be JSON but may be fenced
+
+        The old split("```json") crashed when the fence was missing and
+        silently grabbed the wrong slice when there were several; try a
+        direct parse first, then the fence, then the outermost braces
+        """
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+        match = cls._JSON_FENCE_RE.search(content) or cls._JSON_BODY_RE.search(content)
+        if match:
+            return orjson.loads(match.group(1))
+        raise ValueError("Model response contained no JSON object")
+
+    @staticmethod
+    def _validate_result(raw) -> Dict[str, Any]:
+        """Parse-and-validate an assessment reply in one pydantic-core pass"""
+        if isinstance(raw, (str, bytes)):
+            return AssessmentResult.model_validate_json(raw).model_dump()
+        return AssessmentResult.model_validate(raw).model_dump()
+
+    @staticmethod
+    def _validate_batch_result(raw) -> Dict[str, Any]:
+        """Validate a batch reply, keeping the {"results": [...]} envelope"""
+        if isinstance(raw, (str, bytes)):
+            return BatchAssessmentResult.model_validate_json(raw).model_dump()
+        return BatchAssessmentResult.model_validate(raw).model_dump()
+
+    @_timed("claude")
+    def _analyze_with_claude(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None, batch: bool = False) -> Dict[str, Any]:
+        """Analyze using Claude (streamed)
+
+        For batch=True the envelope instruction rides in the user
+        prompt (no structured-output knob here); only validation
+        switches to the batch shape
+        """
+        try:
+            chunks: List[str] = []
+            with self.claude_client.messages.stream(
                 model=self.model,
                 max_tokens=4096,
+                system=[{
+                    "type": "text",
+                    "text": self._SCHEMA_PROMPT,
+                    "cache_control": {"type": "ephemeral"},
+                }],
                 messages=[
                     {
                         "role": "user",
@@ -361,39 +1079,120 @@ Provide actionable, specific recommendations tailored to Indian SMEs. Consider G
                     }
                 ],
                 temperature=0.3
-            )
-            
+            ) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    if stream_callback:
+                        stream_callback(text)
+
+            if batch:
+                return self._validate_batch_result(self._extract_json("".join(chunks)))
+            result = self._validate_result(self._extract_json("".join(chunks)))
+            result["ai_model_used"] = self.model
+            return result
+
+        except Exception as e:
+            raise Exception(f"Claude analysis failed: {str(e)}")
+
+    @_timed("claude")
+    async def _analyze_with_claude_async(self, prompt: str) -> Dict[str, Any]:
+        """Analyze using Claude (async)"""
+        try:
+            response = await self._call_with_retry(self._claude_sem, lambda: self.claude_async_client.messages.create(
+                model=self.model,
+                max_tokens=4096,
+                system=[{
+                    "type": "text",
+                    "text": self._SCHEMA_PROMPT,
+                    "cache_control": {"type": "ephemeral"},
+                }],
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3
+            ))
+
             content = response.content[0].text
-            # Extract JSON from response
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            
-            result = json.loads(content)
+            result = await asyncio.to_thread(
+                lambda: self._validate_result(self._extract_json(content))
+            )
             result["ai_model_used"] = self.model
             return result
-        
+
         except Exception as e:
             raise Exception(f"Claude analysis failed: {str(e)}")
-    
-    def generate_narrative_report(
+
+    async def _call_llm(
+        self,
+        system: str,
+        user: str,
+        temperature: float = 0.3,
+        max_tokens: int = 4096
+    ) -> str:
+        """Run a plain-text completion on whichever provider is configured
+
+        One dispatch point for the non-JSON calls (narrative reports,
+        translation) so they all share the semaphore and retry/backoff
+        logic instead of each duplicating per-provider branches
+        """
+        # Priority: Gemini > GPT > Claude, matching the analysis dispatch
+        if self.gemini_client:
+            response = await self._call_with_retry(self._gemini_sem, lambda: self.gemini_client.aio.models.generate_content(
+                model=self.model,
+                contents=user,
+                config=types.GenerateContentConfig(
+                    system_instruction=system,
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                )
+            ))
+            return response.text
+
+        if self.openai_async_client:
+            response = await self._call_with_retry(self._openai_sem, lambda: self.openai_async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user}
+                ],
+                temperature=temperature
+            ))
+            return response.choices[0].message.content
+
+        if self.claude_async_client:
+            response = await self._call_with_retry(self._claude_sem, lambda: self.claude_async_client.messages.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                system=system,
+                messages=[{"role": "user", "content": user}],
+                temperature=temperature
+            ))
+            return response.content[0].text
+
+        raise Exception("No AI provider configured. Please set GEMINI_API_KEY, OPENAI_API_KEY, or CLAUDE_API_KEY")
+
+    async def generate_narrative_report(
         self,
         assessment: Dict[str, Any],
         language: str = "en"
     ) -> str:
         """
         Generate narrative financial report
-        
+
         Args:
             assessment: Financial assessment data
             language: Language code (en, hi, etc.)
-        
+
         Returns:
             Formatted narrative report
         """
         prompt = f"""
 Generate a comprehensive financial health report based on the following assessment data:
 
-{json.dumps(assessment, indent=2)}
+{orjson.dumps(assessment, option=orjson.OPT_INDENT_2, default=str).decode()}
 
 Language: {language}
 
@@ -409,39 +1208,14 @@ Include sections for:
 
 Make it concise yet comprehensive, approximately 1500-2000 words.
 """
-        
-        if "gpt" in self.model.lower():
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional financial report writer. Write clear, actionable reports in {language}."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.5
-            )
-            return response.choices[0].message.content
-        
-        elif self.claude_client:
-            response = self.claude_client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.5
-            )
-            return response.content[0].text
-    
-    def translate_content(self, content: str, target_language: str) -> str:
+
+        return await self._call_llm(
+            system=f"You are a professional financial report writer. Write clear, actionable reports in {language}.",
+            user=prompt,
+            temperature=0.5
+        )
+
+    async def translate_content(self, content: str, target_language: str) -> str:
         """
         Translate content to target language
         
@@ -452,16 +1226,7 @@ Make it concise yet comprehensive, approximately 1500-2000 words.
         Returns:
             Translated content
         """
-        language_names = {
-            "hi": "Hindi",
-            "en": "English",
-            "ta": "Tamil",
-            "te": "Telugu",
-            "mr": "Marathi",
-            "gu": "Gujarati"
-        }
-        
-        lang_name = language_names.get(target_language, target_language)
+        lang_name = _LANGUAGE_NAMES.get(target_language, target_language)
         
         prompt = f"""
 Translate the following financial content to {lang_name}. 
@@ -469,40 +1234,55 @@ Maintain professional terminology and accuracy:
 
 {content}
 """
-        
-        if "gpt" in self.model.lower():
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional translator specializing in financial content. Translate to {lang_name}."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3
-            )
-            return response.choices[0].message.content
-        
-        elif self.claude_client:
-            response = self.claude_client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3
-            )
-            return response.content[0].text
-        
-        return content  # Fallback
+
+        return await self._call_llm(
+            system=self._translator_system(lang_name),
+            user=prompt
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _translator_system(lang_name: str) -> str:
+        """Per-language translator system prompt, rendered once per language"""
+        return (
+            "You are a professional translator specializing in financial "
+            f"content. Translate to {lang_name}."
+        )
+
+    async def aclose(self) -> None:
+        """Close provider HTTP sessions so shutdown doesn't leak sockets"""
+        for client in (self.openai_async_client, self.claude_async_client):
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception:
+                    pass
+        for client in (self.gemini_client, self.gemini_pdf_client):
+            aio = getattr(client, "aio", None)
+            if aio is not None and hasattr(aio, "aclose"):
+                try:
+                    await aio.aclose()
+                except Exception:
+                    pass
+
+
+# Built on first use instead of at import so CLI tools and test
+# collection don't pay client construction; the API holds the same
+# instance on app.state via the lifespan hook and closes it on shutdown
+_service: Optional[AIAnalysisService] = None
+
+
+def get_ai_service() -> AIAnalysisService:
+    """Return the process-wide AIAnalysisService, building it lazily"""
+    global _service
+    if _service is None:
+        _service = AIAnalysisService()
+    return _service
 
 
-# Create singleton instance
-ai_service = AIAnalysisService()
+def __getattr__(name: str):
+    # Keep `from app.services.ai_analysis import ai_service` working for
+    # older callers without eagerly constructing the service at import
+    if name == "ai_service":
+        return get_ai_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
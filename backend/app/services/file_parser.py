@@ -2,16 +2,291 @@
 File Parsing Service
 Handles parsing of CSV, Excel, and PDF financial documents
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import os
+import numpy as np
 import pandas as pd
 import io
 from datetime import datetime
 import re
 
+from app.core.config import settings
+
+# Prefer the Rust/C++-backed readers when installed; both fall back to
+# the pandas defaults so neither is a hard dependency
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# Opt-in alternative to the pyarrow/calamine readers (USE_POLARS):
+# polars parses across threads in Rust and its frames convert to pandas
+# through Arrow, so the payoff grows with file size
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# MuPDF's C extractor is an order of magnitude faster than PyPDF2's
+# pure-Python glyph handling; PyPDF2 stays as the fallback
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _clean_parse_kernel(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, out: np.ndarray) -> None:
+    """Parse one float per element from a concatenated UTF-8 byte buffer
+
+    Explicit state machine because the JIT can't call re: skip leading
+    currency markers, detect a (...) wrapper as a negative, then
+    accumulate the first digit run (commas and spaces ignored inside it)
+    plus an optional fraction. Elements with no digits come out NaN.
+    Plain Python without numba; compiled to a nopython loop with it
+    """
+    for n in range(starts.shape[0]):
+        s = starts[n]
+        e = ends[n]
+
+        # Leading skip: whitespace, commas, "Rs" and the 3-byte rupee
+        # sign, mirroring the replace pass in the pandas path
+        i = s
+        while i < e:
+            c = buf[i]
+            if c == 32 or c == 9 or c == 44:
+                i += 1
+            elif c == 82 and i + 1 < e and buf[i + 1] == 115:  # "Rs"
+                i += 2
+            elif c == 226 and i + 2 < e and buf[i + 1] == 130 and buf[i + 2] == 185:  # rupee sign
+                i += 3
+            else:
+                break
+
+        # Trailing skip (whitespace/commas) for the ) of a wrapper
+        j = e
+        while j > i and (buf[j - 1] == 32 or buf[j - 1] == 9 or buf[j - 1] == 44):
+            j -= 1
+
+        neg = False
+        if i < j and buf[i] == 40 and buf[j - 1] == 41:  # (...) wrapper
+            neg = True
+            i += 1
+            j -= 1
+
+        # Find the first digit (or a minus immediately before one)
+        while i < j:
+            c = buf[i]
+            if 48 <= c <= 57:
+                break
+            if c == 45 and i + 1 < j and 48 <= buf[i + 1] <= 57:
+                break
+            i += 1
+        if i >= j:
+            out[n] = np.nan
+            continue
+
+        if buf[i] == 45:
+            neg = not neg
+            i += 1
+
+        value = 0.0
+        while i < j:
+            c = buf[i]
+            if 48 <= c <= 57:
+                value = value * 10.0 + (c - 48)
+            elif c == 44 or c == 32:  # thousands separators
+                pass
+            else:
+                break
+            i += 1
+
+        if i < j and buf[i] == 46:  # fraction
+            i += 1
+            scale = 0.1
+            while i < j:
+                c = buf[i]
+                if not (48 <= c <= 57):
+                    break
+                value += (c - 48) * scale
+                scale *= 0.1
+                i += 1
+
+        out[n] = -value if neg else value
+
+
+if numba is not None:
+    _clean_parse_kernel = numba.njit(cache=True)(_clean_parse_kernel)
+
+
+# Document-type detection: one compiled alternation per stage so a
+# single linear scan finds every matching term, then ties are broken by
+# _DOC_TYPE_PRIORITY (the order of the old elif chain)
+_FILENAME_TYPE_RE = re.compile(
+    r'(?P<balance_sheet>balance|sheet|position)'
+    r'|(?P<profit_loss>profit|loss|p&l|income|statement)'
+    r'|(?P<cash_flow>cash|flow|cashflow)'
+)
+_COLUMN_TYPE_RE = re.compile(
+    r'(?P<balance_sheet>asset|liability|equity)'
+    r'|(?P<profit_loss>revenue|expense|profit)'
+    r'|(?P<cash_flow>operating|investing|financing)'
+)
+_DOC_TYPE_PRIORITY = ('balance_sheet', 'profit_loss', 'cash_flow')
+
+# Union of every amount-column heuristic used by the statement parsers;
+# drives the usecols pushdown so wide sheets only materialize columns a
+# parser could actually pick
+_AMOUNT_COL_RE = re.compile(r'amount|value|balance|cash')
+
+# Per-parser amount-column heuristics as single alternations: one regex
+# scan per name replaces the stacked substring tests plus the
+# char-by-char digit check (the last branch matches numeric headers
+# like a bare year, possibly with currency/grouping characters)
+_NUMERIC_HEADER = r'^[₹.,\s]*\d[\d₹.,\s]*$'
+_NUMERIC_HEADER_RE = re.compile(_NUMERIC_HEADER)
+_BALANCE_AMOUNT_RE = re.compile(r'amount|value|balance|' + _NUMERIC_HEADER)
+_PROFIT_LOSS_AMOUNT_RE = re.compile(r'amount|value|' + _NUMERIC_HEADER)
+_CASH_FLOW_AMOUNT_RE = re.compile(r'amount|value|cash')
+
+# Numeric cleanup: currency/separator strip, parenthesised-negative
+# wrapper, and the number itself - compiled once so neither the scalar
+# nor the vectorized path depends on re's bounded compile cache
+_CURRENCY_RE = re.compile(r'₹|Rs|[,\s]')
+_PAREN_WRAP_RE = re.compile(r'^\((.*)\)$')
+_NUMBER_RE = re.compile(r'-?\d+\.?\d*')
+_NUMBER_GROUP_RE = re.compile(r'(-?\d+\.?\d*)')  # str.extract needs the group
+
+# Text extraction for PDFs: the per-metric patterns fused into one
+# alternation so the page text is walked once instead of once per metric
+_TEXT_METRIC_RE = re.compile(
+    r'(?:total\s+)?revenue[:\s]+₹?[\s,]*(?P<total_revenue>\d+(?:,\d+)*(?:\.\d+)?)'
+    r'|(?:total\s+)?assets[:\s]+₹?[\s,]*(?P<total_assets>\d+(?:,\d+)*(?:\.\d+)?)'
+    r'|(?:total\s+)?liabilities[:\s]+₹?[\s,]*(?P<total_liabilities>\d+(?:,\d+)*(?:\.\d+)?)'
+    r'|cash[:\s]+₹?[\s,]*(?P<cash>\d+(?:,\d+)*(?:\.\d+)?)'
+)
+
 
 class FileParserService:
     """Service for parsing financial documents"""
-    
+
+    # The same monthly statement gets re-uploaded often; hashing a few
+    # MB is orders of magnitude cheaper than re-running the Excel parse
+    _PARSE_CACHE_SIZE = 64
+
+    # Payloads above this are parsed in a subprocess: a multi-hundred-MB
+    # Excel parse holds the GIL long enough to starve the thread pool too
+    _LARGE_PAYLOAD_BYTES = 5_000_000
+
+    def __init__(self):
+        self._parse_cache: 'OrderedDict[bytes, Dict[str, Any]]' = OrderedDict()
+        # Built on first large parse so importing the module (and the
+        # Celery workers, which parse synchronously) never forks workers
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    # (field, compiled label pattern, mode) rows driving the vectorized
+    # statement parsers. Order matters: each sheet row is consumed by the first
+    # category whose pattern matches, mirroring the old per-row elif
+    # chain. 'sum' accumulates all matching rows; 'set' takes the last
+    # matching row's value (total/subtotal lines)
+    _BALANCE_CATEGORIES = (
+        ('cash_and_equivalents', re.compile(r'cash|bank'), 'sum'),
+        ('accounts_receivable', re.compile(r'receivable|debtor'), 'sum'),
+        ('inventory', re.compile(r'inventory|stock'), 'sum'),
+        ('current_assets', re.compile(r'current asset'), 'set'),
+        ('fixed_assets', re.compile(r'fixed asset|ppe|property'), 'sum'),
+        ('total_assets', re.compile(r'total asset'), 'set'),
+        ('accounts_payable', re.compile(r'payable|creditor'), 'sum'),
+        ('short_term_debt', re.compile(r'short.*debt|debt.*short'), 'sum'),
+        ('long_term_debt', re.compile(r'long.*debt|debt.*long'), 'sum'),
+        ('current_liabilities', re.compile(r'current liab'), 'set'),
+        ('total_liabilities', re.compile(r'total liab'), 'set'),
+        ('owners_equity', re.compile(r'equity|capital'), 'sum'),
+    )
+
+    _PROFIT_LOSS_CATEGORIES = (
+        ('total_revenue', re.compile(r'revenue|sales|income'), 'sum'),
+        ('cost_of_goods_sold', re.compile(r'cogs|cost of goods|cost of sales'), 'sum'),
+        ('salaries_wages', re.compile(r'salary|wage|payroll'), 'sum'),
+        ('rent', re.compile(r'rent|lease'), 'sum'),
+        ('utilities', re.compile(r'utilit|electric'), 'sum'),
+        ('marketing', re.compile(r'marketing|advertising'), 'sum'),
+        ('operating_expenses', re.compile(r'operating expense|opex'), 'set'),
+        ('other_expenses', re.compile(r'expense|cost'), 'sum'),
+    )
+
+    _CASH_FLOW_CATEGORIES = (
+        ('operating_cash_flow', re.compile(r'operating'), 'set'),
+        ('investing_cash_flow', re.compile(r'investing'), 'set'),
+        ('financing_cash_flow', re.compile(r'financing'), 'set'),
+    )
+
+    def _prepare(self, df: pd.DataFrame, amount_regex: 're.Pattern') -> Tuple[pd.Series, pd.Series]:
+        """Build the label and amount Series a statement parser consumes
+
+        One pass per file: normalize the label column, pick the amount
+        column by the parser's heuristic, and clean it to floats. Every
+        parser reads these two Series so none repeats the column casts
+        """
+        if df.empty or df.shape[1] == 0:
+            empty = pd.Series(dtype=float)
+            return empty.astype(str), empty
+
+        items = df.iloc[:, 0].astype(str).str.lower().str.strip()
+        amount_idx = self._amount_column_idx(self._normalized_columns(df), amount_regex)
+        if amount_idx is not None:
+            amounts = self._extract_numbers_vec(df.iloc[:, amount_idx])
+        else:
+            amounts = pd.Series(0.0, index=df.index)
+        return items, amounts
+
+    def _categorize(self, items: pd.Series, amounts: pd.Series, data: Dict[str, Any], categories) -> Dict[str, Any]:
+        """Fill category fields from prepared Series with vectorized masks
+
+        Each category claims its rows with a boolean str.contains mask -
+        C-level pandas kernels instead of a Python-interpreted loop per
+        row
+        """
+        if items.empty:
+            return data
+
+        # np.select assigns each row the first matching category, which
+        # is exactly the old elif precedence; a single grouped pass then
+        # replaces one masked sum per category
+        conditions = [
+            items.str.contains(pattern, na=False).to_numpy()
+            for _, pattern, _ in categories
+        ]
+        labels = np.select(conditions, [field for field, _, _ in categories], default='')
+        grouped = amounts.groupby(labels)
+        sums = grouped.sum()
+        lasts = grouped.last()
+        for field, _, mode in categories:
+            if field not in sums.index:
+                continue
+            if mode == 'sum':
+                data[field] += float(sums[field])
+            else:
+                data[field] = float(lasts[field])
+        return data
+
     def parse_file(self, file_content: bytes, filename: str, file_type: str) -> Dict[str, Any]:
         """
         Parse uploaded file and extract financial data
@@ -26,9 +301,9 @@ class FileParserService:
         """
         # Determine file type
         if file_type in ['text/csv', 'application/vnd.ms-excel'] or filename.endswith('.csv'):
-            return self._parse_csv(file_content, filename)
+            return self._parse_cached(self._parse_csv, file_content, filename)
         elif file_type in ['application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'] or filename.endswith(('.xlsx', '.xls')):
-            return self._parse_excel(file_content, filename)
+            return self._parse_cached(self._parse_excel, file_content, filename)
         elif file_type == 'application/pdf' or filename.endswith('.pdf'):
             # For PDFs, return raw bytes to be sent directly to Gemini
             return {
@@ -39,88 +314,249 @@ class FileParserService:
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
     
+    async def parse_file_async(self, file_content, filename: str, file_type: str) -> Dict[str, Any]:
+        """
+        Parse an upload without blocking the event loop
+
+        Spreadsheet parsing is CPU-bound, so running parse_file inline in
+        an async handler stalls every other request for the duration.
+        Small payloads go to a worker thread; large ones go to a process
+        pool so the parse doesn't hold the GIL against the thread pool.
+        PDFs are only wrapped, not parsed, so they stay inline.
+        """
+        if file_type == 'application/pdf' or filename.endswith('.pdf'):
+            return self.parse_file(file_content, filename, file_type)
+
+        if len(file_content) > self._LARGE_PAYLOAD_BYTES:
+            if self._process_pool is None:
+                self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=os.cpu_count()
+                )
+            loop = asyncio.get_running_loop()
+            # bytes() rather than the caller's mmap - subprocess arguments
+            # must pickle
+            return await loop.run_in_executor(
+                self._process_pool, _parse_in_subprocess,
+                bytes(file_content), filename, file_type
+            )
+
+        return await asyncio.to_thread(self.parse_file, file_content, filename, file_type)
+
+    def _parse_cached(self, parse, file_content: bytes, filename: str) -> Dict[str, Any]:
+        """Memoize a parse on the content hash (small LRU)
+
+        The filename feeds document-type detection, so it is part of the
+        key. Hits return a deep copy - callers mutate the result dict
+        """
+        key = hashlib.sha256(file_content).digest() + filename.encode()
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            return copy.deepcopy(cached)
+
+        result = parse(file_content, filename)
+        self._parse_cache[key] = copy.deepcopy(result)
+        if len(self._parse_cache) > self._PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+        return result
+
+    def parse_file_frame(self, file_content: bytes, filename: str, file_type: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Parse a CSV/Excel upload once, returning both the DataFrame and the
+        extracted totals so downstream consumers don't re-read the file
+        """
+        if file_type in ['text/csv', 'application/vnd.ms-excel'] or filename.endswith('.csv'):
+            df = self._read_csv(file_content)
+        else:
+            df = self._read_excel(file_content)
+        return df, self._parse_frame(df, filename)
+
+    @staticmethod
+    def _amount_column_idx(columns: list, regex: 're.Pattern') -> Optional[int]:
+        """Index of the first column matching the parser's amount
+        heuristic, or the last column as the fallback (None for
+        single-column frames, where there is no amount to read)"""
+        for i, col in enumerate(columns):
+            if regex.search(col):
+                return i
+        if len(columns) >= 2:
+            return len(columns) - 1
+        return None
+
+    @staticmethod
+    def _dtype_backend() -> Dict[str, str]:
+        """read_csv/read_excel kwargs selecting Arrow-backed columns
+
+        dtype_backend='pyarrow' stores each string column as one
+        contiguous buffer plus offsets instead of per-cell Python
+        objects; empty when pyarrow is missing so the pandas defaults
+        apply
+        """
+        return {'dtype_backend': 'pyarrow'} if pa is not None else {}
+
+    @staticmethod
+    def _normalized_columns(df: pd.DataFrame) -> list:
+        """Lowercased/stripped column names as a plain local list
+
+        Matching against a temporary list instead of reassigning
+        df.columns skips the Index rebuild (and the copy-on-write clone
+        it can trigger) that the old in-place mutation paid per sheet
+        """
+        return [str(c).lower().strip() for c in df.columns]
+
+    @staticmethod
+    def _useful_columns(columns) -> Optional[list]:
+        """Pick the column indices a parser could use, or None to keep all
+
+        Keeps the label column, the original last column (the parsers'
+        fallback amount column), and anything matching an amount
+        heuristic or a numeric header like a year. Dropping the rest
+        before cell conversion is where wide-sheet parse time goes
+        """
+        cols = [str(c).lower().strip() for c in columns]
+        if len(cols) <= 2:
+            return None
+        keep = {0, len(cols) - 1}
+        for i, col in enumerate(cols):
+            if _AMOUNT_COL_RE.search(col) or _NUMERIC_HEADER_RE.search(col):
+                keep.add(i)
+        if len(keep) == len(cols):
+            return None
+        return sorted(keep)
+
+    def _read_csv(self, file_content: bytes) -> pd.DataFrame:
+        """Read a CSV into a DataFrame, preferring pyarrow's reader
+
+        pyarrow parses column chunks across threads and its Arrow
+        columns convert to pandas mostly zero-copy, several times faster
+        than pandas' single-threaded C parser on wide uploads
+        """
+        if pl is not None and settings.USE_POLARS:
+            try:
+                frame = pl.read_csv(file_content)
+                keep = self._useful_columns(frame.columns)
+                if keep is not None:
+                    # Select before to_pandas so dropped columns never
+                    # cross the Arrow-to-pandas boundary
+                    frame = frame[:, keep]
+                return frame.to_pandas(use_pyarrow_extension_array=True)
+            except Exception:
+                pass
+        if pacsv is not None and settings.USE_ARROW_IO:
+            try:
+                # py_buffer is a zero-copy view over the payload (bytes
+                # or the route's mmap) - no BytesIO object, no memcpy
+                table = pacsv.read_csv(pa.BufferReader(pa.py_buffer(file_content)))
+                keep = self._useful_columns(table.column_names)
+                if keep is not None:
+                    # Arrow column selection is metadata-only - the
+                    # dropped columns never become pandas objects
+                    table = table.select(keep)
+                # Arrow-backed columns keep strings in one contiguous
+                # buffer instead of boxed Python objects - roughly an
+                # order of magnitude less memory on string-heavy sheets
+                return table.to_pandas(types_mapper=pd.ArrowDtype)
+            except Exception:
+                # pyarrow is stricter about ragged rows - retry with the default
+                pass
+        header = pd.read_csv(io.BytesIO(file_content), nrows=0)
+        keep = self._useful_columns(header.columns)
+        return pd.read_csv(io.BytesIO(file_content), usecols=keep, **self._dtype_backend())
+
+    def _read_excel(self, file_content: bytes) -> pd.DataFrame:
+        """Read the first Excel sheet, preferring the calamine engine
+
+        Two-pass read: the header row first (nrows=0), then only the
+        columns a parser can use, so wide sheets skip cell conversion
+        for the rest - the dominant cost in Excel parsing
+        """
+        if pl is not None and settings.USE_POLARS:
+            try:
+                # polars accepts the raw bytes - skip the BytesIO wrapper
+                frame = pl.read_excel(bytes(file_content), sheet_id=1)
+                keep = self._useful_columns(frame.columns)
+                if keep is not None:
+                    frame = frame[:, keep]
+                return frame.to_pandas()
+            except Exception:
+                pass
+        if _EXCEL_ENGINE:
+            try:
+                header = pd.read_excel(io.BytesIO(file_content), sheet_name=0, nrows=0, engine=_EXCEL_ENGINE)
+                keep = self._useful_columns(header.columns)
+                return pd.read_excel(io.BytesIO(file_content), sheet_name=0, usecols=keep,
+                                     engine=_EXCEL_ENGINE, **self._dtype_backend())
+            except Exception:
+                pass
+        return pd.read_excel(io.BytesIO(file_content), sheet_name=0)
+
+    def _parse_frame(self, df: pd.DataFrame, filename: str) -> Dict[str, Any]:
+        """Dispatch an already-read DataFrame to the right document parser"""
+        doc_type = self._detect_document_type(filename, df)
+
+        if doc_type == 'balance_sheet':
+            return self._parse_balance_sheet(df)
+        elif doc_type == 'profit_loss':
+            return self._parse_profit_loss(df)
+        elif doc_type == 'cash_flow':
+            return self._parse_cash_flow(df)
+        else:
+            return self._parse_generic(df)
+
     def _parse_csv(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """Parse CSV file"""
         try:
-            # Read CSV
-            df = pd.read_csv(io.BytesIO(file_content))
-            
-            # Detect document type from filename or content
-            doc_type = self._detect_document_type(filename, df)
-            
-            if doc_type == 'balance_sheet':
-                return self._parse_balance_sheet(df)
-            elif doc_type == 'profit_loss':
-                return self._parse_profit_loss(df)
-            elif doc_type == 'cash_flow':
-                return self._parse_cash_flow(df)
-            else:
-                # Generic parsing
-                return self._parse_generic(df)
-                
+            return self._parse_frame(self._read_csv(file_content), filename)
         except Exception as e:
             raise ValueError(f"Failed to parse CSV: {str(e)}")
-    
+
     def _parse_excel(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """Parse Excel file"""
         try:
-            # Read Excel (first sheet)
-            df = pd.read_excel(io.BytesIO(file_content), sheet_name=0)
-            
-            # Detect document type
-            doc_type = self._detect_document_type(filename, df)
-            
-            if doc_type == 'balance_sheet':
-                return self._parse_balance_sheet(df)
-            elif doc_type == 'profit_loss':
-                return self._parse_profit_loss(df)
-            elif doc_type == 'cash_flow':
-                return self._parse_cash_flow(df)
-            else:
-                return self._parse_generic(df)
-                
+            return self._parse_frame(self._read_excel(file_content), filename)
         except Exception as e:
             raise ValueError(f"Failed to parse Excel: {str(e)}")
     
     def _parse_pdf(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """Parse PDF file (simplified - would need OCR for scanned PDFs)"""
         try:
-            import PyPDF2
-            
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            
+            if pymupdf is not None:
+                with pymupdf.open(stream=file_content, filetype='pdf') as doc:
+                    text = '\n'.join(page.get_text('text') for page in doc)
+            else:
+                import PyPDF2
+
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+                text = ''.join(page.extract_text() for page in pdf_reader.pages)
+
             # Extract financial data using regex patterns
             return self._extract_from_text(text)
-            
+
         except Exception as e:
             raise ValueError(f"Failed to parse PDF: {str(e)}. Note: Only text-based PDFs are supported.")
     
+    @staticmethod
+    def _match_doc_type(regex: 're.Pattern', text: str) -> Optional[str]:
+        """Scan text once and return the highest-priority matching type"""
+        found = {m.lastgroup for m in regex.finditer(text)}
+        for doc_type in _DOC_TYPE_PRIORITY:
+            if doc_type in found:
+                return doc_type
+        return None
+
     def _detect_document_type(self, filename: str, df: pd.DataFrame) -> str:
         """Detect the type of financial document"""
-        filename_lower = filename.lower()
-        
         # Check filename
-        if any(term in filename_lower for term in ['balance', 'sheet', 'position']):
-            return 'balance_sheet'
-        elif any(term in filename_lower for term in ['profit', 'loss', 'p&l', 'income', 'statement']):
-            return 'profit_loss'
-        elif any(term in filename_lower for term in ['cash', 'flow', 'cashflow']):
-            return 'cash_flow'
-        
-        # Check column names
+        doc_type = self._match_doc_type(_FILENAME_TYPE_RE, filename.lower())
+        if doc_type:
+            return doc_type
+
+        # Check column names (only reached when the filename was not
+        # conclusive, so the common path skips this string scan)
+        if not df.columns.size:
+            return 'unknown'
         columns_lower = ' '.join(df.columns.astype(str).str.lower())
-        
-        if any(term in columns_lower for term in ['asset', 'liability', 'equity']):
-            return 'balance_sheet'
-        elif any(term in columns_lower for term in ['revenue', 'expense', 'profit']):
-            return 'profit_loss'
-        elif any(term in columns_lower for term in ['operating', 'investing', 'financing']):
-            return 'cash_flow'
-        
-        return 'unknown'
+        return self._match_doc_type(_COLUMN_TYPE_RE, columns_lower) or 'unknown'
     
     def _parse_balance_sheet(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Parse balance sheet data"""
@@ -140,73 +576,32 @@ class FileParserService:
             'owners_equity': 0.0
         }
         
-        # Convert to lowercase for easier matching
-        df.columns = df.columns.str.lower().str.strip()
-        
-        # Try to find the amount column
-        amount_col = None
-        for col in df.columns:
-            if 'amount' in col or 'value' in col or 'balance' in col or col.replace(' ', '').replace('₹', '').replace(',', '').replace('.', '').isdigit():
-                amount_col = col
-                break
-        
-        if amount_col is None and len(df.columns) >= 2:
-            amount_col = df.columns[-1]  # Use last column as amount
-        
-        # Parse each row
-        for idx, row in df.iterrows():
-            try:
-                # Get item name (first column typically)
-                item = str(row.iloc[0]).lower().strip() if len(row) > 0 else ""
-                
-                # Get amount
-                amount = self._extract_number(row[amount_col]) if amount_col else 0.0
-                
-                # Map to fields
-                if 'cash' in item or 'bank' in item:
-                    data['cash_and_equivalents'] += amount
-                elif 'receivable' in item or 'debtor' in item:
-                    data['accounts_receivable'] += amount
-                elif 'inventory' in item or 'stock' in item:
-                    data['inventory'] += amount
-                elif 'current asset' in item:
-                    data['current_assets'] = amount
-                elif 'fixed asset' in item or 'ppe' in item or 'property' in item:
-                    data['fixed_assets'] += amount
-                elif 'total asset' in item:
-                    data['total_assets'] = amount
-                elif 'payable' in item or 'creditor' in item:
-                    data['accounts_payable'] += amount
-                elif 'short' in item and 'debt' in item:
-                    data['short_term_debt'] += amount
-                elif 'long' in item and 'debt' in item:
-                    data['long_term_debt'] += amount
-                elif 'current liab' in item:
-                    data['current_liabilities'] = amount
-                elif 'total liab' in item:
-                    data['total_liabilities'] = amount
-                elif 'equity' in item or 'capital' in item:
-                    data['owners_equity'] += amount
-                    
-            except Exception:
-                continue
-        
-        # Calculate derived values if not provided
-        if data['current_assets'] == 0:
-            data['current_assets'] = (data['cash_and_equivalents'] + 
-                                     data['accounts_receivable'] + 
-                                     data['inventory'])
-        
-        if data['total_assets'] == 0:
-            data['total_assets'] = data['current_assets'] + data['fixed_assets']
-        
-        if data['current_liabilities'] == 0:
-            data['current_liabilities'] = (data['accounts_payable'] + 
-                                          data['short_term_debt'])
-        
-        if data['total_liabilities'] == 0:
-            data['total_liabilities'] = data['current_liabilities'] + data['long_term_debt']
-        
+        items, amounts = self._prepare(df, _BALANCE_AMOUNT_RE)
+        data = self._categorize(items, amounts, data, self._BALANCE_CATEGORIES)
+
+        # Calculate derived values if not provided, as two fused
+        # np.where passes: the subtotals first, then the totals, which
+        # read the (possibly just derived) subtotals
+        current = np.where(
+            np.array([data['current_assets'], data['current_liabilities']]) == 0,
+            [
+                data['cash_and_equivalents'] + data['accounts_receivable'] + data['inventory'],
+                data['accounts_payable'] + data['short_term_debt'],
+            ],
+            [data['current_assets'], data['current_liabilities']],
+        )
+        data['current_assets'], data['current_liabilities'] = map(float, current)
+
+        totals = np.where(
+            np.array([data['total_assets'], data['total_liabilities']]) == 0,
+            [
+                data['current_assets'] + data['fixed_assets'],
+                data['current_liabilities'] + data['long_term_debt'],
+            ],
+            [data['total_assets'], data['total_liabilities']],
+        )
+        data['total_assets'], data['total_liabilities'] = map(float, totals)
+
         return data
     
     def _parse_profit_loss(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -224,46 +619,9 @@ class FileParserService:
             'other_expenses': 0.0
         }
         
-        # Convert to lowercase
-        df.columns = df.columns.str.lower().str.strip()
-        
-        # Find amount column
-        amount_col = None
-        for col in df.columns:
-            if 'amount' in col or 'value' in col or col.replace(' ', '').replace('₹', '').replace(',', '').replace('.', '').isdigit():
-                amount_col = col
-                break
-        
-        if amount_col is None and len(df.columns) >= 2:
-            amount_col = df.columns[-1]
-        
-        # Parse each row
-        for idx, row in df.iterrows():
-            try:
-                item = str(row.iloc[0]).lower().strip() if len(row) > 0 else ""
-                amount = self._extract_number(row[amount_col]) if amount_col else 0.0
-                
-                # Map to fields
-                if 'revenue' in item or 'sales' in item or 'income' in item:
-                    data['total_revenue'] += amount
-                elif 'cogs' in item or 'cost of goods' in item or 'cost of sales' in item:
-                    data['cost_of_goods_sold'] += amount
-                elif 'salary' in item or 'wage' in item or 'payroll' in item:
-                    data['salaries_wages'] += amount
-                elif 'rent' in item or 'lease' in item:
-                    data['rent'] += amount
-                elif 'utility' in item or 'utilities' in item or 'electric' in item:
-                    data['utilities'] += amount
-                elif 'marketing' in item or 'advertising' in item:
-                    data['marketing'] += amount
-                elif 'operating expense' in item or 'opex' in item:
-                    data['operating_expenses'] = amount
-                elif 'expense' in item or 'cost' in item:
-                    data['other_expenses'] += amount
-                    
-            except Exception:
-                continue
-        
+        items, amounts = self._prepare(df, _PROFIT_LOSS_AMOUNT_RE)
+        data = self._categorize(items, amounts, data, self._PROFIT_LOSS_CATEGORIES)
+
         # Calculate derived values
         if data['operating_expenses'] == 0:
             data['operating_expenses'] = (data['salaries_wages'] + 
@@ -285,36 +643,8 @@ class FileParserService:
             'financing_cash_flow': 0.0
         }
         
-        # Convert to lowercase
-        df.columns = df.columns.str.lower().str.strip()
-        
-        # Find amount column
-        amount_col = None
-        for col in df.columns:
-            if 'amount' in col or 'value' in col or 'cash' in col:
-                amount_col = col
-                break
-        
-        if amount_col is None and len(df.columns) >= 2:
-            amount_col = df.columns[-1]
-        
-        # Parse each row
-        for idx, row in df.iterrows():
-            try:
-                item = str(row.iloc[0]).lower().strip() if len(row) > 0 else ""
-                amount = self._extract_number(row[amount_col]) if amount_col else 0.0
-                
-                if 'operating' in item:
-                    data['operating_cash_flow'] = amount
-                elif 'investing' in item:
-                    data['investing_cash_flow'] = amount
-                elif 'financing' in item:
-                    data['financing_cash_flow'] = amount
-                    
-            except Exception:
-                continue
-        
-        return data
+        items, amounts = self._prepare(df, _CASH_FLOW_AMOUNT_RE)
+        return self._categorize(items, amounts, data, self._CASH_FLOW_CATEGORIES)
     
     def _parse_generic(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Generic parsing for unknown document types"""
@@ -323,22 +653,61 @@ class FileParserService:
             'parsed_data': {}
         }
         
-        # Try to extract key financial metrics
-        df.columns = df.columns.str.lower().str.strip()
-        
-        for idx, row in df.iterrows():
-            try:
-                if len(row) >= 2:
-                    key = str(row.iloc[0]).lower().strip()
-                    value = self._extract_number(row.iloc[1])
-                    
-                    if value != 0:
-                        data['parsed_data'][key] = value
-            except Exception:
-                continue
-        
+        # Try to extract key financial metrics. Whole-column passes
+        # replace the old iterrows loop, whose per-row Series allocation
+        # and try/except-as-control-flow dominated generic parses
+        if df.shape[1] >= 2:
+            # fillna matches the old str(None) -> 'none' key behavior
+            keys = df.iloc[:, 0].astype(str).fillna('none').str.lower().str.strip()
+            values = self._extract_numbers_vec(df.iloc[:, 1])
+            nonzero = values != 0
+            # dict keeps the last occurrence per key, like the old loop
+            data['parsed_data'] = dict(zip(keys[nonzero], values[nonzero]))
+
         return data
     
+    def _extract_numbers_vec(self, col: pd.Series) -> pd.Series:
+        """Clean a whole amount column to floats in vectorized passes
+
+        Mirrors _extract_number (currency symbols, thousands separators,
+        parenthesised negatives) but runs each regex once over the full
+        column through pandas' C string kernels instead of a Python
+        re.search per cell
+        """
+        if pd.api.types.is_numeric_dtype(col):
+            return col.fillna(0.0).astype(float)
+
+        if numba is not None and len(col) > self._NUMBA_MIN_ROWS:
+            return self._extract_numbers_jit(col)
+
+        s = col.astype(str).str.replace(_CURRENCY_RE, '', regex=True)
+        s = s.str.replace(_PAREN_WRAP_RE, r'-\1', regex=True)
+        return pd.to_numeric(
+            s.str.extract(_NUMBER_GROUP_RE, expand=False), errors='coerce'
+        ).fillna(0.0).astype(float)
+
+    # Below this the three-regex pandas path wins; the JIT kernel's edge
+    # is amortizing away the per-pass string allocations on bulk loads
+    _NUMBA_MIN_ROWS = 10_000
+
+    def _extract_numbers_jit(self, col: pd.Series) -> pd.Series:
+        """Batch numeric cleanup through the compiled byte-scan kernel
+
+        Concatenates the column into one UTF-8 buffer (NUL-separated)
+        so the kernel walks contiguous bytes instead of boxed strings;
+        separator offsets come from one vectorized scan of the buffer
+        """
+        # astype(str) leaves NaN as a float in object columns
+        blob = '\x00'.join(col.astype(str).fillna('')).encode('utf-8')
+        buf = np.frombuffer(blob, dtype=np.uint8)
+        seps = np.flatnonzero(buf == 0)
+        starts = np.concatenate(([0], seps + 1))
+        ends = np.concatenate((seps, [buf.shape[0]]))
+
+        out = np.empty(len(col), dtype=np.float64)
+        _clean_parse_kernel(buf, starts, ends, out)
+        return pd.Series(out, index=col.index).fillna(0.0)
+
     def _extract_number(self, value) -> float:
         """Extract numeric value from string or number"""
         if pd.isna(value):
@@ -355,7 +724,7 @@ class FileParserService:
             value_str = '-' + value_str.replace('(', '').replace(')', '')
         
         # Extract number using regex
-        match = re.search(r'-?\d+\.?\d*', value_str)
+        match = _NUMBER_RE.search(value_str)
         if match:
             return float(match.group())
         
@@ -367,25 +736,23 @@ class FileParserService:
             'document_type': 'text_extract',
             'extracted_values': {}
         }
-        
-        # Define patterns for common financial terms
-        patterns = {
-            'total_revenue': r'(?:total\s+)?revenue[:\s]+₹?[\s,]*(\d+(?:,\d+)*(?:\.\d+)?)',
-            'total_assets': r'(?:total\s+)?assets[:\s]+₹?[\s,]*(\d+(?:,\d+)*(?:\.\d+)?)',
-            'total_liabilities': r'(?:total\s+)?liabilities[:\s]+₹?[\s,]*(\d+(?:,\d+)*(?:\.\d+)?)',
-            'cash': r'cash[:\s]+₹?[\s,]*(\d+(?:,\d+)*(?:\.\d+)?)',
-        }
-        
-        text_lower = text.lower()
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text_lower)
-            if match:
-                value_str = match.group(1).replace(',', '')
-                data['extracted_values'][key] = float(value_str)
-        
+
+        extracted = data['extracted_values']
+        for match in _TEXT_METRIC_RE.finditer(text.lower()):
+            key = match.lastgroup
+            # First occurrence wins, matching the old per-pattern search
+            if key not in extracted:
+                extracted[key] = float(match.group(key).replace(',', ''))
+
         return data
 
 
+def _parse_in_subprocess(file_content: bytes, filename: str, file_type: str) -> Dict[str, Any]:
+    """Process-pool entry point: a fresh service per call keeps the
+    pickled arguments to just the payload (the singleton's parse cache
+    would otherwise ship with every bound-method call)"""
+    return FileParserService().parse_file(file_content, filename, file_type)
+
+
 # Create singleton instance
 file_parser = FileParserService()
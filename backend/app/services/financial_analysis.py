@@ -2,96 +2,203 @@
 Financial Analysis Service
 Core financial calculations, ratios, and metrics
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, NamedTuple, Optional, List
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from scipy import stats
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _health_scores_core(current_ratio: float, quick_ratio: float, net_margin: float,
+                        roa: float, roe: float, asset_turnover: float,
+                        inventory_turnover: float) -> tuple:
+    """Scalar arithmetic behind calculate_health_scores
+
+    Kept free of dict access so numba can compile it to a branch-free
+    nopython function; without numba it runs unchanged as plain Python
+    """
+    liquidity = max(0.0, min(100.0, current_ratio * 30 + quick_ratio * 30 + 40))
+    profitability = max(0.0, min(100.0, (
+        min(40.0, net_margin * 2) +
+        min(30.0, roa * 1.5) +
+        min(30.0, roe * 1.5)
+    )))
+    efficiency = max(0.0, min(100.0, asset_turnover * 40 + min(60.0, inventory_turnover * 10)))
+    overall = liquidity * 0.30 + profitability * 0.40 + efficiency * 0.30
+    return liquidity, profitability, efficiency, overall
+
+
+if numba is not None:
+    _health_scores_core = numba.njit(cache=True)(_health_scores_core)
+
+# Field order for pulling ratio inputs out of a financial-data dict in
+# one pass (see calculate_financial_ratios)
+_RATIO_INPUT_FIELDS = (
+    'total_revenue', 'total_expenses', 'cost_of_goods_sold', 'total_assets',
+    'current_assets', 'cash_and_equivalents', 'accounts_receivable',
+    'inventory', 'total_liabilities', 'current_liabilities',
+    'accounts_payable', 'short_term_debt', 'long_term_debt',
+    'owners_equity', 'operating_cash_flow',
+)
+
+# Names of the simple numerator/denominator ratios, in the order the
+# vectorized divide produces them; the scale vector turns the margin
+# entries into percentages
+_RATIO_NAMES = (
+    'current_ratio', 'quick_ratio', 'cash_ratio',
+    'debt_to_equity', 'debt_to_asset', 'equity_multiplier', 'debt_ratio',
+    'gross_profit_margin', 'net_profit_margin', 'operating_margin',
+    'return_on_assets', 'return_on_equity',
+    'asset_turnover', 'inventory_turnover', 'receivables_turnover',
+    'payables_turnover',
+    'operating_cash_flow_ratio', 'cash_flow_margin',
+)
+_RATIO_SCALE = np.array(
+    [1, 1, 1, 1, 1, 1, 1, 100, 100, 100, 100, 100, 1, 1, 1, 1, 1, 100],
+    dtype=np.float64,
+)
+# Positions of the turnover ratios feeding the 365/x days conversions
+_TURNOVER_IDX = (
+    _RATIO_NAMES.index('receivables_turnover'),
+    _RATIO_NAMES.index('inventory_turnover'),
+    _RATIO_NAMES.index('payables_turnover'),
+)
+
+# Ratio result type: the simple ratios in _RATIO_NAMES order followed by
+# the derived days/working-capital metrics. Attribute access replaces a
+# dict hash per downstream lookup, and immutability means the lru_cache
+# can hand out its stored instance without a defensive copy. Call
+# ._asdict() where a plain dict is needed (serialization, **kwargs)
+_DERIVED_RATIO_NAMES = (
+    'days_sales_outstanding', 'days_inventory_outstanding',
+    'days_payables_outstanding', 'working_capital',
+    'working_capital_ratio', 'cash_conversion_cycle',
+)
+Ratios = NamedTuple(
+    'Ratios', [(name, float) for name in _RATIO_NAMES + _DERIVED_RATIO_NAMES]
+)
+# All-zero inputs (dormant or freshly seeded businesses) map exactly to
+# the all-zero result, so that case can skip the arithmetic and cache
+_ZERO_RATIOS = Ratios(*[0.0] * len(Ratios._fields))
+
+# Cost-optimization checks: (field, area, recommendation, savings rate),
+# with the ratio thresholds (as % of revenue) in a parallel array so all
+# three screens run as one vectorized compare
+_COST_CHECKS = (
+    ('operating_expenses', 'Operating Expenses',
+     'Operating expenses are high relative to revenue. Consider reviewing and optimizing operational costs.',
+     0.1),
+    ('salaries_wages', 'Personnel Costs',
+     'Salary expenses are high. Consider workforce optimization or automation.',
+     0.05),
+    ('inventory', 'Inventory Management',
+     'Inventory levels are high. Implement just-in-time inventory management to reduce holding costs.',
+     0.15),
+)
+_COST_THRESHOLDS = np.array([30.0, 40.0, 25.0])
+
+# Credit-scoring ladders as sorted thresholds with one more point value
+# than thresholds; bisect picks the bracket. The leverage ladder is a
+# <=-comparison, so it uses bisect_left and descending points
+_CREDIT_LIQUIDITY = ((1.0, 1.5, 2.0), (5, 10, 15, 20))
+_CREDIT_LEVERAGE = ((0.5, 1.0, 2.0), (20, 15, 10, 5))
+_CREDIT_PROFITABILITY = ((0, 5, 10, 15), (0, 10, 15, 20, 25))
+_CREDIT_CASH_FLOW = ((0.2, 0.4), (10, 15, 20))
+_CREDIT_MATURITY = ((2, 5, 10), (2, 5, 10, 15))
+
+# Score-to-label ladders as sorted thresholds: bisect_right finds the
+# bracket in C instead of walking an if/elif chain per assessment
+_RATING_THRESHOLDS = (10, 20, 30, 40, 50, 60, 70, 80, 90)
+_RATINGS = ("D", "C", "CC", "CCC", "B", "BB", "BBB", "A", "AA", "AAA")
+_RISK_THRESHOLDS = (30, 50, 70)
+_RISK_LEVELS = ("critical", "high", "moderate", "low")
 
 
 class FinancialAnalysisService:
     """Service for financial calculations and analysis"""
     
-    def calculate_financial_ratios(self, financial_data: Dict[str, Any]) -> Dict[str, float]:
+    def calculate_financial_ratios(self, financial_data: Dict[str, Any]) -> Ratios:
         """
         Calculate comprehensive financial ratios
-        
+
         Args:
             financial_data: Financial statement data
-        
+
         Returns:
-            Dictionary of calculated ratios
+            Ratios named tuple of calculated ratios (._asdict() for a dict)
         """
-        ratios = {}
-        
-        # Extract data
-        total_revenue = financial_data.get('total_revenue', 0)
-        total_expenses = financial_data.get('total_expenses', 0)
-        cogs = financial_data.get('cost_of_goods_sold', 0)
-        total_assets = financial_data.get('total_assets', 0)
-        current_assets = financial_data.get('current_assets', 0)
-        cash = financial_data.get('cash_and_equivalents', 0)
-        receivables = financial_data.get('accounts_receivable', 0)
-        inventory = financial_data.get('inventory', 0)
-        total_liabilities = financial_data.get('total_liabilities', 0)
-        current_liabilities = financial_data.get('current_liabilities', 0)
-        payables = financial_data.get('accounts_payable', 0)
-        short_term_debt = financial_data.get('short_term_debt', 0)
-        long_term_debt = financial_data.get('long_term_debt', 0)
-        owners_equity = financial_data.get('owners_equity', 0)
-        operating_cash_flow = financial_data.get('operating_cash_flow', 0)
-        
-        # Net profit
+        # Extract data in _RATIO_INPUT_FIELDS order; binding .get once
+        # skips a method lookup per field. The value tuple fully
+        # determines the output, so it doubles as the memo key - UI
+        # refreshes re-assessing the same statements hit the cache
+        get = financial_data.get
+        values = tuple(float(get(k, 0)) for k in _RATIO_INPUT_FIELDS)
+        if not any(values):
+            return _ZERO_RATIOS
+        return self._ratios_from_values(values)
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _ratios_from_values(values: tuple) -> Ratios:
+        """Compute the Ratios tuple from a frozen input tuple"""
+        (total_revenue, total_expenses, cogs, total_assets, current_assets,
+         cash, receivables, inventory, total_liabilities, current_liabilities,
+         payables, short_term_debt, long_term_debt, owners_equity,
+         operating_cash_flow) = values
+
         net_profit = total_revenue - total_expenses
         gross_profit = total_revenue - cogs
-        
-        # Liquidity Ratios
-        ratios['current_ratio'] = current_assets / current_liabilities if current_liabilities > 0 else 0
-        ratios['quick_ratio'] = (current_assets - inventory) / current_liabilities if current_liabilities > 0 else 0
-        ratios['cash_ratio'] = cash / current_liabilities if current_liabilities > 0 else 0
-        
-        # Leverage/Solvency Ratios
         total_debt = short_term_debt + long_term_debt
-        ratios['debt_to_equity'] = total_debt / owners_equity if owners_equity > 0 else 0
-        ratios['debt_to_asset'] = total_liabilities / total_assets if total_assets > 0 else 0
-        ratios['equity_multiplier'] = total_assets / owners_equity if owners_equity > 0 else 0
-        ratios['debt_ratio'] = total_debt / total_assets if total_assets > 0 else 0
-        
-        # Profitability Ratios
-        ratios['gross_profit_margin'] = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
-        ratios['net_profit_margin'] = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
-        ratios['operating_margin'] = ((total_revenue - total_expenses) / total_revenue * 100) if total_revenue > 0 else 0
-        ratios['return_on_assets'] = (net_profit / total_assets * 100) if total_assets > 0 else 0
-        ratios['return_on_equity'] = (net_profit / owners_equity * 100) if owners_equity > 0 else 0
-        
-        # Efficiency Ratios
-        ratios['asset_turnover'] = total_revenue / total_assets if total_assets > 0 else 0
-        ratios['inventory_turnover'] = cogs / inventory if inventory > 0 else 0
-        ratios['receivables_turnover'] = total_revenue / receivables if receivables > 0 else 0
-        ratios['payables_turnover'] = cogs / payables if payables > 0 else 0
-        
-        # Days ratios
-        ratios['days_sales_outstanding'] = 365 / ratios['receivables_turnover'] if ratios['receivables_turnover'] > 0 else 0
-        ratios['days_inventory_outstanding'] = 365 / ratios['inventory_turnover'] if ratios['inventory_turnover'] > 0 else 0
-        ratios['days_payables_outstanding'] = 365 / ratios['payables_turnover'] if ratios['payables_turnover'] > 0 else 0
-        
+
+        # One masked divide replaces the per-ratio zero guards: rows are
+        # liquidity, leverage/solvency, profitability, efficiency, and
+        # cash-flow ratios (_RATIO_NAMES order); positions with a
+        # non-positive denominator stay 0
+        nums = np.array([
+            current_assets, current_assets - inventory, cash,
+            total_debt, total_liabilities, total_assets, total_debt,
+            gross_profit, net_profit, net_profit, net_profit, net_profit,
+            total_revenue, cogs, total_revenue, cogs,
+            operating_cash_flow, operating_cash_flow,
+        ])
+        dens = np.array([
+            current_liabilities, current_liabilities, current_liabilities,
+            owners_equity, total_assets, owners_equity, total_assets,
+            total_revenue, total_revenue, total_revenue, total_assets, owners_equity,
+            total_assets, inventory, receivables, payables,
+            current_liabilities, total_revenue,
+        ])
+        out = np.zeros(len(_RATIO_NAMES))
+        np.divide(nums, dens, out=out, where=dens > 0)
+        out *= _RATIO_SCALE
+
+        # Days ratios: 365 over the turnover block, same masked pattern
+        turnovers = out[list(_TURNOVER_IDX)]
+        days = np.zeros(3)
+        np.divide(365.0, turnovers, out=days, where=turnovers > 0)
+        days_sales, days_inventory, days_payables = days.tolist()
+
         # Working Capital Metrics
-        ratios['working_capital'] = current_assets - current_liabilities
-        ratios['working_capital_ratio'] = ratios['working_capital'] / total_revenue if total_revenue > 0 else 0
-        ratios['cash_conversion_cycle'] = (ratios['days_inventory_outstanding'] + 
-                                          ratios['days_sales_outstanding'] - 
-                                          ratios['days_payables_outstanding'])
-        
-        # Cash Flow Ratios
-        ratios['operating_cash_flow_ratio'] = operating_cash_flow / current_liabilities if current_liabilities > 0 else 0
-        ratios['cash_flow_margin'] = (operating_cash_flow / total_revenue * 100) if total_revenue > 0 else 0
-        
-        return ratios
+        working_capital = current_assets - current_liabilities
+
+        return Ratios(
+            *out.tolist(),
+            days_sales, days_inventory, days_payables,
+            working_capital,
+            working_capital / total_revenue if total_revenue > 0 else 0,
+            days_inventory + days_sales - days_payables,
+        )
     
     def assess_creditworthiness(
         self,
         financial_data: Dict[str, Any],
-        ratios: Dict[str, float],
+        ratios: Ratios,
         business_info: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
@@ -105,69 +212,29 @@ class FinancialAnalysisService:
         Returns:
             Credit assessment including score and rating
         """
+        # Each criterion is a threshold-table lookup (see the _CREDIT_*
+        # ladders); bisect resolves the bracket in C instead of an
+        # if/elif chain per criterion
         score = 0
-        max_score = 100
-        
+
         # 1. Liquidity Assessment (20 points)
-        current_ratio = ratios.get('current_ratio', 0)
-        if current_ratio >= 2.0:
-            score += 20
-        elif current_ratio >= 1.5:
-            score += 15
-        elif current_ratio >= 1.0:
-            score += 10
-        else:
-            score += 5
-        
-        # 2. Leverage Assessment (20 points)
-        debt_to_equity = ratios.get('debt_to_equity', 0)
-        if debt_to_equity <= 0.5:
-            score += 20
-        elif debt_to_equity <= 1.0:
-            score += 15
-        elif debt_to_equity <= 2.0:
-            score += 10
-        else:
-            score += 5
-        
+        score += self._ladder(_CREDIT_LIQUIDITY, ratios.current_ratio)
+
+        # 2. Leverage Assessment (20 points) - <= ladder
+        thresholds, points = _CREDIT_LEVERAGE
+        score += points[bisect_left(thresholds, ratios.debt_to_equity)]
+
         # 3. Profitability Assessment (25 points)
-        net_margin = ratios.get('net_profit_margin', 0)
-        if net_margin >= 15:
-            score += 25
-        elif net_margin >= 10:
-            score += 20
-        elif net_margin >= 5:
-            score += 15
-        elif net_margin >= 0:
-            score += 10
-        else:
-            score += 0
-        
-        # 4. Cash Flow Assessment (20 points)
-        operating_cf = financial_data.get('operating_cash_flow', 0)
-        if operating_cf > 0:
-            ocf_ratio = ratios.get('operating_cash_flow_ratio', 0)
-            if ocf_ratio >= 0.4:
-                score += 20
-            elif ocf_ratio >= 0.2:
-                score += 15
-            else:
-                score += 10
-        else:
-            score += 0
-        
+        score += self._ladder(_CREDIT_PROFITABILITY, ratios.net_profit_margin)
+
+        # 4. Cash Flow Assessment (20 points; nothing without positive OCF)
+        if financial_data.get('operating_cash_flow', 0) > 0:
+            score += self._ladder(_CREDIT_CASH_FLOW, ratios.operating_cash_flow_ratio)
+
         # 5. Business Maturity (15 points)
         current_year = datetime.now().year
         established_year = business_info.get('established_year', current_year)
-        years_in_business = current_year - established_year
-        if years_in_business >= 10:
-            score += 15
-        elif years_in_business >= 5:
-            score += 10
-        elif years_in_business >= 2:
-            score += 5
-        else:
-            score += 2
+        score += self._ladder(_CREDIT_MATURITY, current_year - established_year)
         
         # Determine credit rating
         credit_rating = self._score_to_rating(score)
@@ -186,88 +253,80 @@ class FinancialAnalysisService:
             }
         }
     
+    @staticmethod
+    def _ladder(table: tuple, value: float) -> int:
+        """Points for value in a (thresholds, points) >= ladder"""
+        thresholds, points = table
+        return points[bisect_right(thresholds, value)]
+
     def _score_to_rating(self, score: float) -> str:
         """Convert numerical score to credit rating"""
-        if score >= 90:
-            return "AAA"
-        elif score >= 80:
-            return "AA"
-        elif score >= 70:
-            return "A"
-        elif score >= 60:
-            return "BBB"
-        elif score >= 50:
-            return "BB"
-        elif score >= 40:
-            return "B"
-        elif score >= 30:
-            return "CCC"
-        elif score >= 20:
-            return "CC"
-        elif score >= 10:
-            return "C"
-        else:
-            return "D"
-    
+        return _RATINGS[bisect_right(_RATING_THRESHOLDS, score)]
+
     def _score_to_risk(self, score: float) -> str:
         """Convert numerical score to risk level"""
-        if score >= 70:
-            return "low"
-        elif score >= 50:
-            return "moderate"
-        elif score >= 30:
-            return "high"
-        else:
-            return "critical"
+        return _RISK_LEVELS[bisect_right(_RISK_THRESHOLDS, score)]
     
     def calculate_health_scores(
         self,
         financial_data: Dict[str, Any],
-        ratios: Dict[str, float]
+        ratios: Ratios
     ) -> Dict[str, float]:
         """
         Calculate various health scores
-        
+
         Args:
             financial_data: Financial statement data
             ratios: Calculated financial ratios
-        
+
         Returns:
             Dictionary of health scores
         """
-        scores = {}
-        
-        # Liquidity Score (0-100)
-        current_ratio = ratios.get('current_ratio', 0)
-        quick_ratio = ratios.get('quick_ratio', 0)
-        liquidity = min(100, (current_ratio * 30 + quick_ratio * 30 + 40))
-        scores['liquidity_score'] = max(0, liquidity)
-        
-        # Profitability Score (0-100)
-        net_margin = ratios.get('net_profit_margin', 0)
-        roa = ratios.get('return_on_assets', 0)
-        roe = ratios.get('return_on_equity', 0)
-        profitability = (
-            min(40, net_margin * 2) +
-            min(30, roa * 1.5) +
-            min(30, roe * 1.5)
-        )
-        scores['profitability_score'] = max(0, min(100, profitability))
-        
-        # Efficiency Score (0-100)
-        asset_turnover = ratios.get('asset_turnover', 0)
-        inventory_turnover = ratios.get('inventory_turnover', 0)
-        efficiency = min(100, (asset_turnover * 40 + min(60, inventory_turnover * 10)))
-        scores['efficiency_score'] = max(0, efficiency)
-        
-        # Overall Health Score (weighted average)
-        scores['overall_health_score'] = (
-            scores['liquidity_score'] * 0.30 +
-            scores['profitability_score'] * 0.40 +
-            scores['efficiency_score'] * 0.30
+        scores = self._scores_from_values(
+            ratios.current_ratio,
+            ratios.quick_ratio,
+            ratios.net_profit_margin,
+            ratios.return_on_assets,
+            ratios.return_on_equity,
+            ratios.asset_turnover,
+            ratios.inventory_turnover,
         )
-        
-        return scores
+        return dict(zip(
+            ('liquidity_score', 'profitability_score', 'efficiency_score',
+             'overall_health_score'),
+            scores,
+        ))
+
+    def assess_all(
+        self,
+        financial_data: Dict[str, Any],
+        business_info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run the full assessment pipeline in one call
+
+        Computes ratios once and feeds the same Ratios tuple to the
+        health-score and credit stages, so batch callers avoid three
+        separate passes over the statement dict and the per-stage
+        re-extraction each standalone call would pay
+
+        Args:
+            financial_data: Financial statement data
+            business_info: Business profile information
+
+        Returns:
+            Combined dict with 'ratios' plus all score and credit keys
+        """
+        ratios = self.calculate_financial_ratios(financial_data)
+        scores = self.calculate_health_scores(financial_data, ratios)
+        credit = self.assess_creditworthiness(financial_data, ratios, business_info)
+        return {"ratios": ratios._asdict(), **scores, **credit}
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _scores_from_values(*ratio_values: float) -> tuple:
+        """Memoized front of the health-score core (same hit pattern as
+        the ratio cache: re-assessments pass identical ratio values)"""
+        return _health_scores_core(*ratio_values)
     
     def forecast_revenue(
         self,
@@ -286,22 +345,17 @@ class FinancialAnalysisService:
         """
         if not historical_data or len(historical_data) < 3:
             return [0] * periods
-        
+
         # Extract revenue values
         revenues = [data.get('total_revenue', 0) for data in historical_data]
-        
+
         # Simple linear regression for trend
-        x = np.arange(len(revenues))
-        slope, intercept, _, _, _ = stats.linregress(x, revenues)
-        
-        # Forecast future periods
-        forecasts = []
-        for i in range(1, periods + 1):
-            forecast = slope * (len(revenues) + i) + intercept
-            # Ensure non-negative
-            forecasts.append(max(0, forecast))
-        
-        return forecasts
+        slope, intercept = self._linear_fit(revenues)
+
+        # Forecast future periods in one vectorized step, clamped
+        # non-negative
+        future_x = len(revenues) + np.arange(1, periods + 1)
+        return np.maximum(0, slope * future_x + intercept).tolist()
     
     def analyze_cash_flow_pattern(
         self,
@@ -324,35 +378,66 @@ class FinancialAnalysisService:
                 "trend": "stable"
             }
         
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame(transactions)
-        df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-        df['month'] = df['transaction_date'].dt.to_period('M')
-        
-        # Separate inflows and outflows
-        inflows = df[df['amount'] > 0].groupby('month')['amount'].sum()
-        outflows = df[df['amount'] < 0].groupby('month')['amount'].sum().abs()
-        
+        # Bucket by month with a NumPy groupby: building a DataFrame and
+        # running two pandas groupbys costs orders of magnitude more
+        # than the arithmetic on transaction lists this size
+        dates = [t['transaction_date'] for t in transactions]
+        try:
+            months_all = np.array(dates, dtype='datetime64[M]')
+        except (ValueError, TypeError):
+            # Non-ISO strings - fall back to pandas' permissive parser
+            months_all = pd.to_datetime(dates).to_numpy().astype('datetime64[M]')
+        amounts = np.fromiter(
+            (t['amount'] for t in transactions), dtype=np.float64,
+            count=len(transactions),
+        )
+
+        # One signed split, then per-month sums via bincount. A month
+        # only enters a series if it saw a transaction of that sign,
+        # matching the old boolean-filtered groupbys
+        months, inv = np.unique(months_all, return_inverse=True)
+        positive = amounts > 0
+        negative = amounts < 0
+        inflow_sums = np.bincount(inv, weights=np.where(positive, amounts, 0.0), minlength=months.size)
+        outflow_sums = np.bincount(inv, weights=np.where(negative, -amounts, 0.0), minlength=months.size)
+        inflows = inflow_sums[np.bincount(inv, weights=positive, minlength=months.size) > 0]
+        outflows = outflow_sums[np.bincount(inv, weights=negative, minlength=months.size) > 0]
+
         analysis = {
             "average_monthly_inflow": float(inflows.mean()) if len(inflows) > 0 else 0,
             "average_monthly_outflow": float(outflows.mean()) if len(outflows) > 0 else 0,
             "max_monthly_inflow": float(inflows.max()) if len(inflows) > 0 else 0,
             "min_monthly_inflow": float(inflows.min()) if len(inflows) > 0 else 0,
-            "volatility": float(inflows.std()) if len(inflows) > 1 else 0,
-            "trend": self._determine_trend(inflows.tolist() if len(inflows) > 0 else []),
+            # ddof=1 matches pandas' sample std
+            "volatility": float(inflows.std(ddof=1)) if len(inflows) > 1 else 0,
+            "trend": self._determine_trend(inflows),
             "months_analyzed": len(inflows)
         }
-        
+
         return analysis
     
-    def _determine_trend(self, values: List[float]) -> str:
-        """Determine trend direction"""
+    @staticmethod
+    def _linear_fit(values) -> tuple:
+        """Closed-form least-squares slope and intercept over 0..n-1
+
+        scipy's linregress also computes r, p, and stderr, none of which
+        the callers use, and its input validation dwarfs the actual math
+        on the handful of points a forecast or trend sees
+        """
+        y = np.asarray(values, dtype=np.float64)
+        x = np.arange(y.size, dtype=np.float64)
+        xd = x - x.mean()
+        ym = y.mean()
+        slope = (xd * (y - ym)).sum() / (xd * xd).sum()
+        return slope, ym - slope * x.mean()
+
+    def _determine_trend(self, values) -> str:
+        """Determine trend direction (accepts any 1-D sequence or ndarray)"""
         if len(values) < 2:
             return "stable"
-        
-        x = np.arange(len(values))
-        slope, _, _, _, _ = stats.linregress(x, values)
-        
+
+        slope, _ = self._linear_fit(values)
+
         if slope > 0.1:
             return "increasing"
         elif slope < -0.1:
@@ -375,49 +460,26 @@ class FinancialAnalysisService:
         Returns:
             List of cost optimization recommendations
         """
-        opportunities = []
-        
-        total_revenue = financial_data.get('total_revenue', 0)
+        get = financial_data.get
+
+        total_revenue = get('total_revenue', 0)
         if total_revenue == 0:
-            return opportunities
-        
-        # Check operating expense ratio
-        operating_expenses = financial_data.get('operating_expenses', 0)
-        opex_ratio = (operating_expenses / total_revenue) * 100
-        
-        if opex_ratio > 30:
-            opportunities.append({
-                "area": "Operating Expenses",
-                "current_percentage": round(opex_ratio, 2),
-                "recommendation": "Operating expenses are high relative to revenue. Consider reviewing and optimizing operational costs.",
-                "potential_savings": operating_expenses * 0.1  # Assume 10% reduction potential
-            })
-        
-        # Check salary to revenue ratio
-        salaries = financial_data.get('salaries_wages', 0)
-        salary_ratio = (salaries / total_revenue) * 100
-        
-        if salary_ratio > 40:
-            opportunities.append({
-                "area": "Personnel Costs",
-                "current_percentage": round(salary_ratio, 2),
-                "recommendation": "Salary expenses are high. Consider workforce optimization or automation.",
-                "potential_savings": salaries * 0.05
-            })
-        
-        # Check inventory levels
-        inventory = financial_data.get('inventory', 0)
-        inventory_ratio = (inventory / total_revenue) * 100
-        
-        if inventory_ratio > 25:
-            opportunities.append({
-                "area": "Inventory Management",
-                "current_percentage": round(inventory_ratio, 2),
-                "recommendation": "Inventory levels are high. Implement just-in-time inventory management to reduce holding costs.",
-                "potential_savings": inventory * 0.15
-            })
-        
-        return opportunities
+            return []
+
+        # All three screens as one vectorized ratio/threshold compare;
+        # only the flagged areas build a recommendation dict
+        amounts = np.array([get(field, 0) for field, _, _, _ in _COST_CHECKS],
+                           dtype=np.float64)
+        percentages = amounts / total_revenue * 100
+        return [
+            {
+                "area": _COST_CHECKS[i][1],
+                "current_percentage": round(float(percentages[i]), 2),
+                "recommendation": _COST_CHECKS[i][2],
+                "potential_savings": float(amounts[i]) * _COST_CHECKS[i][3],
+            }
+            for i in np.flatnonzero(percentages > _COST_THRESHOLDS)
+        ]
     
     def calculate_working_capital_metrics(
         self,
@@ -432,9 +494,10 @@ class FinancialAnalysisService:
         Returns:
             Working capital analysis
         """
-        current_assets = financial_data.get('current_assets', 0)
-        current_liabilities = financial_data.get('current_liabilities', 0)
-        total_revenue = financial_data.get('total_revenue', 0)
+        get = financial_data.get
+        current_assets = get('current_assets', 0)
+        current_liabilities = get('current_liabilities', 0)
+        total_revenue = get('total_revenue', 0)
         
         working_capital = current_assets - current_liabilities
         
@@ -0,0 +1,169 @@
+"""
+Semantic cache for LLM analysis responses
+Near-duplicate financial snapshots produce near-identical prompts; an
+embedding lookup lets those reuse a previous response instead of paying
+for a fresh LLM call. Requires Redis Stack (vector search); degrades to
+a no-op when the module or server isn't available, matching the
+graceful fallback in app.core.cache
+"""
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
+import logging
+import re
+
+import numpy as np
+
+try:
+    import redis
+    from redis.commands.search.field import TagField, TextField, VectorField
+    from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+    from redis.commands.search.query import Query
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+from app.core.metrics import AI_CACHE_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Embedding-keyed response cache with cosine KNN lookup
+
+    Entries live in Redis hashes under an HNSW index; a lookup embeds
+    the prompt and returns the stored response of the nearest neighbour
+    if its cosine distance is within max_distance. Namespaces (industry
+    + business size) keep unrelated businesses from matching each other.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Optional[List[float]]],
+        prefix: str = "aifh:sem",
+        dim: int = 768,
+        max_distance: float = 0.15,
+        ttl: int = 7 * 24 * 3600,
+        dtype: str = "FLOAT16",
+    ):
+        self._embed = embed
+        self.prefix = prefix
+        self.index_name = f"{prefix}:idx"
+        self.dim = dim
+        self.max_distance = max_distance
+        self.ttl = ttl
+        # FLOAT16 halves index memory vs FLOAT32; at a 0.15 cosine
+        # threshold the precision loss doesn't change which neighbour
+        # wins. Needs RediSearch 2.10+; pass "FLOAT32" for older servers
+        self.dtype = dtype
+        self._np_dtype = np.float16 if dtype == "FLOAT16" else np.float32
+        # Own client: vectors are raw float bytes, so this one must
+        # not decode responses like the shared cache client does
+        self._client = None
+        self._unavailable = redis is None
+
+    def _get_client(self):
+        """Lazily connect and create the vector index; disable on failure"""
+        if self._unavailable:
+            return None
+        if self._client is None:
+            try:
+                client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    socket_connect_timeout=1,
+                    socket_timeout=1,
+                )
+                client.ping()
+                self._ensure_index(client)
+                self._client = client
+            except Exception:
+                logger.warning(
+                    "Redis vector search unavailable - semantic cache disabled"
+                )
+                self._client = None
+                self._unavailable = True
+        return self._client
+
+    def _ensure_index(self, client) -> None:
+        """Create the HNSW index if this Redis doesn't have it yet"""
+        try:
+            client.ft(self.index_name).info()
+        except Exception:
+            client.ft(self.index_name).create_index(
+                fields=[
+                    TagField("ns"),
+                    TextField("payload"),
+                    VectorField(
+                        "vec",
+                        "HNSW",
+                        {
+                            "TYPE": self.dtype,
+                            "DIM": self.dim,
+                            "DISTANCE_METRIC": "COSINE",
+                        },
+                    ),
+                ],
+                definition=IndexDefinition(
+                    prefix=[f"{self.prefix}:"], index_type=IndexType.HASH
+                ),
+            )
+
+    @staticmethod
+    def _namespace_tag(namespace: str) -> str:
+        """Sanitize a namespace into a safe Redis tag token"""
+        return re.sub(r"[^a-zA-Z0-9_]", "_", namespace)
+
+    def get(self, namespace: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response nearest to this prompt, if close enough"""
+        client = self._get_client()
+        if client is None:
+            return None
+        vector = self._embed(prompt)
+        if vector is None:
+            return None
+        try:
+            query = (
+                Query(f"(@ns:{{{self._namespace_tag(namespace)}}})=>[KNN 1 @vec $v AS dist]")
+                .sort_by("dist")
+                .return_fields("dist", "payload")
+                .dialect(2)
+            )
+            result = client.ft(self.index_name).search(
+                query, {"v": np.asarray(vector, dtype=self._np_dtype).tobytes()}
+            )
+            if result.docs:
+                distance = float(result.docs[0].dist)
+                # Observed distances show where the match threshold
+                # should sit relative to real traffic
+                AI_CACHE_DISTANCE.observe(distance)
+                if distance <= self.max_distance:
+                    return json.loads(result.docs[0].payload)
+        except Exception:
+            pass
+        return None
+
+    def set(self, namespace: str, prompt: str, response: Dict[str, Any]) -> None:
+        """Store a response under the prompt's embedding"""
+        client = self._get_client()
+        if client is None:
+            return
+        vector = self._embed(prompt)
+        if vector is None:
+            return
+        try:
+            key = "{}:{}:{}".format(
+                self.prefix,
+                self._namespace_tag(namespace),
+                hashlib.sha256(prompt.encode()).hexdigest(),
+            )
+            client.hset(
+                key,
+                mapping={
+                    "ns": self._namespace_tag(namespace),
+                    "vec": np.asarray(vector, dtype=self._np_dtype).tobytes(),
+                    "payload": json.dumps(response, default=str),
+                },
+            )
+            client.expire(key, self.ttl)
+        except Exception:
+            pass
@@ -8,8 +8,10 @@ import os
 os.chdir('backend')
 sys.path.insert(0, '.')
 
+from sqlalchemy import func, select
+
 from app.core.database import SessionLocal
-from app.models.assessment import FinancialAssessment
+from app.models.assessment import FinancialAssessment, FinancialAssessmentNarrative
 from app.models.business import FinancialData
 
 print("Checking database for analysis results...")
@@ -18,20 +20,47 @@ print("=" * 80)
 db = SessionLocal()
 
 try:
-    # Check uploaded financial data
-    financial_data = db.query(FinancialData).all()
-    print(f"\n📊 Uploaded Financial Data Records: {len(financial_data)}")
-    for fd in financial_data:
+    # Check uploaded financial data. Select only the printed columns and
+    # stream in batches - full ORM objects would hydrate every attribute
+    # of every row just to print five of them
+    fd_count = db.scalar(select(func.count()).select_from(FinancialData))
+    print(f"\n📊 Uploaded Financial Data Records: {fd_count}")
+    fd_rows = db.execute(
+        select(
+            FinancialData.id, FinancialData.business_id,
+            FinancialData.fiscal_year, FinancialData.total_revenue,
+            FinancialData.total_assets, FinancialData.created_at,
+        ).execution_options(yield_per=500)
+    )
+    for fd in fd_rows:
         print(f"  - ID: {fd.id}, Business: {fd.business_id}, Fiscal Year: {fd.fiscal_year}")
         print(f"    Total Revenue: ₹{fd.total_revenue:,.2f}")
         print(f"    Total Assets: ₹{fd.total_assets:,.2f}")
         print(f"    Uploaded: {fd.created_at}")
     
-    # Check AI analysis results
-    assessments = db.query(FinancialAssessment).all()
-    print(f"\n🤖 AI Analysis Results: {len(assessments)}")
-    
-    if assessments:
+    # Check AI analysis results (same column-only streaming pattern)
+    assessment_count = db.scalar(select(func.count()).select_from(FinancialAssessment))
+    print(f"\n🤖 AI Analysis Results: {assessment_count}")
+
+    if assessment_count:
+        assessments = db.execute(
+            select(
+                FinancialAssessment.id, FinancialAssessment.business_id,
+                FinancialAssessment.assessment_date,
+                FinancialAssessment.overall_health_score,
+                FinancialAssessment.credit_rating, FinancialAssessment.risk_level,
+                FinancialAssessment.liquidity_score,
+                FinancialAssessment.profitability_score,
+                FinancialAssessment.efficiency_score,
+                FinancialAssessment.ai_model_used,
+                FinancialAssessmentNarrative.strengths,
+                FinancialAssessmentNarrative.weaknesses,
+                FinancialAssessmentNarrative.ai_summary,
+            ).outerjoin(
+                FinancialAssessmentNarrative,
+                FinancialAssessmentNarrative.assessment_id == FinancialAssessment.id,
+            ).execution_options(yield_per=500)
+        )
         for assessment in assessments:
             print(f"\n  Assessment ID: {assessment.id}")
             print(f"  Business ID: {assessment.business_id}")
@@ -9,10 +9,43 @@ import os
 os.chdir('backend')
 sys.path.insert(0, '.')
 
+from sqlalchemy import insert, select
+
 from app.core.database import SessionLocal
 from app.models.business import Business, IndustryType, BusinessSize
 from app.models.user import User
-from app.core.security import get_password_hash
+
+# Seed rows as plain dicts: Core insert() takes a list and issues one
+# executemany-style statement, so adding more businesses here stays a
+# single roundtrip instead of an add/commit/refresh cycle per row
+USER_SEED = [{
+    "id": 1,
+    "email": "test@example.com",
+    "username": "testuser",
+    "full_name": "Test User",
+    # Pre-hashed password ("password") to avoid bcrypt issues
+    "hashed_password": "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5uyilHHPVGFne",
+    "is_active": True,
+}]
+BUSINESS_SEED = [{
+    "user_id": 1,
+    "business_name": "Test Manufacturing Co.",
+    "legal_name": "Test Manufacturing Company Pvt Ltd",
+    "registration_number": "TEST123456",
+    "gst_number": "29ABCDE1234F1Z5",
+    "pan_number": "ABCDE1234F",
+    "industry": IndustryType.MANUFACTURING,
+    "business_size": BusinessSize.SMALL,
+    "address": "123 Test Street",
+    "city": "Mumbai",
+    "state": "Maharashtra",
+    "pincode": "400001",
+    "phone": "+91-22-12345678",
+    "email": "info@testmfg.com",
+    "annual_revenue": 2500000.00,
+    "employee_count": 25,
+    "established_year": 2020,
+}]
 
 print("Creating test business...")
 print("=" * 60)
@@ -20,62 +53,42 @@ print("=" * 60)
 db = SessionLocal()
 
 try:
-    # Check if business exists
-    business = db.query(Business).filter(Business.id == 1).first()
-    
-    if not business:
+    # Check if business exists (column-only select, no ORM hydration)
+    row = db.execute(
+        select(Business.id, Business.business_name).where(Business.id == 1)
+    ).first()
+
+    if not row:
         # Get or create user ID 1
-        user = db.query(User).filter(User.id == 1).first()
-        if not user:
+        user_email = db.scalar(select(User.email).where(User.id == 1))
+        if not user_email:
             print("Creating test user...")
-            # Use pre-hashed password to avoid bcrypt issues
-            user = User(
-                id=1,
-                email="test@example.com",
-                username="testuser",
-                full_name="Test User",
-                hashed_password="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5uyilHHPVGFne",  # "password"
-                is_active=True
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-            print(f"✓ Created user: {user.email} (ID: {user.id})")
+            db.execute(insert(User), USER_SEED)
+            user_email = USER_SEED[0]["email"]
+            print(f"✓ Created user: {user_email} (ID: 1)")
         else:
-            print(f"✓ User exists: {user.email} (ID: {user.id})")
-        
+            print(f"✓ User exists: {user_email} (ID: 1)")
+
         print("\nCreating test business...")
-        business = Business(
-            user_id=1,
-            business_name="Test Manufacturing Co.",
-            legal_name="Test Manufacturing Company Pvt Ltd",
-            registration_number="TEST123456",
-            gst_number="29ABCDE1234F1Z5",
-            pan_number="ABCDE1234F",
-            industry=IndustryType.MANUFACTURING,
-            business_size=BusinessSize.SMALL,
-            address="123 Test Street",
-            city="Mumbai",
-            state="Maharashtra",
-            pincode="400001",
-            phone="+91-22-12345678",
-            email="info@testmfg.com",
-            annual_revenue=2500000.00,
-            employee_count=25,
-            established_year=2020
+        # RETURNING gives back the generated ids without the per-row
+        # refresh() roundtrips the ORM path needed
+        result = db.execute(
+            insert(Business).returning(Business.id, Business.business_name),
+            BUSINESS_SEED,
         )
-        db.add(business)
+        business_id, business_name = result.first()
         db.commit()
-        db.refresh(business)
-        print(f"✓ Created business: {business.business_name} (ID: {business.id})")
+        print(f"✓ Created business: {business_name} (ID: {business_id})")
     else:
-        print(f"\n✓ Business exists: {business.business_name} (ID: {business.id})")
-    
+        business_id, business_name = row
+        user_email = db.scalar(select(User.email).where(User.id == 1))
+        print(f"\n✓ Business exists: {business_name} (ID: {business_id})")
+
     print("\n" + "=" * 60)
     print("✅ TEST DATA READY!")
     print(f"\nYou can now upload files using:")
-    print(f"  business_id: {business.id}")
-    print(f"  User: {user.email}")
+    print(f"  business_id: {business_id}")
+    print(f"  User: {user_email}")
     print("=" * 60)
     
 except Exception as e:
@@ -106,10 +106,11 @@ const AssessmentPage: React.FC = () => {
       if (response.ok) {
         const data = await response.json();
         setAssessments(data.assessments || []);
-        
-        // Auto-select latest assessment
+
+        // Auto-select latest assessment (detail fetch fills in the
+        // narrative fields the summary list no longer carries)
         if (data.assessments && data.assessments.length > 0) {
-          setSelectedAssessment(data.assessments[0]);
+          await fetchAssessmentDetail(data.assessments[0].id);
         } else {
           setSelectedAssessment(null);
         }
@@ -125,6 +126,19 @@ const AssessmentPage: React.FC = () => {
     }
   };
 
+  const fetchAssessmentDetail = async (assessmentId: number) => {
+    try {
+      const response = await fetch(`http://localhost:8000/api/v1/assessment/${assessmentId}`);
+      if (response.ok) {
+        const data = await response.json();
+        setSelectedAssessment(data.assessment);
+      }
+    } catch (err) {
+      console.error('Failed to fetch assessment detail:', err);
+      setError('Failed to load assessment details');
+    }
+  };
+
   const handleBusinessChange = (event: SelectChangeEvent) => {
     setSelectedBusinessId(event.target.value);
   };
@@ -449,7 +463,7 @@ const AssessmentPage: React.FC = () => {
                     key={assessment.id}
                     button
                     selected={selectedAssessment.id === assessment.id}
-                    onClick={() => setSelectedAssessment(assessment)}
+                    onClick={() => fetchAssessmentDetail(assessment.id)}
                   >
                     <ListItemText
                       primary={`Assessment #${assessments.length - idx}`}
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Check analyze_batch maps a {"results": [...]} reply back to its inputs"""
+import json
+import sys
+
+sys.path.insert(0, 'backend')
+
+from app.services.ai_analysis import AIAnalysisService
+
+print("Testing batch analysis reply handling...")
+print("-" * 60)
+
+service = AIAnalysisService()
+
+# Mock the provider roundtrip: feed a raw batch-shaped reply through the
+# real batch validator, exactly as the provider methods do for batch=True
+MOCK_REPLY = json.dumps({
+    "results": [
+        {"id": 0, "overall_health_score": 72, "credit_rating": "A",
+         "risk_level": "low", "ai_summary": "Healthy."},
+        {"id": 1, "overall_health_score": 35, "credit_rating": "B",
+         "risk_level": "high", "ai_summary": "Stressed."},
+    ]
+})
+
+
+def fake_dispatch(prompt, stream_callback=None, batch=False):
+    assert batch, "analyze_batch must request the batch-shaped schema"
+    return service._validate_batch_result(MOCK_REPLY)
+
+
+service._dispatch = fake_dispatch
+
+inputs = [
+    ({"total_revenue": 1000000}, {"business_name": "A Traders"}, None),
+    ({"total_revenue": 20000}, {"business_name": "B Stores"}, None),
+]
+results = service.analyze_batch(inputs)
+
+checks = [
+    ("one result per input", len(results) == len(inputs)),
+    ("no None entries", all(r is not None for r in results)),
+    ("envelope not stripped", results[0]["overall_health_score"] == 72
+     and results[1]["overall_health_score"] == 35),
+    ("id removed from entries", "id" not in results[0]),
+    ("model recorded", results[0]["ai_model_used"] == service.model),
+]
+
+ok = True
+for name, passed in checks:
+    print(f"{'✅' if passed else '❌'} {name}")
+    ok = ok and passed
+
+print("-" * 60)
+if ok:
+    print("✅ BATCH REPLY HANDLING OK!")
+else:
+    print("❌ Batch reply handling broken - see failures above.")
+    sys.exit(1)
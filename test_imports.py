@@ -7,9 +7,6 @@ print("Testing imports...")
 print("-" * 60)
 
 try:
-    print("✓ Importing scipy...")
-    from scipy import stats
-    
     print("✓ Importing pandas...")
     import pandas as pd
     
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Check the hot read endpoints stay within their query budgets (no N+1)"""
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, 'backend')
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models  # noqa: F401 - register tables on Base.metadata
+from app.main import app
+from app.core.database import engine, init_db, SessionLocal
+from app.models.business import Business, IndustryType, BusinessSize
+from app.models.user import User
+
+
+def ensure_sample_data():
+    """Create the tables and a user/business pair if the database is empty"""
+    init_db()
+    db = SessionLocal()
+    try:
+        if db.query(Business.id).first() is None:
+            user = db.query(User).first()
+            if user is None:
+                user = User(
+                    email="querycount@example.com",
+                    username="querycount",
+                    full_name="Query Count",
+                    hashed_password="not-a-real-hash"
+                )
+                db.add(user)
+                db.flush()
+            db.add(Business(
+                user_id=user.id,
+                business_name="Query Count Traders",
+                industry=IndustryType.RETAIL,
+                business_size=BusinessSize.SMALL
+            ))
+            db.commit()
+    finally:
+        db.close()
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements issued while the block runs"""
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def check(name, response, counter, budget):
+    """Print pass/fail for one endpoint's status code and query count"""
+    ok = response.status_code == 200 and counter["count"] <= budget
+    mark = "✅" if ok else "❌"
+    print(f"{mark} {name}: status={response.status_code}, "
+          f"queries={counter['count']} (budget {budget})")
+    return ok
+
+
+print("Testing query counts on hot endpoints...")
+print("-" * 60)
+
+ensure_sample_data()
+client = TestClient(app)
+results = []
+
+# Business existence check + one page of assessments = 2 queries
+with count_queries() as counter:
+    response = client.get("/api/v1/assessment/business/1")
+results.append(check("GET /assessment/business/1", response, counter, 2))
+
+# Business count + the single JOIN = 2 queries (was 1 + N before the refactor)
+with count_queries() as counter:
+    response = client.get("/api/v1/assessment/user/1/all")
+results.append(check("GET /assessment/user/1/all", response, counter, 2))
+
+# One paginated SELECT (may be zero if the Redis cache answers)
+with count_queries() as counter:
+    response = client.get("/api/v1/business/user/1")
+results.append(check("GET /business/user/1", response, counter, 1))
+
+print("-" * 60)
+if all(results):
+    print("✅ ALL QUERY BUDGETS MET!")
+else:
+    print("❌ Query budget exceeded - check for N+1 regressions above.")
+    sys.exit(1)